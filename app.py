@@ -3,35 +3,172 @@
 Flask-based web interface for the Jai Kisan agricultural consultant
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, abort, stream_with_context, make_response, g
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import atexit
+import functools
+import mimetypes
 import os
 import secrets
-from jai_kisan_agent import JaiKisanAgent
+import time
+from jai_kisan_agent import JaiKisanAgent, RESPONSE_FORMATS
+from data.files import DataFileError
+from data.resolver import UnresolvedNameError
+from data.snapshot import DataStore, default_data
+from response_cache import ResponseCache, normalize_key, make_etag, etag_matches
+from user_cache import UserSnapshotCache, CachedUser
+from db_config import engine_options, configure_engine, ensure_indexes
+from outbound_queue import OutboundQueue, transport_from_env
+from password_hasher import PasswordHasher, HasherBusy
+from page_fragments import dropdown_fragments, with_selected
+from assets import AssetManifest
+from history_export import HISTORY_FIELDS, EXPORT_FORMATS, encode_history, row_to_dict
+from event_log import WriteBehindLog
+from profiling import RequestProfiler
+from metrics import (MetricsRegistry, RequestMetrics, CONTENT_TYPE as METRICS_CONTENT_TYPE,
+                     instrument_methods, instrument_engine)
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', secrets.token_hex(16))
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///jai_kisan.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# SQLite lock timeout, or pool sizing for server databases (see db_config.py)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 
 # Initialize extensions
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
+# Prometheus metrics served at /metrics (see metrics.py); METRICS_ENABLED=false
+# turns recording off, METRICS_TOKEN requires "Authorization: Bearer <token>"
+metrics_registry = MetricsRegistry(
+    enabled=os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+)
+http_latency = metrics_registry.histogram(
+    'jai_kisan_http_request_duration_seconds', 'Time to handle a request, by route and status',
+    ('route', 'method', 'status'))
+agent_latency = metrics_registry.histogram(
+    'jai_kisan_agent_call_duration_seconds', 'Time spent in agent methods', ('function',))
+db_latency = metrics_registry.histogram(
+    'jai_kisan_db_query_duration_seconds', 'SQL statement execution time', ('operation',))
+
+
 # Initialize Jai Kisan Agent
-jai_kisan_agent = JaiKisanAgent()
+# Set PRECOMPUTE_RECOMMENDATIONS=true to build the full recommendation matrix at startup
+PRECOMPUTE_RECOMMENDATIONS = os.getenv('PRECOMPUTE_RECOMMENDATIONS', 'false').lower() in ('1', 'true', 'yes')
+
+
+def build_agent(data):
+    """Agent serving one DataSnapshot; rebuilt whole whenever the data is reloaded"""
+    agent = JaiKisanAgent(precompute=PRECOMPUTE_RECOMMENDATIONS, data=data)
+    if metrics_registry.enabled:
+        instrument_methods(agent, agent_latency,
+                           ('generate_response', 'get_fertilizer_recommendations', '_get_price_comparison'),
+                           metrics_registry)
+    return agent
+
+
+# Agronomy data comes from the JSON files in DATA_DIR (default: data/).
+# Changed files are loaded without a restart by POST /admin/reload-data
+# (needs ADMIN_TOKEN) or, with DATA_WATCH_INTERVAL_S > 0, as soon as
+# they change; in-flight requests finish on the data they started with
+data_store = DataStore(build=build_agent, snapshot=default_data)
+DATA_WATCH_INTERVAL_S = float(os.getenv('DATA_WATCH_INTERVAL_S', '0'))
+if DATA_WATCH_INTERVAL_S > 0:
+    data_store.watch(DATA_WATCH_INTERVAL_S)
+
+
+def current_agent():
+    """
+    Agent for this request
+    
+    Taken from the data store on first use and kept for the rest of the
+    request, so a reload in the meantime cannot mix two data versions.
+    """
+    agent = g.get('agent')
+    if agent is None:
+        agent = g.agent = data_store.current
+    return agent
+
+
+@app.after_request
+def add_data_version(response):
+    """Stamp every response with the data version it was built from"""
+    response.headers['X-Data-Version'] = current_agent().data.version
+    return response
+
+# On-demand profiling of /get-recommendation and /dashboard (see profiling.py):
+# PROFILE_TOKEN profiles requests sent with "X-Profile: <token>", and
+# PROFILE_SAMPLE_RATE > 0 profiles that fraction of requests, at most one per
+# PROFILE_MIN_INTERVAL_S. PROFILE_MODE=sample lowers the switch interval of
+# the whole process while a request is sampled, which affects every thread
+request_profiler = RequestProfiler(
+    directory=os.getenv('PROFILE_DIR', 'profiles'),
+    mode=os.getenv('PROFILE_MODE', 'cprofile'),
+    sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', '0')),
+    min_interval=float(os.getenv('PROFILE_MIN_INTERVAL_S', '60')),
+    max_files=int(os.getenv('PROFILE_MAX_FILES', '100')),
+    token=os.getenv('PROFILE_TOKEN') or None,
+)
+
+# Rendered recommendation payloads, keyed on (data version, crop, state, growth stage, format)
+response_cache = ResponseCache(maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', '1024')))
+
+# Per-process snapshots of the user fields checked on every request, so that
+# authorizing a request does not need a database round trip
+user_cache = UserSnapshotCache(ttl=float(os.getenv('USER_CACHE_TTL', '30')))
+
+# Password hashes run on a few dedicated threads so login bursts cannot take
+# every core; PASSWORD_HASH_METHOD sets the Werkzeug method and cost factor
+password_hasher = PasswordHasher(
+    method=os.getenv('PASSWORD_HASH_METHOD', 'scrypt'),
+    workers=int(os.getenv('PASSWORD_HASH_WORKERS', '2')),
+    max_queue=int(os.getenv('PASSWORD_HASH_QUEUE', '8')),
+    queue_timeout=float(os.getenv('PASSWORD_HASH_TIMEOUT_S', '2'))
+)
+
+# Fingerprinted, precompressed copies of static/ and public/ written by
+# build_assets.py; without a build, pages link the original files
+asset_manifest = AssetManifest(os.path.join(app.root_path, 'dist'))
+ASSET_MAX_AGE = 365 * 24 * 3600
+PUBLIC_MAX_AGE = int(os.getenv('PUBLIC_MAX_AGE', '3600'))
+
+# Upper bound on items accepted by /get-recommendations
+MAX_BATCH_ITEMS = int(os.getenv('MAX_BATCH_ITEMS', '200'))
+
+# Rows fetched from the database per round trip when exporting history
+HISTORY_EXPORT_CHUNK = int(os.getenv('HISTORY_EXPORT_CHUNK', '1000'))
+# Page size limits for /api/history
+HISTORY_PAGE_DEFAULT = 50
+HISTORY_PAGE_MAX = 500
+
+# The placeholder SMS/payment gateways answer instantly; set DEMO_GATEWAY_LATENCY_MS
+# to emulate a real Twilio/Razorpay round trip when load testing (see loadtest.py)
+DEMO_GATEWAY_LATENCY = float(os.getenv('DEMO_GATEWAY_LATENCY_MS', '0')) / 1000
+
+# OTP SMS are delivered by background workers so registration never waits on
+# the SMS gateway; OUTBOUND_TRANSPORT selects console, file or twilio
+outbound_queue = OutboundQueue(
+    transport_from_env(delay=DEMO_GATEWAY_LATENCY),
+    workers=int(os.getenv('OUTBOUND_WORKERS', '2')),
+    batch_size=int(os.getenv('OUTBOUND_BATCH_SIZE', '20')),
+    max_retries=int(os.getenv('OUTBOUND_MAX_RETRIES', '5')),
+    backoff=float(os.getenv('OUTBOUND_BACKOFF_S', '1')),
+    maxsize=int(os.getenv('OUTBOUND_QUEUE_SIZE', '10000'))
+)
+# Give queued OTPs a few seconds to go out when a worker shuts down
+atexit.register(outbound_queue.stop, 5.0)
 
 # Database Models
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(100), nullable=False)
     mobile = db.Column(db.String(15), unique=True, nullable=False)
-    state = db.Column(db.String(50), nullable=False)
+    state = db.Column(db.String(50), nullable=False, index=True)
     district = db.Column(db.String(50))
     occupation = db.Column(db.String(50), nullable=False)
     email = db.Column(db.String(100))
@@ -39,54 +176,153 @@ class User(UserMixin, db.Model):
     google_id = db.Column(db.String(100), unique=True)
     otp = db.Column(db.String(6))
     otp_verified = db.Column(db.Boolean, default=False)
-    registration_date = db.Column(db.DateTime, default=datetime.utcnow)
-    payment_status = db.Column(db.String(20), default='trial')  # trial, paid, expired
+    registration_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    payment_status = db.Column(db.String(20), default='trial', index=True)  # trial, paid, expired
     payment_date = db.Column(db.DateTime)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify a password, upgrading the stored hash if its method or cost is outdated"""
+        valid, new_hash = password_hasher.verify_and_update(self.password_hash, password)
+        if new_hash:
+            self.password_hash = new_hash
+        return valid
+    
+    def get_trial_end(self):
+        """End of the 24-hour free trial"""
+        return self.registration_date + timedelta(hours=24)
     
     def is_trial_active(self):
         """Check if 24-hour free trial is still active"""
         if self.payment_status == 'paid':
             return True
-        trial_end = self.registration_date + timedelta(hours=24)
-        return datetime.utcnow() < trial_end
+        return datetime.utcnow() < self.get_trial_end()
     
     def get_trial_remaining(self):
         """Get remaining trial time in hours"""
         if self.payment_status == 'paid':
             return None
-        trial_end = self.registration_date + timedelta(hours=24)
-        remaining = trial_end - datetime.utcnow()
+        remaining = self.get_trial_end() - datetime.utcnow()
         return max(0, remaining.total_seconds() / 3600)
 
 
+class RecommendationHistory(db.Model):
+    """One recommendation served to a user"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    crop = db.Column(db.String(100), nullable=False)
+    state = db.Column(db.String(50), nullable=False)
+    growth_stage = db.Column(db.String(100), nullable=False)
+    data_version = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Exports and keyset pages read one user's rows in id order
+    __table_args__ = (db.Index('ix_recommendation_history_user_id_id', 'user_id', 'id'),)
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    snapshot = user_cache.get(int(user_id), User.query.get)
+    if snapshot is None:
+        return None
+    return CachedUser(snapshot, lambda: User.query.get(snapshot.id))
+
+
+@app.errorhandler(HasherBusy)
+def password_hashing_busy(error):
+    """Shed login/registration load instead of queueing it behind the hash pool"""
+    db.session.rollback()
+    headers = {'Retry-After': '2'}
+    if request.endpoint in ('login', 'register'):
+        flash('Too many people are signing in right now. Please try again in a moment.', 'error')
+        return render_template(f'{request.endpoint}.html'), 503, headers
+    return jsonify({'error': 'Server busy, please retry shortly'}), 503, headers
+
+
+def write_history_events(events):
+    """Insert a batch of history rows in one transaction (event log writer thread)"""
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(RecommendationHistory.__table__.insert(), events)
+
+
+# Served recommendations are buffered and inserted in batches, so the request
+# itself never waits on a commit; EVENT_LOG_POLICY=block applies backpressure
+# instead of dropping events when the buffer is full
+history_log = WriteBehindLog(
+    write_history_events,
+    max_batch=int(os.getenv('EVENT_LOG_BATCH', '500')),
+    flush_interval=float(os.getenv('EVENT_LOG_INTERVAL_S', '1')),
+    maxsize=int(os.getenv('EVENT_LOG_SIZE', '10000')),
+    policy=os.getenv('EVENT_LOG_POLICY', 'drop')
+)
+atexit.register(history_log.stop, 5.0)
+
+
+def record_recommendation(crop, state, growth_stage):
+    """Append a served recommendation to the current user's history (write-behind)"""
+    history_log.append({'user_id': current_user.id, 'crop': crop, 'state': state,
+                        'growth_stage': growth_stage, 'data_version': current_agent().data.version,
+                        'created_at': datetime.utcnow()})
+
+
+def history_columns():
+    """RecommendationHistory columns in HISTORY_FIELDS order"""
+    return [getattr(RecommendationHistory, field) for field in HISTORY_FIELDS]
 
 
 # Helper functions for OTP and Payment
+def profiled(endpoint):
+    """Profile the view when request_profiler picks the request"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not request_profiler.enabled or \
+                    not request_profiler.should_profile(request.headers.get('X-Profile')):
+                return view(*args, **kwargs)
+            # The crop and state in the file name let slow combinations be found later
+            body = request.get_json(silent=True)
+            if not isinstance(body, dict):
+                body = {}
+            label = '-'.join(str(part) for part in (
+                endpoint, body.get('crop'), body.get('state') or current_user.state) if part)
+            with request_profiler.profile(label) as path:
+                response = make_response(view(*args, **kwargs))
+            if path:
+                response.headers['X-Profile-File'] = os.path.basename(path)
+            return response
+        return wrapper
+    return decorator
+
+
+def admin_required(view):
+    """
+    Only answer requests with "Authorization: Bearer $ADMIN_TOKEN"
+    
+    DATA_RELOAD_TOKEN is accepted in place of ADMIN_TOKEN. With neither set
+    the route answers 404, as if it did not exist.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = os.getenv('ADMIN_TOKEN') or os.getenv('DATA_RELOAD_TOKEN')
+        if not token:
+            abort(404)
+        # Bytes, since compare_digest refuses non-ASCII text
+        if not secrets.compare_digest(request.headers.get('Authorization', '').encode(),
+                                      f'Bearer {token}'.encode()):
+            abort(401)
+        return view(*args, **kwargs)
+    return wrapper
+
+
 def send_otp_sms(mobile, otp):
-    """Send OTP via SMS using Twilio (placeholder implementation)"""
-    # In production, integrate with Twilio or other SMS service
-    # For demo purposes, we'll just print it
-    print(f"Sending OTP {otp} to {mobile}")
-    # Uncomment below for actual Twilio integration:
-    # from twilio.rest import Client
-    # account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-    # auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-    # client = Client(account_sid, auth_token)
-    # message = client.messages.create(
-    #     body=f"Your (J)ai Kisan OTP is: {otp}",
-    #     from_=os.getenv('TWILIO_PHONE_NUMBER'),
-    #     to=mobile
-    # )
-    return True
+    """Queue the OTP SMS for background delivery (see outbound_queue.py)"""
+    queued = outbound_queue.enqueue(mobile, f"Your (J)ai Kisan OTP is: {otp}")
+    if not queued:
+        print(f"Outbound SMS queue full, OTP for {mobile} dropped")
+    return queued
 
 
 def create_payment_order(amount=11682):  # Amount in paise (₹116.82)
@@ -94,6 +330,8 @@ def create_payment_order(amount=11682):  # Amount in paise (₹116.82)
     # In production, integrate with Razorpay
     # For demo purposes, return a mock order
     print(f"Creating payment order for ₹{amount/100}")
+    if DEMO_GATEWAY_LATENCY:
+        time.sleep(DEMO_GATEWAY_LATENCY)
     # Uncomment below for actual Razorpay integration:
     # import razorpay
     # client = razorpay.Client(
@@ -164,13 +402,7 @@ def register():
         flash('Registration successful! Please verify OTP sent to your mobile.', 'success')
         return redirect(url_for('verify_otp'))
     
-    # Get states for dropdown
-    from data.states_data import STATE_REGIONS
-    states = []
-    for region, region_states in STATE_REGIONS.items():
-        states.extend(region_states)
-    
-    return render_template('register.html', states=states)
+    return render_template('register.html')
 
 
 @app.route('/verify-otp', methods=['GET', 'POST'])
@@ -188,6 +420,7 @@ def verify_otp():
         if user and user.otp == otp:
             user.otp_verified = True
             db.session.commit()
+            user_cache.invalidate(user.id)
             session.pop('pending_user_id', None)
             login_user(user)
             flash('OTP verified successfully! Welcome to (J)ai Kisan!', 'success')
@@ -214,6 +447,7 @@ def login():
                 return redirect(url_for('verify_otp'))
             
             login_user(user)
+            db.session.commit()  # saves an upgraded password hash, if any
             flash('Login successful!', 'success')
             return redirect(url_for('dashboard'))
         else:
@@ -233,6 +467,7 @@ def logout():
 
 @app.route('/dashboard')
 @login_required
+@profiled('dashboard')
 def dashboard():
     """User dashboard - main app interface"""
     # Check trial status
@@ -241,37 +476,266 @@ def dashboard():
     
     trial_remaining = current_user.get_trial_remaining()
     
-    # Get crops and states for dropdowns
-    from data.crops_data import CROP_CATEGORIES
-    from data.states_data import STATE_REGIONS
-    
-    states = []
-    for region, region_states in STATE_REGIONS.items():
-        states.extend(region_states)
-    
+    # Dropdown markup is rendered once per data version; only the user's
+    # own state is marked per request
+    agent = current_agent()
+    dropdowns = dropdown_fragments(agent)
     return render_template('dashboard.html', 
-                         crop_categories=CROP_CATEGORIES,
-                         states=states,
+                         state_options=with_selected(dropdowns.state_options, current_user.state),
                          trial_remaining=trial_remaining)
 
 
 @app.route('/get-recommendation', methods=['POST'])
 @login_required
+@profiled('get_recommendation')
 def get_recommendation():
     """Get fertilizer recommendation"""
     # Check access
     if not current_user.is_trial_active() and current_user.payment_status != 'paid':
         return jsonify({'error': 'Trial expired. Please make payment to continue.'}), 403
     
-    crop = request.json.get('crop')
-    state = request.json.get('state')
-    growth_stage = request.json.get('growth_stage')
+    if not isinstance(request.json, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    key = normalize_key(request.json.get('crop'),
+                        request.json.get('state'),
+                        request.json.get('growth_stage'))
+    if key is None:
+        return jsonify({'error': 'crop, state and growth_stage are required'}), 400
+    
+    # "paddy", "धान" or "UP" are accepted; the cache and history use the
+    # canonical names
+    agent = current_agent()
+    data_version = agent.data.version
+    try:
+        key = agent.resolver.resolve_request(*key)
+    except UnresolvedNameError as e:
+        return jsonify(e.to_dict()), 400
+    
+    # "json" returns the structured recommendation instead of markdown
+    response_format = request.json.get('format', 'markdown')
+    if response_format not in RESPONSE_FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(RESPONSE_FORMATS)}'}), 400
+    key = key + (response_format,)
+    
+    # Optional district and date (YYYY-MM-DD) pick regional dealer prices;
+    # the district defaults to the farmer's own when the state is theirs.
+    # Requests that get the same prices share cache entries
+    district = request.json.get('district')
+    if district is not None and not isinstance(district, str):
+        return jsonify({'error': 'district must be text'}), 400
+    as_of = request.json.get('date')
+    if as_of is not None:
+        try:
+            as_of = date.fromisoformat(as_of)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+    # Without regional prices the district is never looked at
+    price_context = agent.price_context(key[1], None, as_of)
+    if price_context is None:
+        district = None
+    else:
+        if district is None and current_user.state == key[1]:
+            district = current_user.district
+        if district:
+            price_context = agent.price_context(key[1], district, as_of)
+        key = key + price_context
+    
+    # Repeat requests from the dashboard revalidate with If-None-Match
+    etag = make_etag(key, data_version)
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        response_cache.record_not_modified()
+        record_recommendation(*key[:3])
+        response = app.response_class(status=304)
+        response.headers['ETag'] = etag
+        return response
+    
+    cache_key = (data_version,) + key
+    payload = response_cache.get(cache_key)
+    if payload is None:
+        try:
+            recommendation = agent.generate_response(
+                *key[:3], format=response_format, district=district, as_of=as_of
+            )
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        payload = app.json.dumps({'recommendation': recommendation, 'data_version': data_version})
+        response_cache.put(cache_key, payload)
+    record_recommendation(*key[:3])
+    
+    response = app.response_class(payload, mimetype='application/json')
+    response.headers['ETag'] = etag
+    return response
+
+
+@app.route('/get-recommendations', methods=['POST'])
+@login_required
+def get_recommendations():
+    """Get fertilizer recommendations for a batch of plots in one request"""
+    # Check access
+    if not current_user.is_trial_active() and current_user.payment_status != 'paid':
+        return jsonify({'error': 'Trial expired. Please make payment to continue.'}), 403
+    
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        payload = {}
+    items = payload.get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+    if len(items) > MAX_BATCH_ITEMS:
+        return jsonify({'error': f'At most {MAX_BATCH_ITEMS} items per request'}), 413
+    
+    response_format = payload.get('format', 'markdown')
+    if response_format not in RESPONSE_FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(RESPONSE_FORMATS)}'}), 400
     
+    # Per-item problems are reported inside the results, not as a failed request
+    agent = current_agent()
+    results = agent.generate_responses(items, format=response_format)
+    for result in results:
+        if 'recommendation' in result:
+            record_recommendation(result['crop'], result['state'], result['growth_stage'])
+    return jsonify({'results': results, 'data_version': agent.data.version})
+
+
+@app.route('/season-schedule', methods=['POST'])
+@login_required
+def season_schedule():
+    """Whole-season fertilizer plan for a crop from its sowing date"""
+    # Check access
+    if not current_user.is_trial_active() and current_user.payment_status != 'paid':
+        return jsonify({'error': 'Trial expired. Please make payment to continue.'}), 403
+    
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        payload = {}
+    crop = payload.get('crop')
+    if not isinstance(crop, str) or not crop.strip():
+        return jsonify({'error': 'crop and sowing_date are required'}), 400
+    try:
+        sowing_date = date.fromisoformat(payload.get('sowing_date'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'sowing_date must be YYYY-MM-DD'}), 400
+    area_ha = payload.get('area_ha', 1)
+    if (isinstance(area_ha, bool) or not isinstance(area_ha, (int, float))
+            or not 0 < area_ha <= 10000):
+        return jsonify({'error': 'area_ha must be a positive number of hectares'}), 400
+    season = payload.get('season')
+    if season is not None and not isinstance(season, str):
+        return jsonify({'error': 'season must be text'}), 400
+    
+    agent = current_agent()
+    resolution = agent.resolver.crops.resolve(crop.strip())
+    if resolution.name is None:
+        return jsonify(UnresolvedNameError('crop', resolution).to_dict()), 400
+    try:
+        summary = agent.get_season_summary(resolution.name, sowing_date, season)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # summary_only skips expanding the stages (no mixes for the farm's area)
+    result = {'summary': summary, 'data_version': agent.data.version}
+    if payload.get('summary_only'):
+        stages = agent.data.season_calendar.growth_stages
+    else:
+        result['stages'] = list(agent.get_season_schedule(resolution.name, sowing_date,
+                                                          float(area_ha), season))
+        stages = [stage['growth_stage'] for stage in result['stages']]
+    # The schedule does not depend on the state; history keeps the farmer's
+    for growth_stage in stages:
+        record_recommendation(resolution.name, current_user.state, growth_stage)
+    return jsonify(result)
+
+
+@app.route('/cache-stats')
+@admin_required
+def cache_stats():
+    """Hit/miss/eviction counters for the recommendation response and user caches"""
+    return jsonify(dict(response_cache.stats(), data_version=current_agent().data.version,
+                        users=user_cache.stats()))
+
+
+def cache_metric(field):
+    """Collector for one field of the response and user cache stats"""
+    return lambda: {('response',): response_cache.stats()[field],
+                    ('user',): user_cache.stats()[field]}
+
+
+metrics_registry.collected('jai_kisan_cache_hits_total', 'Cache hits', ('cache',),
+                           cache_metric('hits'), type='counter')
+metrics_registry.collected('jai_kisan_cache_misses_total', 'Cache misses', ('cache',),
+                           cache_metric('misses'), type='counter')
+metrics_registry.collected('jai_kisan_cache_hit_ratio', 'Cache hits / lookups since start',
+                           ('cache',), cache_metric('hit_ratio'))
+metrics_registry.collected('jai_kisan_queue_depth', 'Items waiting in background queues',
+                           ('queue',), lambda: {('outbound_sms',): outbound_queue.stats()['depth'],
+                                                ('event_log',): history_log.stats()['depth']})
+metrics_registry.collected('jai_kisan_data_reloads_total', 'Agronomy data reloads by outcome',
+                           ('result',), lambda: {('ok',): data_store.reloads,
+                                                 ('failed',): data_store.failures},
+                           type='counter')
+metrics_registry.collected('jai_kisan_queue_dropped_total', 'Items dropped by full queues',
+                           ('queue',), lambda: {('outbound_sms',): outbound_queue.dropped,
+                                                ('event_log',): history_log.dropped,
+                                                ('password_hash',): password_hasher.rejected},
+                           type='counter')
+
+
+# With METRICS_ENABLED=false nothing is hooked in, so the disabled cost is zero
+if metrics_registry.enabled:
+    app.wsgi_app = RequestMetrics(app.wsgi_app, http_latency, metrics_registry)
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics for this worker process"""
+    token = os.getenv('METRICS_TOKEN')
+    if token and not secrets.compare_digest(request.headers.get('Authorization', '').encode(),
+                                            f'Bearer {token}'.encode()):
+        abort(401)
+    return app.response_class(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+@app.route('/admin/reload-data', methods=['POST'])
+@admin_required
+def reload_data():
+    """Load changed agronomy data files into this worker and report the data version"""
     try:
-        recommendation = jai_kisan_agent.generate_response(crop, state, growth_stage)
-        return jsonify({'recommendation': recommendation})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        result = data_store.reload(force=request.args.get('force') == '1')
+    except DataFileError as e:
+        # The worker keeps serving the data it had
+        return jsonify(dict(data_store.stats(), error=str(e))), 422
+    except Exception:
+        # Valid files that failed to build; also kept, and in last_error
+        return jsonify(dict(data_store.stats(), error=data_store.last_error)), 500
+    return jsonify(dict(data_store.stats(), **result))
+
+
+@app.route('/outbound-stats')
+@admin_required
+def outbound_stats():
+    """Depth, delivery counters and latency of the outbound SMS queue"""
+    return jsonify(outbound_queue.stats())
+
+
+@app.route('/event-log-stats')
+@admin_required
+def event_log_stats():
+    """Buffer depth, written/dropped counters and batch write times of the history log"""
+    return jsonify(history_log.stats())
+
+
+@app.route('/profile-stats')
+@admin_required
+def profile_stats():
+    """Requests profiled and skipped, and profiles on disk"""
+    return jsonify(request_profiler.stats())
+
+
+@app.route('/hash-stats')
+@admin_required
+def hash_stats():
+    """Latency of password hashing and verification, queue waits and rejections"""
+    return jsonify(password_hasher.stats())
 
 
 @app.route('/payment')
@@ -282,6 +746,10 @@ def payment():
         flash('You already have an active subscription', 'info')
         return redirect(url_for('dashboard'))
     
+    # Return the pooled DB connection (if this request used one) before
+    # waiting on the payment gateway
+    db.session.close()
+    
     # Create payment order
     order = create_payment_order()
     
@@ -300,9 +768,11 @@ def payment_success():
     signature = request.form.get('signature')
     
     # Update user payment status
-    current_user.payment_status = 'paid'
-    current_user.payment_date = datetime.utcnow()
+    user = current_user.get_user()
+    user.payment_status = 'paid'
+    user.payment_date = datetime.utcnow()
     db.session.commit()
+    user_cache.invalidate(user.id)
     
     flash('Payment successful! You now have full access to (J)ai Kisan.', 'success')
     return redirect(url_for('dashboard'))
@@ -311,46 +781,68 @@ def payment_success():
 @app.route('/download')
 @login_required
 def download():
-    """Download user's recommendation history or summary"""
+    """Download the user's recommendation history as CSV (default) or JSON Lines"""
     # Check access
     if not current_user.is_trial_active() and current_user.payment_status != 'paid':
         flash('Trial expired. Please make payment to continue.', 'error')
         return redirect(url_for('payment'))
     
-    # For demo, create a simple text file with user info
-    content = f"""
-(J)ai Kisan - User Report
-========================
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(EXPORT_FORMATS)}'}), 400
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    
+    # Include recommendations this process has not written yet
+    history_log.flush()
+    
+    # Rows are fetched HISTORY_EXPORT_CHUNK at a time and encoded as they
+    # arrive, so memory stays flat however long the history is
+    query = (db.select(*history_columns())
+             .where(RecommendationHistory.user_id == current_user.id)
+             .order_by(RecommendationHistory.id)
+             .execution_options(yield_per=HISTORY_EXPORT_CHUNK))
+    rows = db.session.execute(query)
+    
+    response = app.response_class(
+        stream_with_context(encode_history(rows, export_format, HISTORY_EXPORT_CHUNK)),
+        mimetype=mimetype
+    )
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename=jai_kisan_history_{current_user.id}.{extension}'
+    )
+    return response
 
-User: {current_user.full_name}
-Mobile: {current_user.mobile}
-State: {current_user.state}
-Occupation: {current_user.occupation}
-Registration Date: {current_user.registration_date.strftime('%Y-%m-%d %H:%M')}
-Payment Status: {current_user.payment_status}
 
-Thank you for using (J)ai Kisan!
-जय किसान! (Victory to the Farmers!)
-"""
-    
-    # Create temp file - it will be sent and then we clean it up
-    import tempfile
-    import os as os_module
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-        f.write(content)
-        temp_path = f.name
+@app.route('/api/history')
+@login_required
+def api_history():
+    """
+    Recommendation history, newest first, one keyset page at a time
     
+    Pass the returned next_before as ?before= to get the next page; it is
+    null on the last page. ?limit= sets the page size (at most 500).
+    """
     try:
-        return send_file(temp_path, 
-                        as_attachment=True, 
-                        download_name=f'jai_kisan_report_{current_user.id}.txt',
-                        mimetype='text/plain')
-    finally:
-        # Clean up temp file after sending
-        try:
-            os_module.remove(temp_path)
-        except:
-            pass
+        limit = min(int(request.args.get('limit', HISTORY_PAGE_DEFAULT)), HISTORY_PAGE_MAX)
+        before = request.args.get('before', type=int)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    
+    history_log.flush()
+    query = db.select(*history_columns()).where(RecommendationHistory.user_id == current_user.id)
+    if before is not None:
+        query = query.where(RecommendationHistory.id < before)
+    # One extra row tells whether another page exists
+    rows = db.session.execute(
+        query.order_by(RecommendationHistory.id.desc()).limit(limit + 1)
+    ).all()
+    
+    items = [row_to_dict(row) for row in rows[:limit]]
+    next_before = items[-1]['id'] if len(rows) > limit else None
+    return jsonify({'items': items, 'next_before': next_before,
+                    'data_version': current_agent().data.version})
 
 
 @app.route('/google-auth')
@@ -361,16 +853,68 @@ def google_auth():
     return redirect(url_for('register'))
 
 
+@app.context_processor
+def inject_dropdowns():
+    """Cached dropdown fragments for every template (registration, dashboard)"""
+    agent = current_agent()
+    return {'dropdowns': dropdown_fragments(agent)}
+
+
+@app.template_global()
+def asset_url(path):
+    """
+    URL for a file under static/ or public/, e.g. asset_url('static/css/style.css')
+    
+    Points at the fingerprinted copy when build_assets.py has been run.
+    """
+    built = asset_manifest.lookup(path)
+    if built:
+        return url_for('serve_asset', filename=built)
+    folder, _, filename = path.partition('/')
+    if folder == 'static':
+        return url_for('static', filename=filename)
+    return url_for('serve_public', filename=filename)
+
+
+def send_built_asset(built, max_age, immutable=False):
+    """Send a file from dist/, precompressed if the client accepts it"""
+    resolved = asset_manifest.resolve(built, request.accept_encodings)
+    if resolved is None:
+        abort(404)
+    path, encoding = resolved
+    response = send_from_directory(asset_manifest.directory, path,
+                                   mimetype=mimetypes.guess_type(built)[0],
+                                   max_age=max_age)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = immutable
+    return response
+
+
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Fingerprinted assets never change under the same name: cache for a year"""
+    return send_built_asset(filename, ASSET_MAX_AGE, immutable=True)
+
+
 @app.route('/public/<path:filename>')
 def serve_public(filename):
     """Serve files from public directory"""
-    from flask import send_from_directory
-    return send_from_directory('public', filename)
+    built = asset_manifest.lookup(f'public/{filename}')
+    if built:
+        return send_built_asset(built, PUBLIC_MAX_AGE)
+    return send_from_directory('public', filename, max_age=PUBLIC_MAX_AGE)
 
 
 # Initialize database
 with app.app_context():
+    configure_engine(db.engine)  # WAL and busy timeout for SQLite
+    if metrics_registry.enabled:
+        instrument_engine(db.engine, db_latency, metrics_registry)
     db.create_all()
+    ensure_indexes(db)
 
 
 if __name__ == '__main__':
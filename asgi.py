@@ -0,0 +1,23 @@
+"""
+(J)ai Kisan - ASGI Entry Point
+Serves the Flask app from an ASGI server such as uvicorn or hypercorn
+
+Usage:
+    pip install uvicorn a2wsgi
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 2
+
+The event loop accepts and parks connections (including slow clients and
+keep-alive sockets) while each Flask request runs on a thread pool of
+ASGI_THREADS threads, so views waiting on Twilio or Razorpay do not stop
+other requests from being served.
+"""
+
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import app as flask_app
+
+# asgiref's WsgiToAsgi runs every request on a single shared thread, which
+# serializes them; a2wsgi uses a real pool
+app = WSGIMiddleware(flask_app, workers=int(os.getenv("ASGI_THREADS", "32")))
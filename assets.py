@@ -0,0 +1,71 @@
+"""
+(J)ai Kisan - Static Assets
+Looks up fingerprinted files written by build_assets.py and picks the
+precompressed variant a client accepts
+"""
+
+import json
+import os
+
+from build_assets import MANIFEST_NAME
+
+# Preferred first; identity is the fallback
+ENCODING_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetManifest:
+    """
+    The build manifest of one output directory
+
+    Without a build (no manifest.json) the manifest is empty and every
+    lookup returns None, so templates fall back to the unhashed URLs.
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory: Output directory of build_assets.py, e.g. dist/
+        """
+        self.directory = directory
+        self.files = {}
+        path = os.path.join(directory, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.files = json.load(f)["files"]
+        self._encodings = {entry["path"]: entry["encodings"] for entry in self.files.values()}
+
+    def __len__(self):
+        return len(self.files)
+
+    def lookup(self, source):
+        """
+        Fingerprinted path for a source file
+
+        Args:
+            source: Path relative to the project, e.g. "static/css/style.css"
+
+        Returns:
+            Path inside the output directory, or None if it was not built
+        """
+        entry = self.files.get(source)
+        return entry["path"] if entry else None
+
+    def resolve(self, path, accept_encodings):
+        """
+        Choose the file to send for a fingerprinted path
+
+        Args:
+            path: Path inside the output directory
+            accept_encodings: Werkzeug Accept object (request.accept_encodings)
+
+        Returns:
+            Tuple of (file path inside the output directory, Content-Encoding
+            or None), or None if path is not a built asset
+        """
+        encodings = self._encodings.get(path)
+        if encodings is None:
+            return None
+        for encoding, suffix in ENCODING_SUFFIXES:
+            if encoding in encodings and accept_encodings.quality(encoding) > 0:
+                return path + suffix, encoding
+        return path, None
@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for (J)ai Kisan
+Measures agent and web hot paths and guards against performance regressions
+
+Usage:
+    python benchmark.py                          # run everything, print a table
+    python benchmark.py --only agent             # benchmarks whose name contains "agent"
+    python benchmark.py --save-baseline base.json
+    python benchmark.py --baseline base.json --threshold 0.25
+    python benchmark.py --db-writers 4               # SQLite write throughput
+    python benchmark.py --metrics-overhead           # cost of /metrics instrumentation
+
+With --baseline, the run fails (exit status 1) when any benchmark's p50
+latency is slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from jai_kisan_agent import JaiKisanAgent
+
+# name -> factory returning op(i); registered with @benchmark
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark factory under name"""
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+def print_header(title):
+    """Print a formatted header"""
+    print("\n" + "=" * 80)
+    print(title.center(80))
+    print("=" * 80 + "\n")
+
+
+def all_combinations(agent):
+    """Every crop × state × growth stage combination the agent knows about"""
+    return [
+        (crop, state, growth_stage)
+        for crop in agent.get_all_crops()
+        for state in agent.get_all_states()
+        for growth_stage in agent.get_growth_stages()
+    ]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(op, min_time=1.0, max_ops=200000, min_ops=20, warmup=50, alloc_ops=200):
+    """
+    Time op(i) repeatedly and sample its memory allocations
+
+    Args:
+        op: Callable taking the iteration number
+        min_time: Keep timing until this many seconds have been spent in op
+        max_ops: Stop after this many timed calls even if min_time is not reached
+        min_ops: Always take at least this many timing samples
+        warmup: Untimed calls made first
+        alloc_ops: Calls made under tracemalloc to sample allocations
+
+    Returns:
+        Dictionary with ops, ops_per_sec, mean/p50/p99 latency (µs) and
+        allocation figures
+    """
+    for i in range(warmup):
+        op(i)
+
+    # Sub-microsecond operations are timed in small batches so that clock
+    # overhead and jitter do not dominate; each sample is the batch average.
+    clock = time.perf_counter_ns
+    batch = 0
+    start = clock()
+    while clock() - start < 20000:
+        op(batch)
+        batch += 1
+    batch = max(1, batch)
+
+    timings = []
+    spent = 0
+    budget = int(min_time * 1e9)
+    i = 0
+    while len(timings) < min_ops or (spent < budget and i < max_ops):
+        start = clock()
+        for _ in range(batch):
+            op(i)
+            i += 1
+        elapsed = clock() - start
+        timings.append(elapsed / batch)
+        spent += elapsed
+
+    timings.sort()
+    samples = min(alloc_ops, len(timings))
+    retained = 0
+    peak = 0
+    tracemalloc.start()
+    try:
+        for j in range(samples):
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            op(j)
+            current, op_peak = tracemalloc.get_traced_memory()
+            retained += max(0, current - before)
+            peak = max(peak, op_peak - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ops": i,
+        "ops_per_sec": round(i / (spent / 1e9), 1),
+        "mean_us": round(spent / i / 1000, 3),
+        "p50_us": round(percentile(timings, 0.50) / 1000, 3),
+        "p99_us": round(percentile(timings, 0.99) / 1000, 3),
+        "retained_bytes_per_op": round(retained / samples),
+        "peak_alloc_kib": round(peak / 1024, 1),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Agent benchmarks
+# ---------------------------------------------------------------------------
+
+@benchmark("agent.get_npk_requirement")
+def bench_npk_requirement():
+    agent = JaiKisanAgent()
+    pairs = [(crop, stage) for crop in agent.get_all_crops()
+             for stage in agent.get_growth_stages()]
+    return lambda i: agent.get_npk_requirement(*pairs[i % len(pairs)])
+
+
+@benchmark("agent.get_fertilizer_recommendations")
+def bench_fertilizer_recommendations():
+    agent = JaiKisanAgent()
+    combinations = all_combinations(agent)
+    return lambda i: agent.get_fertilizer_recommendations(*combinations[i % len(combinations)])
+
+
+@benchmark("agent.generate_response")
+def bench_generate_response():
+    agent = JaiKisanAgent()
+    combinations = all_combinations(agent)
+    return lambda i: agent.generate_response(*combinations[i % len(combinations)])
+
+
+@benchmark("agent.generate_response[precomputed]")
+def bench_generate_response_precomputed():
+    agent = JaiKisanAgent(precompute=True)
+    combinations = all_combinations(agent)
+    return lambda i: agent.generate_response(*combinations[i % len(combinations)])
+
+
+@benchmark("agent.generate_response[json]")
+def bench_generate_response_json():
+    agent = JaiKisanAgent()
+    combinations = all_combinations(agent)
+    return lambda i: agent.generate_response(*combinations[i % len(combinations)],
+                                             format="json")
+
+
+@benchmark("agent.render_markdown")
+def bench_render_markdown():
+    agent = JaiKisanAgent()
+    recommendations = [agent.get_fertilizer_recommendations(*combo)
+                       for combo in all_combinations(agent)]
+    return lambda i: agent.renderer.render(recommendations[i % len(recommendations)])
+
+
+@benchmark("mix.solve")
+def bench_mix_solve():
+    agent = JaiKisanAgent()
+    pairs = [(crop, stage) for crop in agent.get_all_crops()
+             for stage in agent.get_growth_stages()]
+    return lambda i: agent.get_fertilizer_mix(*pairs[i % len(pairs)], area_ha=1.0)
+
+
+@benchmark("mix.solve_batch[1000 farms]")
+def bench_mix_solve_batch():
+    agent = JaiKisanAgent()
+    requirements = [agent.get_npk_requirement(crop, stage) or {"N": 0, "P": 0, "K": 0}
+                    for crop in agent.get_all_crops() for stage in agent.get_growth_stages()]
+    rows = [[r["N"], r["P"], r["K"]] for r in requirements]
+    farms = [rows[i % len(rows)] for i in range(1000)]
+    areas = [0.5 + (i % 8) * 0.25 for i in range(1000)]
+    return lambda i: agent.mix_solver.solve_batch(farms, areas)
+
+
+# ---------------------------------------------------------------------------
+# Web benchmarks (Flask test client against a temporary SQLite database)
+# ---------------------------------------------------------------------------
+
+_WEB = {}
+
+BENCH_MOBILE = "9000000000"
+BENCH_PASSWORD = "bench-password"
+
+
+def web_client():
+    """Import the web app against a throwaway database; return (app module, client)"""
+    if not _WEB:
+        db_dir = tempfile.mkdtemp(prefix="jai_kisan_bench_")
+        os.environ["DATABASE_URI"] = "sqlite:///" + os.path.join(db_dir, "bench.db")
+        os.environ.setdefault("SECRET_KEY", "benchmark")
+
+        import app as web
+
+        with web.app.app_context():
+            user = web.User(full_name="Bench Farmer", mobile=BENCH_MOBILE,
+                            state="Punjab", occupation="Farmer", otp_verified=True)
+            user.set_password(BENCH_PASSWORD)
+            web.db.session.add(user)
+            web.db.session.commit()
+
+        client = web.app.test_client()
+        response = client.post("/login", data={"mobile": BENCH_MOBILE,
+                                               "password": BENCH_PASSWORD})
+        assert response.status_code == 302, response.status_code
+        _WEB["web"] = web
+        _WEB["client"] = client
+    return _WEB["web"], _WEB["client"]
+
+
+def check_status(response, *expected):
+    """Fail the benchmark loudly if a route stops answering as expected"""
+    assert response.status_code in expected, response.status_code
+    return response
+
+
+@benchmark("web.get_recommendation")
+def bench_route_get_recommendation():
+    web, client = web_client()
+    combinations = all_combinations(web.data_store.current)
+
+    def op(i):
+        crop, state, growth_stage = combinations[i % len(combinations)]
+        check_status(client.post("/get-recommendation", json={
+            "crop": crop, "state": state, "growth_stage": growth_stage
+        }), 200)
+    return op
+
+
+@benchmark("web.dashboard")
+def bench_route_dashboard():
+    _, client = web_client()
+    return lambda i: check_status(client.get("/dashboard"), 200)
+
+
+@benchmark("web.login")
+def bench_route_login():
+    web, _ = web_client()
+    client = web.app.test_client()
+    return lambda i: check_status(client.post("/login", data={
+        "mobile": BENCH_MOBILE, "password": BENCH_PASSWORD
+    }), 302)
+
+
+# ---------------------------------------------------------------------------
+# Database write throughput (concurrent registrations from several processes)
+# ---------------------------------------------------------------------------
+
+def _registration_writer(job):
+    """Insert users back to back for a while, like /register does; run in a child process"""
+    from sqlalchemy import create_engine, insert, select
+    from sqlalchemy.exc import OperationalError
+    from app import User
+    from db_config import engine_options, configure_engine
+
+    uri, tuned, seconds, worker = job
+    engine = create_engine(uri, **(engine_options(uri) if tuned else {}))
+    if tuned:
+        configure_engine(engine)
+    table = User.__table__
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < deadline:
+        mobile = f"8{worker:03d}{n:06d}"
+        n += 1
+        start = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                conn.execute(select(table.c.id).where(table.c.mobile == mobile)).first()
+                conn.execute(insert(table).values(
+                    full_name="Bench Farmer", mobile=mobile, state="Punjab",
+                    occupation="Farmer", otp="123456", otp_verified=False,
+                    payment_status="trial", registration_date=datetime.utcnow()))
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    engine.dispose()
+    return latencies, errors
+
+
+def db_write_throughput(processes, seconds, tuned):
+    """
+    Commits per second with several processes registering users at once
+
+    Args:
+        processes: Number of concurrent writer processes (like gunicorn workers)
+        seconds: How long each writer runs
+        tuned: Use db_config (WAL, synchronous=NORMAL, busy timeout) or
+            SQLAlchemy's defaults
+
+    Returns:
+        Dictionary with commits, commits_per_sec, p50/p99 commit latency (ms)
+        and lock errors
+    """
+    from sqlalchemy import create_engine
+
+    web, _ = web_client()
+    uri = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="jai_kisan_dbw_"), "writes.db")
+    engine = create_engine(uri)
+    web.db.metadata.create_all(engine)
+    engine.dispose()
+
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_registration_writer,
+                           [(uri, tuned, seconds, worker) for worker in range(processes)])
+
+    latencies = sorted(l for worker_latencies, _ in results for l in worker_latencies)
+    commits = len(latencies)
+    return {
+        "commits": commits,
+        "commits_per_sec": round(commits / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if commits else 0.0,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if commits else 0.0,
+        "lock_errors": sum(errors for _, errors in results),
+    }
+
+
+def run_db_writes(processes, seconds):
+    """Compare default and tuned SQLite settings under concurrent registrations"""
+    print_header(f"SQLite write throughput ({processes} writer processes, {seconds:g}s)")
+    print(f"{'settings':<24} {'commits/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'lock errors':>12}")
+    print("-" * 68)
+    results = {}
+    for label, tuned in (("default", False), ("tuned (db_config)", True)):
+        stats = db_write_throughput(processes, seconds, tuned)
+        results[label] = stats
+        print(f"{label:<24} {stats['commits_per_sec']:>10,.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['lock_errors']:>12}")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Recommendation event log (commit per request vs write-behind batches)
+# ---------------------------------------------------------------------------
+
+def event_log_throughput(events, write_behind):
+    """
+    Record recommendation events one commit each, or through the write-behind log
+
+    Args:
+        events: Number of events to record
+        write_behind: Use event_log.WriteBehindLog instead of a commit per event
+
+    Returns:
+        Dictionary with events_per_sec (until every event is committed) and
+        p50/p99 of the per-request recording call in microseconds
+    """
+    from sqlalchemy import create_engine
+    from db_config import engine_options, configure_engine
+    from event_log import WriteBehindLog
+
+    web, _ = web_client()
+    uri = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="jai_kisan_events_"), "events.db")
+    engine = create_engine(uri, **engine_options(uri))
+    configure_engine(engine)
+    web.db.metadata.create_all(engine)
+    table = web.RecommendationHistory.__table__
+
+    def write(batch):
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+
+    # "block" so that a producer faster than the writer waits instead of dropping
+    log = WriteBehindLog(write, policy="block", block_timeout=5.0) if write_behind else None
+    latencies = []
+    started = time.perf_counter()
+    for i in range(events):
+        event = {"user_id": 1, "crop": "Wheat", "state": "Punjab",
+                 "growth_stage": "Sowing/Early Growth", "data_version": "bench",
+                 "created_at": datetime.utcnow()}
+        call = time.perf_counter()
+        if log is not None:
+            log.append(event)
+        else:
+            write([event])
+        latencies.append(time.perf_counter() - call)
+    if log is not None:
+        log.stop()
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        stored = conn.execute(table.select().with_only_columns(table.c.id)).all()
+    engine.dispose()
+    assert len(stored) == events, (len(stored), events)
+
+    latencies.sort()
+    return {
+        "events_per_sec": round(events / elapsed, 1),
+        "p50_us": round(percentile(latencies, 0.50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 1),
+        "batches": log.batches if log is not None else events,
+    }
+
+
+def run_event_log(events):
+    """Compare per-request commits with the write-behind event log"""
+    print_header(f"Recommendation event log ({events:,} events)")
+    print(f"{'mode':<24} {'events/s':>10} {'call p50 µs':>12} {'call p99 µs':>12} {'commits':>8}")
+    print("-" * 70)
+    results = {}
+    for label, write_behind in (("commit per request", False), ("write-behind", True)):
+        stats = event_log_throughput(events, write_behind)
+        results[label] = stats
+        print(f"{label:<24} {stats['events_per_sec']:>10,.1f} {stats['p50_us']:>12.1f} "
+              f"{stats['p99_us']:>12.1f} {stats['batches']:>8,}")
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Metrics instrumentation overhead (recording on vs off, interleaved rounds)
+# ---------------------------------------------------------------------------
+
+AGENT_METRIC_METHODS = ("generate_response", "get_fertilizer_recommendations",
+                        "_get_price_comparison")
+
+
+def paired_overhead(op, switch, pairs=200, block_ops=20):
+    """
+    Relative cost of a switchable feature, from closely interleaved blocks
+
+    Blocks of block_ops calls alternate between off and on (in alternating
+    order), so that drift and noise hit both sides alike; the result is the
+    median of the on/off time ratios of each pair.
+
+    Args:
+        op: Callable taking the iteration number
+        switch: Callable taking True/False that turns the feature on or off
+        pairs: Number of off/on block pairs
+        block_ops: Calls per block
+
+    Returns:
+        Dictionary with off/on mean latency (µs) and overhead (fraction)
+    """
+    clock = time.perf_counter_ns
+    for enabled in (False, True):
+        switch(enabled)
+        for i in range(block_ops * 5):
+            op(i)
+
+    totals = {False: 0, True: 0}
+    ratios = []
+    i = 0
+    for pair in range(pairs):
+        elapsed = {}
+        for enabled in ((False, True) if pair % 2 == 0 else (True, False)):
+            switch(enabled)
+            start = clock()
+            for _ in range(block_ops):
+                op(i)
+                i += 1
+            elapsed[enabled] = clock() - start
+            totals[enabled] += elapsed[enabled]
+        ratios.append(elapsed[True] / elapsed[False])
+    switch(True)
+
+    ratios.sort()
+    ops = pairs * block_ops
+    return {
+        "off": round(totals[False] / ops / 1000, 2),
+        "on": round(totals[True] / ops / 1000, 2),
+        "overhead": percentile(ratios, 0.50) - 1,
+    }
+
+
+def metrics_overhead(pairs):
+    """
+    Cost of metrics recording on the recommendation path
+
+    The web side toggles the app's registry (METRICS_ENABLED=false at
+    startup goes further and installs no hooks at all). "cached" repeats
+    256 combinations, which the response cache serves; "uncached" cycles
+    through every combination, more than the cache holds, so each request
+    also runs (and times) the agent. The agent side compares a plain
+    JaiKisanAgent with one whose three methods are timed, called directly
+    without the request around them.
+
+    Returns:
+        {path: paired_overhead() result}
+    """
+    from metrics import MetricsRegistry, instrument_methods
+
+    web, client = web_client()
+    combinations = all_combinations(web.data_store.current)
+
+    def switch_web(enabled):
+        web.metrics_registry.enabled = enabled
+
+    def route_op(count):
+        def op(i):
+            crop, state, growth_stage = combinations[i % count]
+            check_status(client.post("/get-recommendation", json={
+                "crop": crop, "state": state, "growth_stage": growth_stage
+            }), 200)
+        return op
+
+    plain = JaiKisanAgent()
+    timed = JaiKisanAgent()
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_agent_seconds", "Agent call time", ("function",))
+    instrument_methods(timed, histogram, AGENT_METRIC_METHODS, registry)
+    current = [plain]
+
+    def switch_agent(enabled):
+        current[0] = timed if enabled else plain
+
+    def agent_op(i):
+        current[0].generate_response(*combinations[i % len(combinations)])
+
+    return {
+        "web.get_recommendation cached": paired_overhead(
+            route_op(256), switch_web, pairs, block_ops=20),
+        "web.get_recommendation uncached": paired_overhead(
+            route_op(len(combinations)), switch_web, pairs, block_ops=20),
+        "agent.generate_response": paired_overhead(
+            agent_op, switch_agent, pairs, block_ops=2000),
+    }
+
+
+def run_metrics_overhead(pairs, budget=0.02):
+    """Report instrumentation overhead; fail if a recommendation request exceeds budget"""
+    print_header(f"Metrics overhead ({pairs} interleaved off/on pairs, budget {budget:.0%})")
+    print(f"{'path':<34} {'off µs':>9} {'on µs':>9} {'overhead':>10}")
+    print("-" * 66)
+    results = metrics_overhead(pairs)
+    over = []
+    for path, stats in results.items():
+        flag = ""
+        if path.startswith("web."):
+            flag = "ok" if stats["overhead"] <= budget else "OVER BUDGET"
+            if stats["overhead"] > budget:
+                over.append(path)
+        print(f"{path:<34} {stats['off']:>9.2f} {stats['on']:>9.2f} "
+              f"{stats['overhead']:>+10.2%} {flag}")
+    agent = results["agent.generate_response"]
+    print(f"\nTiming the three agent methods costs {agent['on'] - agent['off']:.2f} µs "
+          f"per uncached recommendation")
+    return 1 if over else 0
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def run(names, min_time):
+    """Run the named benchmarks, printing one table row each, and return their results"""
+    results = {}
+    for name in names:
+        op = BENCHMARKS[name]()
+        stats = measure(op, min_time=min_time)
+        results[name] = stats
+        print(f"{name:<40} {stats['ops_per_sec']:>11,.0f} {stats['p50_us']:>10.1f} "
+              f"{stats['p99_us']:>10.1f} {stats['retained_bytes_per_op']:>8} "
+              f"{stats['peak_alloc_kib']:>9.1f}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare p50 latencies with a baseline
+
+    Returns:
+        List of (name, baseline p50, current p50) for every regression
+    """
+    regressions = []
+    print_header(f"Comparison with baseline (threshold +{threshold:.0%})")
+    for name, stats in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"{name:<40} (no baseline)")
+            continue
+        change = stats["p50_us"] / old["p50_us"] - 1 if old["p50_us"] else 0.0
+        flag = "REGRESSION" if change > threshold else "ok"
+        print(f"{name:<40} {old['p50_us']:>10.1f} -> {stats['p50_us']:>10.1f} µs "
+              f"({change:+.1%}) {flag}")
+        if change > threshold:
+            regressions.append((name, old["p50_us"], stats["p50_us"]))
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description="(J)ai Kisan benchmark suite")
+    parser.add_argument("--only", action="append", default=[],
+                        help="only run benchmarks whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=1.0,
+                        help="seconds of timed work per benchmark (default: 1.0)")
+    parser.add_argument("--save-baseline", metavar="PATH",
+                        help="write results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed p50 slowdown vs baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    parser.add_argument("--db-writers", type=int, metavar="N",
+                        help="instead, measure SQLite commits/s with N concurrent writer processes")
+    parser.add_argument("--db-seconds", type=float, default=5.0,
+                        help="seconds per --db-writers run (default: 5)")
+    parser.add_argument("--event-log", type=int, metavar="N",
+                        help="instead, record N recommendation events with and without write-behind")
+    parser.add_argument("--metrics-overhead", action="store_true",
+                        help="instead, compare the recommendation path with metrics on and off")
+    parser.add_argument("--pairs", type=int, default=500,
+                        help="off/on block pairs for --metrics-overhead (default: 500)")
+    args = parser.parse_args(argv)
+
+    if args.metrics_overhead:
+        return run_metrics_overhead(args.pairs)
+
+    if args.event_log:
+        run_event_log(args.event_log)
+        return 0
+
+    if args.db_writers:
+        run_db_writes(args.db_writers, args.db_seconds)
+        return 0
+
+    names = [name for name in BENCHMARKS
+             if not args.only or any(part in name for part in args.only)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        parser.error("no benchmark matches --only")
+
+    print_header("(J)ai Kisan Benchmarks")
+    print(f"{'benchmark':<40} {'ops/sec':>11} {'p50 µs':>10} {'p99 µs':>10} "
+          f"{'B/op':>8} {'peak KiB':>9}")
+    print("-" * 93)
+    results = run(names, args.min_time)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed beyond the threshold")
+            return 1
+        print("\nNo regressions beyond the threshold")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
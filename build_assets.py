@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Static Asset Build for (J)ai Kisan
+Fingerprints static/ and public/ files and writes precompressed variants
+
+Usage:
+    python build_assets.py                 # writes dist/ and dist/manifest.json
+    python build_assets.py --output build/assets
+
+Every file is copied to the output directory with a content hash in its
+name (static/css/style.css -> static/css/style.3f9c2a81d0b4.css), so it can
+be cached forever: a changed file gets a new name. Text assets also get
+.gz and, if the brotli package is installed, .br variants. The manifest
+maps original paths to fingerprinted ones and is read by assets.py at
+startup. Run it as part of every deploy, before starting the server.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SOURCE_DIRS = ("static", "public")
+DEFAULT_OUTPUT = "dist"
+MANIFEST_NAME = "manifest.json"
+
+# Already-compressed formats (images, fonts) gain nothing from gzip/brotli
+COMPRESSIBLE = {".css", ".js", ".svg", ".html", ".json", ".txt", ".xml", ".map", ".ico"}
+
+# Variants smaller than this fraction of the original are not worth serving
+MIN_SAVING = 0.95
+
+
+def fingerprint(path):
+    """First 12 hex digits of a file's SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def hashed_name(relative_path, digest):
+    """Insert digest before the extension: css/style.css -> css/style.<digest>.css"""
+    root, ext = os.path.splitext(relative_path)
+    return f"{root}.{digest}{ext}"
+
+
+def write_compressed(path, data):
+    """
+    Write .gz and .br variants of data next to path
+
+    Returns:
+        List of encodings written ("br", "gzip")
+    """
+    encodings = []
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data) * MIN_SAVING:
+            with open(path + ".br", "wb") as f:
+                f.write(compressed)
+            encodings.append("br")
+    # mtime=0 keeps the output byte-identical between builds
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data) * MIN_SAVING:
+        with open(path + ".gz", "wb") as f:
+            f.write(compressed)
+        encodings.append("gzip")
+    return encodings
+
+
+def build_assets(root=".", output=DEFAULT_OUTPUT, sources=SOURCE_DIRS):
+    """
+    Fingerprint and precompress every file under the source directories
+
+    Args:
+        root: Project directory containing the source directories
+        output: Output directory (relative to root), replaced on each build
+        sources: Source directory names
+
+    Returns:
+        Tuple of (manifest as written to <output>/manifest.json,
+        {source path: {encoding: size in bytes}})
+    """
+    output_dir = os.path.join(root, output)
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+
+    files = {}
+    sizes = {}
+    for source in sources:
+        for dirpath, _, filenames in os.walk(os.path.join(root, source)):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                relative = os.path.relpath(path, root).replace(os.sep, "/")
+                target = hashed_name(relative, fingerprint(path))
+                target_path = os.path.join(output_dir, target)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                shutil.copyfile(path, target_path)
+
+                encodings = []
+                if os.path.splitext(filename)[1].lower() in COMPRESSIBLE:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    encodings = write_compressed(target_path, data)
+                files[relative] = {"path": target, "encodings": encodings}
+                sizes[relative] = {
+                    encoding: os.path.getsize(target_path + suffix)
+                    for encoding, suffix in (("identity", ""), ("gzip", ".gz"), ("br", ".br"))
+                    if encoding == "identity" or encoding in encodings
+                }
+
+    manifest = {"files": files}
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest, sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets")
+    parser.add_argument("--root", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="project directory (default: this file's directory)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help=f"output directory under the root (default: {DEFAULT_OUTPUT})")
+    args = parser.parse_args(argv)
+
+    manifest, sizes = build_assets(args.root, args.output)
+    for source, entry in sorted(manifest["files"].items()):
+        variants = ", ".join(f"{encoding} {size:,} B" for encoding, size in sizes[source].items())
+        print(f"{source} -> {entry['path']} ({variants})")
+    if brotli is None:
+        print("brotli not installed: wrote gzip variants only (pip install brotli)", file=sys.stderr)
+    print(f"Wrote {len(manifest['files'])} assets to {os.path.join(args.output, MANIFEST_NAME)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
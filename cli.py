@@ -1,14 +1,62 @@
 """
 (J)ai Kisan - Command Line Interface
 Interactive tool for farmers to get fertilizer recommendations
+
+Usage:
+    python cli.py                                              # interactive menus
+    python cli.py plan --input farms.csv --output plans.jsonl  # bulk planning
+    python cli.py plan --input farms.csv --output plans.jsonl --workers 4
+    python cli.py schedule --crop wheat --sowing-date 2026-11-05 --area 2
+
+Bulk planning reads a CSV with crop, state and growth_stage columns (plus
+optional area_ha and district columns) and writes one JSON line per row, streaming both
+ends so memory use stays flat however large the file is. Names may be
+written as farmers write them ("paddy", "धान", "UP"); see data/resolver.py.
+
+The schedule command prints a crop's whole season from its sowing date,
+stage by stage as each one is worked out, followed by the season totals.
 """
 
+import argparse
+import csv
+import json
 import sys
+import time
+from collections import deque
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
 from jai_kisan_agent import JaiKisanAgent
+from response_renderer import to_json_dict
+from data.resolver import UnresolvedNameError
+
+
+def typed_choice(text, index):
+    """
+    Resolve a name typed at a menu prompt instead of a number
+    
+    Args:
+        text: What the user typed
+        index: NameIndex of the menu's names, or None for number-only menus
+    
+    Returns:
+        Canonical name, or None after telling the user what went wrong
+    """
+    if index is not None and text.strip():
+        resolution = index.resolve(text)
+        if resolution.name is not None:
+            return resolution.name
+        if resolution.candidates:
+            print("Did you mean: " + ", ".join(name for name, _ in resolution.candidates) + "?")
+            return None
+    print("Please enter a valid number" + (" or name" if index is not None else ""))
+    return None
 
 
-def display_menu(title, options):
-    """Display a menu and get user selection"""
+def display_menu(title, options, index=None):
+    """Display a menu and get user selection (by number, or by name with an index)"""
     print(f"\n{title}")
     print("-" * len(title))
     for i, option in enumerate(options, 1):
@@ -16,21 +64,24 @@ def display_menu(title, options):
     
     while True:
         try:
-            choice = input(f"\nEnter your choice (1-{len(options)}): ")
+            choice = input(f"\nEnter your choice (1-{len(options)}"
+                           f"{' or a name' if index is not None else ''}): ")
             choice = int(choice)
             if 1 <= choice <= len(options):
                 return options[choice - 1]
             else:
                 print(f"Please enter a number between 1 and {len(options)}")
         except ValueError:
-            print("Please enter a valid number")
+            name = typed_choice(choice, index)
+            if name is not None:
+                return name
         except KeyboardInterrupt:
             print("\n\nThank you for using (J)ai Kisan!")
             sys.exit(0)
 
 
-def display_categorized_menu(title, categories):
-    """Display a categorized menu"""
+def display_categorized_menu(title, categories, index=None):
+    """Display a categorized menu (choices by number, or by name with an index)"""
     print(f"\n{title}")
     print("=" * len(title))
     
@@ -43,14 +94,17 @@ def display_categorized_menu(title, categories):
     
     while True:
         try:
-            choice = input(f"\nEnter your choice (1-{len(all_items)}): ")
+            choice = input(f"\nEnter your choice (1-{len(all_items)}"
+                           f"{' or a name' if index is not None else ''}): ")
             choice = int(choice)
             if 1 <= choice <= len(all_items):
                 return all_items[choice - 1]
             else:
                 print(f"Please enter a number between 1 and {len(all_items)}")
         except ValueError:
-            print("Please enter a valid number")
+            name = typed_choice(choice, index)
+            if name is not None:
+                return name
         except KeyboardInterrupt:
             print("\n\nThank you for using (J)ai Kisan!")
             sys.exit(0)
@@ -68,10 +122,13 @@ def main():
     
     agent = JaiKisanAgent()
     
-    # Get user inputs
-    crop = display_categorized_menu("Select Your Crop", agent.get_crop_categories())
-    state = display_categorized_menu("Select Your State/Region", agent.get_state_regions())
-    growth_stage = display_menu("Select Growth Stage", agent.get_growth_stages())
+    # Get user inputs; a name such as "dhan" or "UP" works as well as a number
+    crop = display_categorized_menu("Select Your Crop", agent.get_crop_categories(),
+                                    agent.resolver.crops)
+    state = display_categorized_menu("Select Your State/Region", agent.get_state_regions(),
+                                     agent.resolver.states)
+    growth_stage = display_menu("Select Growth Stage", agent.get_growth_stages(),
+                                agent.resolver.stages)
     
     print("\n" + "=" * 80)
     print("Generating your personalized recommendation...")
@@ -91,7 +148,287 @@ def main():
         print("May your fields prosper! 🌾")
 
 
+# ---------------------------------------------------------------------------
+# Bulk planning (cli.py plan)
+# ---------------------------------------------------------------------------
+
+# Accepted CSV header spellings for each field
+COLUMN_ALIASES = {
+    "crop": ("crop",),
+    "state": ("state",),
+    "growth_stage": ("growth_stage", "stage", "growth stage"),
+    "area_ha": ("area_ha", "area", "hectares"),
+    "district": ("district",),
+}
+
+# Agent used by get_plan_agent
+_plan_agent = None
+
+
+def open_stream(path, mode):
+    """Open a file for the plan command, with "-" meaning stdin/stdout"""
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="" if "r" in mode else None, encoding="utf-8")
+
+
+def read_farms(stream):
+    """
+    Yield (line number, row dict) for every data row of a farms CSV
+    
+    Header names are matched case-insensitively against COLUMN_ALIASES;
+    unknown columns are ignored.
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    
+    columns = {}
+    for index, name in enumerate(header):
+        name = name.strip().lower()
+        for field, aliases in COLUMN_ALIASES.items():
+            if name in aliases and field not in columns:
+                columns[field] = index
+    
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        yield reader.line_num, {
+            field: row[index].strip() if index < len(row) else ""
+            for field, index in columns.items()
+        }
+
+
+def get_plan_agent():
+    """Agent used for planning; one per process, created on first use"""
+    global _plan_agent
+    if _plan_agent is None:
+        _plan_agent = JaiKisanAgent()
+    return _plan_agent
+
+
+@lru_cache(maxsize=4096)
+def _cached_recommendation(crop, state, growth_stage, district=None):
+    """
+    Recommendation dict per combination; district exports repeat them a lot
+    
+    The cached dict is shared between rows, so callers copy it before use.
+    """
+    return get_plan_agent().generate_response(crop, state, growth_stage, format="json",
+                                              district=district)
+
+
+def plan_row(line, row):
+    """
+    Plan one farm, except for its fertilizer mix
+    
+    Args:
+        line: CSV line number, echoed back so errors can be traced
+        row: Dictionary with crop, state, growth_stage and optional area_ha
+            and district (for regional prices)
+    
+    Returns:
+        Result dictionary with canonical names, or with "error" (and
+        "candidates" for an unrecognised name) set if the row is invalid
+    """
+    crop = row.get("crop", "")
+    state = row.get("state", "")
+    growth_stage = row.get("growth_stage", "")
+    result = {"line": line, "crop": crop, "state": state, "growth_stage": growth_stage}
+    try:
+        if not crop or not state or not growth_stage:
+            raise ValueError("crop, state and growth_stage are required")
+        crop, state, growth_stage = get_plan_agent().resolver.resolve_request(
+            crop, state, growth_stage)
+        result.update(crop=crop, state=state, growth_stage=growth_stage)
+        if row.get("area_ha"):
+            try:
+                area_ha = float(row["area_ha"])
+            except ValueError:
+                raise ValueError(f"area_ha is not a number: {row['area_ha']!r}")
+            if not area_ha > 0:
+                raise ValueError("area_ha must be positive")
+            result["area_ha"] = area_ha
+        # Regional prices follow the optional district column; farms without
+        # dealer prices of their own share the state's entry
+        district = get_plan_agent().price_context(state, row.get("district"))
+        result["recommendation"] = to_json_dict(_cached_recommendation(
+            crop, state, growth_stage, district and district[0]))
+    except ValueError as e:
+        result.pop("area_ha", None)
+        result["error"] = str(e)
+        if isinstance(e, UnresolvedNameError):
+            result["candidates"] = e.candidates
+    return result
+
+
+def plan_rows(rows):
+    """
+    Plan a chunk of (line, row) pairs; the unit of work sent to worker processes
+    
+    Fertilizer mixes for the whole chunk are solved together in one batch.
+    
+    Returns:
+        List of (JSON string without newline, True if the row failed) tuples
+    """
+    results = [plan_row(line, row) for line, row in rows]
+    with_area = [r for r in results if "area_ha" in r]
+    mixes = get_plan_agent().get_fertilizer_mixes(
+        (r["crop"], r["growth_stage"], r["area_ha"]) for r in with_area)
+    for result, mix in zip(with_area, mixes):
+        result["fertilizer_mix"] = mix
+    return [(json.dumps(r, ensure_ascii=False), "error" in r) for r in results]
+
+
+def plan_stream(farms, workers=1, chunk_size=256):
+    """
+    Lazily turn (line, row) pairs into plan_row results, in input order
+    
+    With more than one worker, chunks of rows are fanned out to a process
+    pool. Only a few chunks per worker are in flight at a time, so the input
+    is read no faster than it is planned.
+    """
+    chunks = iter(lambda: list(islice(farms, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield from plan_rows(chunk)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(plan_rows, chunk))
+            if len(pending) >= workers * 4:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run_plan(args):
+    """Execute the plan subcommand and print a throughput summary to stderr"""
+    started = time.perf_counter()
+    rows = errors = 0
+    
+    source = open_stream(args.input, "r")
+    target = open_stream(args.output, "w")
+    try:
+        for line, failed in plan_stream(read_farms(source), args.workers, args.chunk_size):
+            target.write(line + "\n")
+            rows += 1
+            errors += failed
+            if args.progress and rows % args.progress == 0:
+                elapsed = time.perf_counter() - started
+                print(f"  {rows:,} rows ({rows / elapsed:,.0f} rows/s)", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"Planned {rows:,} rows ({errors:,} errors) in {elapsed:.2f}s "
+          f"- {rate:,.0f} rows/s with {args.workers} worker(s)", file=sys.stderr)
+    return 1 if rows and errors == rows else 0
+
+
+# ---------------------------------------------------------------------------
+# Season schedule (cli.py schedule)
+# ---------------------------------------------------------------------------
+
+def format_stage(stage):
+    """Text lines for one stage of a season schedule"""
+    window = stage["window"]
+    lines = [f"\n{stage['growth_stage']}  ({window['start']} to {window['end']})",
+             f"  Timing: {stage['timing']}"]
+    dose = stage["dose_kg"]
+    mix = stage["mix"]
+    if dose is None:
+        lines.append("  No fertilizer dose for this stage")
+    elif mix and "bags" in mix:
+        bags = ", ".join(f"{count} × {name} ({mix['brands'][name]})"
+                         for name, count in mix["bags"].items())
+        lines.append(f"  Dose: N {dose['N']} kg, P {dose['P']} kg, K {dose['K']} kg")
+        lines.append(f"  Bags: {bags or 'none'}")
+    else:
+        lines.append(f"  Dose: N {dose['N']} kg, P {dose['P']} kg, K {dose['K']} kg "
+                     f"({mix['error'] if mix else 'no mix'})")
+    if stage["eco_alternatives"]:
+        lines.append(f"  Eco alternatives: {', '.join(stage['eco_alternatives'])}")
+    lines.append(f"  Cost: ₹{stage['cost']:,.0f} (season so far ₹{stage['cumulative_cost']:,.0f})")
+    return lines
+
+
+def run_schedule(args):
+    """Print a season schedule as it is generated, then the season summary"""
+    agent = JaiKisanAgent()
+    resolution = agent.resolver.crops.resolve(args.crop)
+    if resolution.name is None:
+        print(UnresolvedNameError("crop", resolution), file=sys.stderr)
+        return 2
+    try:
+        sowing_date = date.fromisoformat(args.sowing_date)
+        if not args.area > 0:
+            raise ValueError("--area must be positive")
+        summary = agent.get_season_summary(resolution.name, sowing_date, args.season)
+        stages = agent.get_season_schedule(resolution.name, sowing_date, args.area,
+                                           args.season)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    
+    if args.json:
+        print(json.dumps({"summary": summary}, ensure_ascii=False))
+        for stage in stages:
+            print(json.dumps(stage, ensure_ascii=False))
+        return 0
+    
+    print(f"{summary['crop']} - {summary['season']} season ({summary['months']}), "
+          f"{args.area:g} ha")
+    print(f"Sowing {summary['sowing_date']}, harvest by {summary['harvest_date']}")
+    for stage in stages:
+        print("\n".join(format_stage(stage)))
+    npk = summary["npk_per_ha"]
+    print(f"\nSeason per hectare: N {npk['N']} kg, P {npk['P']} kg, K {npk['K']} kg, "
+          f"about ₹{summary['cost_per_ha']:,.0f}")
+    return 0
+
+
+def parse_args(argv):
+    """Parse command line arguments; no subcommand means interactive mode"""
+    parser = argparse.ArgumentParser(description="(J)ai Kisan command line interface")
+    subcommands = parser.add_subparsers(dest="command")
+    
+    plan = subcommands.add_parser("plan", help="plan many farms from a CSV file")
+    plan.add_argument("--input", required=True,
+                      help="CSV with crop, state, growth_stage[, area_ha, district] ('-' for stdin)")
+    plan.add_argument("--output", default="-",
+                      help="JSON lines output file (default: stdout)")
+    plan.add_argument("--workers", type=int, default=1,
+                      help="worker processes (default: 1, no pool)")
+    plan.add_argument("--chunk-size", type=int, default=256,
+                      help="rows per unit of work sent to a worker (default: 256)")
+    plan.add_argument("--progress", type=int, default=0, metavar="N",
+                      help="report progress every N rows on stderr")
+    
+    schedule = subcommands.add_parser("schedule", help="plan a crop's whole season")
+    schedule.add_argument("--crop", required=True, help="crop name (e.g. wheat, धान)")
+    schedule.add_argument("--sowing-date", required=True, help="sowing date, YYYY-MM-DD")
+    schedule.add_argument("--area", type=float, default=1.0,
+                          help="farm area in hectares (default: 1)")
+    schedule.add_argument("--season", help="Kharif, Rabi or Zaid (default: from the date)")
+    schedule.add_argument("--json", action="store_true",
+                          help="JSON lines: the summary, then one line per stage")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if args.command == "plan":
+        sys.exit(run_plan(args))
+    if args.command == "schedule":
+        sys.exit(run_schedule(args))
     try:
         main()
     except KeyboardInterrupt:
@@ -2,3 +2,21 @@
 (J)ai Kisan - Intelligent Agricultural Consultant
 Main module for the AI agent
 """
+
+from data import crops_data, fertilizer_data, states_data
+from data.files import FILE_SCHEMAS, compute_data_version
+
+
+def _module_tables():
+    """The tables of every data file, as loaded by the data modules at import"""
+    tables = {}
+    for module in (crops_data, states_data, fertilizer_data):
+        for file_tables in FILE_SCHEMAS.values():
+            tables.update((name, getattr(module, name)) for name in file_tables
+                          if hasattr(module, name))
+    return tables
+
+
+# Changes whenever any crop, state or fertilizer table changes; a reloaded
+# DataSnapshot (data/snapshot.py) carries its own version
+DATA_VERSION = compute_data_version(_module_tables())
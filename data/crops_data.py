@@ -1,94 +1,28 @@
 """
 Crop Data for (J)ai Kisan System
 Contains N-P-K ratios and requirements for major Indian crops
+
+The tables are loaded from crops.json in the data directory (see
+data/files.py); edit the file, not this module.
 """
 
-CROP_CATEGORIES = {
-    "Cereals": ["Paddy (Rice)", "Wheat", "Maize", "Bajra", "Jowar", "Ragi"],
-    "Pulses": ["Tur (Arhar)", "Moong", "Gram (Chana)", "Masoor", "Urad"],
-    "Cash Crops": ["Sugarcane", "Cotton", "Jute", "Tobacco"],
-    "Oilseeds": ["Soybean", "Groundnut", "Mustard", "Sunflower"],
-    "Plantation/Horticulture": ["Tea", "Coffee", "Rubber", "Potato", "Onion", "Tomato", "Chili"]
-}
+from data.files import load_data_file
+
+CROPS_FILE_VERSION, _tables = load_data_file("crops.json")
+
+# Crops offered in the menus, by category
+CROP_CATEGORIES = _tables["CROP_CATEGORIES"]
 
 # N-P-K requirements (kg/hectare) for major crops by growth stage
-CROP_NPK_REQUIREMENTS = {
-    "Paddy (Rice)": {
-        "Field Preparation (Basal Dose)": {"N": 40, "P": 20, "K": 20},
-        "Sowing/Early Growth": {"N": 20, "P": 10, "K": 10},
-        "Vegetative Phase (Leaves/Stem growth)": {"N": 40, "P": 10, "K": 20},
-        "Flowering & Fruiting": {"N": 20, "P": 10, "K": 20},
-        "Pre-Harvest": {"N": 0, "P": 0, "K": 10}
-    },
-    "Wheat": {
-        "Field Preparation (Basal Dose)": {"N": 40, "P": 30, "K": 20},
-        "Sowing/Early Growth": {"N": 20, "P": 10, "K": 10},
-        "Vegetative Phase (Leaves/Stem growth)": {"N": 40, "P": 10, "K": 10},
-        "Flowering & Fruiting": {"N": 20, "P": 5, "K": 10},
-        "Pre-Harvest": {"N": 0, "P": 0, "K": 5}
-    },
-    "Sugarcane": {
-        "Field Preparation (Basal Dose)": {"N": 60, "P": 40, "K": 40},
-        "Sowing/Early Growth": {"N": 40, "P": 20, "K": 20},
-        "Vegetative Phase (Leaves/Stem growth)": {"N": 80, "P": 20, "K": 40},
-        "Flowering & Fruiting": {"N": 40, "P": 10, "K": 40},
-        "Pre-Harvest": {"N": 0, "P": 0, "K": 20}
-    },
-    "Cotton": {
-        "Field Preparation (Basal Dose)": {"N": 40, "P": 30, "K": 30},
-        "Sowing/Early Growth": {"N": 20, "P": 10, "K": 10},
-        "Vegetative Phase (Leaves/Stem growth)": {"N": 40, "P": 15, "K": 20},
-        "Flowering & Fruiting": {"N": 30, "P": 15, "K": 30},
-        "Pre-Harvest": {"N": 0, "P": 0, "K": 10}
-    },
-    "Tur (Arhar)": {
-        "Field Preparation (Basal Dose)": {"N": 20, "P": 40, "K": 20},
-        "Sowing/Early Growth": {"N": 10, "P": 15, "K": 10},
-        "Vegetative Phase (Leaves/Stem growth)": {"N": 10, "P": 10, "K": 10},
-        "Flowering & Fruiting": {"N": 10, "P": 15, "K": 20},
-        "Pre-Harvest": {"N": 0, "P": 0, "K": 5}
-    },
-    "Soybean": {
-        "Field Preparation (Basal Dose)": {"N": 20, "P": 40, "K": 20},
-        "Sowing/Early Growth": {"N": 10, "P": 15, "K": 10},
-        "Vegetative Phase (Leaves/Stem growth)": {"N": 10, "P": 15, "K": 15},
-        "Flowering & Fruiting": {"N": 10, "P": 20, "K": 20},
-        "Pre-Harvest": {"N": 0, "P": 0, "K": 10}
-    },
-    "Potato": {
-        "Field Preparation (Basal Dose)": {"N": 50, "P": 50, "K": 50},
-        "Sowing/Early Growth": {"N": 30, "P": 20, "K": 20},
-        "Vegetative Phase (Leaves/Stem growth)": {"N": 40, "P": 20, "K": 30},
-        "Flowering & Fruiting": {"N": 30, "P": 10, "K": 50},
-        "Pre-Harvest": {"N": 0, "P": 0, "K": 20}
-    },
-    "Onion": {
-        "Field Preparation (Basal Dose)": {"N": 40, "P": 30, "K": 30},
-        "Sowing/Early Growth": {"N": 20, "P": 15, "K": 15},
-        "Vegetative Phase (Leaves/Stem growth)": {"N": 40, "P": 15, "K": 20},
-        "Flowering & Fruiting": {"N": 20, "P": 10, "K": 30},
-        "Pre-Harvest": {"N": 0, "P": 0, "K": 15}
-    }
-}
+CROP_NPK_REQUIREMENTS = _tables["CROP_NPK_REQUIREMENTS"]
 
 # Default NPK for crops not in detailed list
-DEFAULT_NPK = {
-    "Maize": {"N": 120, "P": 60, "K": 40},
-    "Bajra": {"N": 80, "P": 40, "K": 40},
-    "Jowar": {"N": 80, "P": 40, "K": 40},
-    "Ragi": {"N": 50, "P": 40, "K": 25},
-    "Moong": {"N": 20, "P": 40, "K": 20},
-    "Gram (Chana)": {"N": 20, "P": 40, "K": 20},
-    "Masoor": {"N": 20, "P": 40, "K": 20},
-    "Urad": {"N": 25, "P": 50, "K": 25},
-    "Jute": {"N": 60, "P": 30, "K": 30},
-    "Tobacco": {"N": 80, "P": 40, "K": 60},
-    "Groundnut": {"N": 25, "P": 50, "K": 50},
-    "Mustard": {"N": 80, "P": 40, "K": 40},
-    "Sunflower": {"N": 60, "P": 60, "K": 40},
-    "Tea": {"N": 100, "P": 40, "K": 40},
-    "Coffee": {"N": 80, "P": 40, "K": 80},
-    "Rubber": {"N": 60, "P": 30, "K": 60},
-    "Tomato": {"N": 120, "P": 60, "K": 60},
-    "Chili": {"N": 100, "P": 50, "K": 50}
-}
+DEFAULT_NPK = _tables["DEFAULT_NPK"]
+
+# Other names farmers use for each crop: Hindi, regional and English names
+# and common misspellings. Names in parentheses ("Rice" in "Paddy (Rice)")
+# are matched without being listed here (see data/resolver.py).
+CROP_ALIASES = _tables["CROP_ALIASES"]
+
+# Short and vernacular names for each growth stage
+STAGE_ALIASES = _tables["STAGE_ALIASES"]
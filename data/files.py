@@ -0,0 +1,220 @@
+"""
+Data Files for (J)ai Kisan System
+Loads the agronomy tables from versioned JSON files and checks their shape
+
+Each file in the data directory holds a schema number, a version label
+chosen by whoever edits it (e.g. "2026.2" after a price revision) and its
+tables:
+
+    {"schema": 1, "version": "2026.1", "tables": {"BRANDED_FERTILIZERS": {...}}}
+
+The data directory is data/ in the source tree unless DATA_DIR points
+elsewhere, so prices can be updated without a code deploy. A file that
+cannot be read, is not valid JSON, does not match FILE_SCHEMAS or names a
+crop, state or stage its REFERENCES do not define raises DataFileError
+naming the file and the offending entry.
+"""
+
+import hashlib
+import json
+import os
+
+SCHEMA_VERSION = 1
+
+# Schema nodes: str or NUMBER for scalars, [node] for a list of node,
+# {"*": node} for a mapping of any names to node, and {"field": node} for a
+# record with those fields ("field?" if optional; other fields are allowed)
+NUMBER = "number"
+
+_NPK = {"N": NUMBER, "P": NUMBER, "K": NUMBER}
+_ALIASES = {"*": [str]}
+
+FILE_SCHEMAS = {
+    "crops.json": {
+        "CROP_CATEGORIES": {"*": [str]},
+        "CROP_NPK_REQUIREMENTS": {"*": {"*": _NPK}},
+        "DEFAULT_NPK": {"*": _NPK},
+        "CROP_ALIASES": _ALIASES,
+        "STAGE_ALIASES": _ALIASES,
+    },
+    "states.json": {
+        "STATE_REGIONS": {"*": [str]},
+        "STATE_SOIL_INFO": {"*": {"typical_ph": str, "soil_type": str, "common_issue": str,
+                                  "agro_climatic_zone": str}},
+        "CROPPING_SEASONS": {"*": {"months": str, "description": str, "common_crops": [str]}},
+        "STATE_ALIASES": _ALIASES,
+    },
+    "fertilizers.json": {
+        "FERTILIZER_TYPES": {"*": {"npk": str, "nutrient_content": {"*": NUMBER},
+                                   "description?": str}},
+        "BRANDED_FERTILIZERS": {"*": [{"brand": str, "npk": str, "price_per_50kg": NUMBER,
+                                       "availability": str}]},
+        "ECO_ALTERNATIVES": {"*": {"type": str, "benefits": [str], "aliases?": [str]}},
+        "GROWTH_STAGE_FERTILIZERS": {"*": {"primary": [str], "eco_alternative": [str],
+                                           "timing": str}},
+    },
+}
+
+# Where a table's names are: a mapping's KEYS, the keys of each of its
+# values (INNER_KEYS), or the entries of its lists (LISTED)
+KEYS, INNER_KEYS, LISTED = "keys", "inner keys", "listed"
+
+# Names one table uses that another must define: (table, where, defining
+# table, where, what the names are). A typo'd key is refused rather than
+# becoming a crop or stage of its own
+REFERENCES = (
+    ("CROP_NPK_REQUIREMENTS", KEYS, "CROP_CATEGORIES", LISTED, "crop"),
+    ("CROP_NPK_REQUIREMENTS", INNER_KEYS, "GROWTH_STAGE_FERTILIZERS", KEYS, "growth stage"),
+    ("DEFAULT_NPK", KEYS, "CROP_CATEGORIES", LISTED, "crop"),
+    ("CROP_ALIASES", KEYS, "CROP_CATEGORIES", LISTED, "crop"),
+    ("STAGE_ALIASES", KEYS, "GROWTH_STAGE_FERTILIZERS", KEYS, "growth stage"),
+    ("STATE_SOIL_INFO", KEYS, "STATE_REGIONS", LISTED, "state"),
+    ("STATE_ALIASES", KEYS, "STATE_REGIONS", LISTED, "state"),
+    ("BRANDED_FERTILIZERS", KEYS, "FERTILIZER_TYPES", KEYS, "fertilizer type"),
+)
+
+# Files read when present (see data/price_store.py); watched for changes
+# like the files above
+OPTIONAL_FILES = ("prices.csv",)
+
+
+class DataFileError(ValueError):
+    """A data file that is missing, unreadable or does not match its schema"""
+
+
+def data_dir():
+    """Directory the data files are read from (DATA_DIR, or this package)"""
+    return os.getenv("DATA_DIR") or os.path.dirname(os.path.abspath(__file__))
+
+
+def _describe(value):
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+
+def _check(node, value, path):
+    """Raise DataFileError (message without the file name) if value does not match node"""
+    where = path or "file"
+    if node is NUMBER:
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+            raise DataFileError(f"{where}: expected a non-negative number, got {_describe(value)}")
+    elif node is str:
+        if not isinstance(value, str):
+            raise DataFileError(f"{where}: expected text, got {_describe(value)}")
+    elif isinstance(node, list):
+        if not isinstance(value, list):
+            raise DataFileError(f"{where}: expected a list, got {_describe(value)}")
+        for index, item in enumerate(value):
+            _check(node[0], item, f"{path}[{index}]")
+    else:
+        if not isinstance(value, dict):
+            raise DataFileError(f"{where}: expected an object, got {_describe(value)}")
+        if "*" in node:
+            for key, item in value.items():
+                _check(node["*"], item, f"{path}.{key}" if path else key)
+            return
+        for field, child in node.items():
+            name = field.rstrip("?")
+            if name in value:
+                _check(child, value[name], f"{path}.{name}" if path else name)
+            elif not field.endswith("?"):
+                raise DataFileError(f"{where}: missing {name!r}")
+
+
+def load_data_file(name, directory=None):
+    """
+    Read and check one data file
+
+    Args:
+        name: File name, a key of FILE_SCHEMAS
+        directory: Data directory (default: data_dir())
+
+    Returns:
+        Tuple of (version label, dictionary of table name -> table)
+
+    Raises:
+        DataFileError: if the file is missing, invalid JSON or off-schema
+    """
+    path = os.path.join(directory or data_dir(), name)
+    try:
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+    except (OSError, ValueError) as e:
+        raise DataFileError(f"{name}: {e}") from e
+
+    try:
+        _check({"schema": NUMBER, "version": str, "tables": FILE_SCHEMAS[name]}, document, "")
+    except DataFileError as e:
+        raise DataFileError(f"{name}: {e}") from None
+    if document["schema"] != SCHEMA_VERSION:
+        raise DataFileError(f"{name}: schema {document['schema']} is not supported "
+                            f"(expected {SCHEMA_VERSION})")
+    return document["version"], {table: document["tables"][table] for table in FILE_SCHEMAS[name]}
+
+
+def _names(table, where):
+    """(path, name) of each name in a table, for REFERENCES"""
+    if where == KEYS:
+        return [(key, key) for key in table]
+    if where == INNER_KEYS:
+        return [(f"{key}.{inner}", inner) for key, value in table.items() for inner in value]
+    return [(f"{key}[{index}]", name) for key, names in table.items()
+            for index, name in enumerate(names)]
+
+
+def check_references(tables):
+    """
+    Check the names tables use against the tables defining them
+
+    Args:
+        tables: Dictionary of table name -> table across all files
+
+    Raises:
+        DataFileError: naming the file, entry and unknown name of the first
+            reference in REFERENCES that does not resolve
+    """
+    file_of = {table: name for name, schema in FILE_SCHEMAS.items() for table in schema}
+    for table, where, defining, defined_where, kind in REFERENCES:
+        defined = {name for _, name in _names(tables[defining], defined_where)}
+        for path, name in _names(tables[table], where):
+            if name not in defined:
+                raise DataFileError(f"{file_of[table]}: {table}.{path}: unknown {kind} "
+                                    f"{name!r} (not in {defining})")
+
+
+def read_data_files(directory=None):
+    """
+    Read and check every data file
+
+    Returns:
+        Tuple of (dictionary of table name -> table across all files,
+        dictionary of file name -> version label)
+
+    Raises:
+        DataFileError: if a file is missing or invalid, or a table names a
+            crop, state, stage or fertilizer no other table defines
+    """
+    tables = {}
+    versions = {}
+    for name in FILE_SCHEMAS:
+        versions[name], file_tables = load_data_file(name, directory)
+        tables.update(file_tables)
+    check_references(tables)
+    return tables, versions
+
+
+def data_file_mtimes(directory=None):
+    """Modification times of the data files (None for a missing file), to detect edits"""
+    mtimes = {}
+    for name in list(FILE_SCHEMAS) + list(OPTIONAL_FILES):
+        try:
+            mtimes[name] = os.stat(os.path.join(directory or data_dir(), name)).st_mtime_ns
+        except OSError:
+            mtimes[name] = None
+    return mtimes
+
+
+def compute_data_version(tables):
+    """Short content hash of a set of tables, used to stamp cached and served output"""
+    encoded = json.dumps(tables, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:12]
@@ -0,0 +1,311 @@
+"""
+Compact Agronomy Model for (J)ai Kisan System
+Crops, states and growth stages as dense integer IDs over array-backed tables
+
+The data modules keep the human-edited nested dictionaries. This model is
+built from them once: names are interned and numbered, per-crop N-P-K
+requirements live in one flat array indexed [crop, stage, nutrient] (with
+the DEFAULT_NPK stage split already applied), and state and fertilizer
+entries become immutable slotted records. The agent's dictionary API reads
+prebuilt views of these tables instead of walking the nested dictionaries
+and re-splitting season totals on every call.
+"""
+
+import math
+import sys
+from array import array
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from data.crops_data import CROP_CATEGORIES, CROP_NPK_REQUIREMENTS, DEFAULT_NPK
+from data.states_data import STATE_REGIONS, STATE_SOIL_INFO
+from data.fertilizer_data import FERTILIZER_TYPES, BRANDED_FERTILIZERS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; npk_matrix returns None without it
+    np = None
+
+NUTRIENTS = ("N", "P", "K")
+
+GROWTH_STAGES = (
+    "Field Preparation (Basal Dose)",
+    "Sowing/Early Growth",
+    "Vegetative Phase (Leaves/Stem growth)",
+    "Flowering & Fruiting",
+    "Pre-Harvest",
+)
+
+# Share of a DEFAULT_NPK season total applied at a stage, by stage keyword;
+# stages matching no keyword get no default requirement
+DEFAULT_STAGE_SPLIT = (
+    ("Basal", (0.3, 0.6, 0.4)),
+    ("Vegetative", (0.4, 0.2, 0.3)),
+    ("Flowering", (0.2, 0.2, 0.3)),
+)
+
+# npk_source values: where a [crop, stage] requirement came from
+NPK_NONE, NPK_DETAILED, NPK_DEFAULT_SPLIT = 0, 1, 2
+
+
+def default_split(total, growth_stage):
+    """
+    Stage share of a season total, chosen by keyword in the stage name
+
+    Args:
+        total: Dictionary with N, P, K season totals (DEFAULT_NPK entry)
+        growth_stage: Growth stage name
+
+    Returns:
+        Dictionary with N, P, K for the stage, or None if no keyword matches
+    """
+    for keyword, shares in DEFAULT_STAGE_SPLIT:
+        if keyword in growth_stage:
+            return {n: total[n] * share for n, share in zip(NUTRIENTS, shares)}
+    return None
+
+
+class IdTable:
+    """
+    Interned names numbered 0..n-1 in first-seen order
+
+    Attributes:
+        names: Tuple of names by ID
+        id: Callable name -> ID, or None if the name is unknown (the
+            mapping's own get, so a lookup is a single dictionary probe)
+    """
+
+    __slots__ = ("names", "_ids", "id")
+
+    def __init__(self, names):
+        unique = []
+        ids = {}
+        for name in names:
+            if name not in ids:
+                ids[name] = len(unique)
+                unique.append(sys.intern(name))
+        self.names = tuple(unique)
+        self._ids = ids
+        self.id = ids.get
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+
+@dataclass(frozen=True)
+class StateRecord:
+    """Soil and climate profile of one state"""
+
+    __slots__ = ("state_id", "name", "region", "typical_ph", "soil_type",
+                 "common_issue", "agro_climatic_zone")
+    state_id: int
+    name: str
+    region: str
+    typical_ph: str
+    soil_type: str
+    common_issue: str
+    agro_climatic_zone: str
+
+    def as_dict(self):
+        """The STATE_SOIL_INFO entry this record was built from"""
+        return {"typical_ph": self.typical_ph, "soil_type": self.soil_type,
+                "common_issue": self.common_issue,
+                "agro_climatic_zone": self.agro_climatic_zone}
+
+
+@dataclass(frozen=True)
+class FertilizerRecord:
+    """Nutrient content of one fertilizer type, in percent by weight"""
+
+    __slots__ = ("name", "npk", "n", "p", "k", "s", "description")
+    name: str
+    npk: str
+    n: float
+    p: float
+    k: float
+    s: float
+    description: str
+
+
+@dataclass(frozen=True)
+class BrandOffer:
+    """One brand's price for a fertilizer type"""
+
+    __slots__ = ("fertilizer", "brand", "npk", "price_per_50kg", "availability")
+    fertilizer: str
+    brand: str
+    npk: str
+    price_per_50kg: float
+    availability: str
+
+    def as_dict(self):
+        """The BRANDED_FERTILIZERS entry this record was built from"""
+        return {"brand": self.brand, "npk": self.npk, "price_per_50kg": self.price_per_50kg,
+                "availability": self.availability}
+
+
+class AgronomyModel:
+    """
+    Crops, states, stages and fertilizers as numbered, array-backed tables
+
+    Attributes:
+        crops, states, stages: IdTable of each dimension
+        npk: array('d') of len(crops) × len(stages) × 3 kg/hectare values,
+            NaN where there is no requirement
+        npk_source: array('B') per [crop, stage]: NPK_NONE, NPK_DETAILED
+            or NPK_DEFAULT_SPLIT
+        states_by_id: Tuple of StateRecord (None without soil data) by state ID
+        fertilizers: Read-only name -> FertilizerRecord mapping
+        brand_offers: Read-only fertilizer name -> tuple of BrandOffer mapping
+    """
+
+    def __init__(self, crop_categories=CROP_CATEGORIES, crop_npk=CROP_NPK_REQUIREMENTS,
+                 default_npk=DEFAULT_NPK, state_regions=STATE_REGIONS,
+                 state_soil_info=STATE_SOIL_INFO, fertilizer_types=FERTILIZER_TYPES,
+                 branded_fertilizers=BRANDED_FERTILIZERS, growth_stages=GROWTH_STAGES):
+        # Names come from the category, region and stage lists only; N-P-K
+        # and soil rows for other names are ignored, so a typo'd key never
+        # becomes a crop or stage of its own
+        self.crops = IdTable([crop for crops in crop_categories.values() for crop in crops])
+        self.states = IdTable([state for states in state_regions.values() for state in states])
+        self.stages = IdTable(growth_stages)
+        self.default_npk = {crop: npk for crop, npk in default_npk.items() if crop in self.crops}
+        self._build_npk(crop_npk)
+        self._build_states(state_regions, state_soil_info)
+
+        self.fertilizers = MappingProxyType({
+            name: FertilizerRecord(
+                name, info["npk"],
+                *(float(info["nutrient_content"].get(n, 0)) for n in ("N", "P", "K", "S")),
+                info.get("description", ""))
+            for name, info in fertilizer_types.items()
+        })
+        self.brand_offers = MappingProxyType({
+            name: tuple(BrandOffer(name, offer["brand"], offer["npk"], offer["price_per_50kg"],
+                                   offer["availability"]) for offer in offers)
+            for name, offers in branded_fertilizers.items()
+        })
+        self._offer_views = {name: tuple(offer.as_dict() for offer in offers)
+                             for name, offers in self.brand_offers.items()}
+
+    def _build_npk(self, crop_npk):
+        stage_count = self._stage_count = len(self.stages)
+        cells = len(self.crops) * stage_count
+        self.npk = array("d", [math.nan]) * (cells * len(NUTRIENTS))
+        self.npk_source = array("B", [NPK_NONE]) * cells
+        for crop_id, crop in enumerate(self.crops.names):
+            for stage_id, stage in enumerate(self.stages.names):
+                cell = crop_id * stage_count + stage_id
+                requirement = crop_npk.get(crop, {}).get(stage)
+                source = NPK_DETAILED
+                if requirement is None and crop in self.default_npk:
+                    requirement = default_split(self.default_npk[crop], stage)
+                    source = NPK_DEFAULT_SPLIT
+                if requirement is None:
+                    continue
+                for k, nutrient in enumerate(NUTRIENTS):
+                    self.npk[cell * len(NUTRIENTS) + k] = requirement[nutrient]
+                self.npk_source[cell] = source
+
+        # The dictionaries handed out by npk_requirement, read off the array
+        # once per cell. Detailed values are whole kg as written ("40") and
+        # split defaults fractions ("36.0"), so rendered output is unchanged
+        views = []
+        for cell in range(cells):
+            values = self.npk[cell * len(NUTRIENTS):(cell + 1) * len(NUTRIENTS)]
+            if self.npk_source[cell] == NPK_NONE:
+                views.append(None)
+            elif self.npk_source[cell] == NPK_DETAILED:
+                views.append({n: int(v) if v.is_integer() else v
+                              for n, v in zip(NUTRIENTS, values)})
+            else:
+                views.append(dict(zip(NUTRIENTS, values)))
+        self._npk_views = tuple(views)
+
+    def _build_states(self, state_regions, state_soil_info):
+        region_of = {state: region for region, states in state_regions.items()
+                     for state in states}
+        records = []
+        for state_id, state in enumerate(self.states.names):
+            info = state_soil_info.get(state)
+            records.append(None if info is None else StateRecord(
+                state_id, state, region_of.get(state, ""), info["typical_ph"],
+                info["soil_type"], info["common_issue"], info["agro_climatic_zone"]))
+        self.states_by_id = tuple(records)
+        self._state_views = tuple(None if record is None else record.as_dict()
+                                  for record in records)
+
+    def npk_requirement(self, crop, growth_stage):
+        """
+        N-P-K requirement for a crop at a growth stage
+
+        Args:
+            crop: Crop name
+            growth_stage: Growth stage name; names outside the stage table
+                still get the DEFAULT_NPK keyword split
+
+        Returns:
+            Dictionary with N, P, K in kg/hectare, or None
+        """
+        crop_id = self.crops.id(crop)
+        stage_id = self.stages.id(growth_stage)
+        if crop_id is not None and stage_id is not None:
+            return self._npk_views[crop_id * self._stage_count + stage_id]
+        if crop in self.default_npk:
+            return default_split(self.default_npk[crop], growth_stage)
+        return None
+
+    def npk_view(self, crop_id, stage_id):
+        """npk_requirement for IDs: the [crop, stage] cell as a dictionary, or None"""
+        return self._npk_views[crop_id * self._stage_count + stage_id]
+
+    def npk_by_id(self, crop_id, stage_id):
+        """(N, P, K) floats for IDs, or None where there is no requirement"""
+        offset = (crop_id * self._stage_count + stage_id) * len(NUTRIENTS)
+        values = tuple(self.npk[offset:offset + len(NUTRIENTS)])
+        return None if math.isnan(values[0]) else values
+
+    def npk_matrix(self):
+        """
+        The requirement table as a NumPy array of shape (crops, stages, 3)
+
+        The array shares memory with self.npk (no copy) and is read-only.
+
+        Returns:
+            numpy.ndarray, or None if NumPy is not installed
+        """
+        if np is None:
+            return None
+        matrix = np.frombuffer(self.npk, dtype=np.float64).reshape(
+            len(self.crops), len(self.stages), len(NUTRIENTS))
+        matrix.flags.writeable = False
+        return matrix
+
+    def offers(self, fertilizer):
+        """BRANDED_FERTILIZERS entries of a fertilizer type, as dictionaries (empty if none)"""
+        return self._offer_views.get(fertilizer, ())
+
+    def cheapest_offers(self):
+        """
+        (FertilizerRecord, cheapest BrandOffer) for each fertilizer type
+        with at least one priced brand, in FERTILIZER_TYPES order
+        """
+        return tuple((record, min(self.brand_offers[name],
+                                  key=lambda offer: offer.price_per_50kg))
+                     for name, record in self.fertilizers.items()
+                     if self.brand_offers.get(name))
+
+    def state_info(self, state):
+        """Soil information dictionary for a state, or None"""
+        state_id = self.states.id(state)
+        return None if state_id is None else self._state_views[state_id]
+
+
+# Built once from the data modules and shared by every agent
+default_model = AgronomyModel()
@@ -0,0 +1,36 @@
+"""
+Name Normalization for (J)ai Kisan System
+Shared by the name resolver and the eco-alternative index
+
+Lives apart from data/resolver.py, which needs the agronomy model and so
+cannot be imported while the data modules the model is built from load.
+"""
+
+import re
+import unicodedata
+
+# Anything but letters, digits and Devanagari (whose vowel signs are not
+# letters to \w) separates words
+_SEPARATORS = re.compile(r"[^\w\u0900-\u097f]+|_")
+
+
+def normalize_name(text):
+    """
+    Casefold, unify Unicode forms and collapse punctuation and whitespace
+
+    "&" is read as "and", so "J&K" and "J and K" share a key.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold().replace("&", " and ")
+    return " ".join(_SEPARATORS.sub(" ", text).split())
+
+
+def name_variants(name):
+    """The canonical name and its parts: "Paddy (Rice)" -> Paddy, Rice"""
+    variants = [name]
+    if "(" in name and name.endswith(")"):
+        outer, inner = name[:-1].split("(", 1)
+        variants.extend((outer, inner))
+    for variant in list(variants):
+        if "/" in variant:
+            variants.extend(variant.split("/"))
+    return variants
@@ -0,0 +1,223 @@
+"""
+Nutrient Cost Index for (J)ai Kisan System
+Effective price per kg of N, P and K for every product, brand and eco alternative
+
+A 50 kg bag price hides what a farmer actually pays for a nutrient:
+subsidized Urea-N costs a fraction of the N in DAP or the complexes. The
+index divides each offer's price per kg of product by the share of each
+nutrient it contains. The whole price is charged to every nutrient, so
+the figure for one nutrient is what that nutrient costs when the product
+is bought for it.
+
+Everything is built once per DataSnapshot. Every ranking is sorted
+cheapest first: across all products, and per growth stage over the
+stage's primary fertilizers and eco alternatives. "Cheapest source of K
+for this stage" is then a dictionary lookup and an index.
+"""
+
+import re
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+
+from data.model import NUTRIENTS
+
+# Price fields of an eco alternative that are per weight, as kg per unit
+# priced; other prices (per bottle, per hectare) cannot be compared per kg
+ECO_PRICE_UNITS_KG = (
+    ("price_per_50kg", 50),
+    ("price_per_ton", 1000),
+)
+
+BAG_KG = 50
+
+# Leading "N-P-K" of an eco alternative's npk_approx ("3-9-1", "1.5-1.0-1.5")
+_NPK_APPROX = re.compile(r"\s*(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)-(\d+(?:\.\d+)?)")
+
+# kind values of a NutrientCost
+FERTILIZER, ECO_ALTERNATIVE = "fertilizer", "eco_alternative"
+
+
+@dataclass(frozen=True)
+class NutrientCost:
+    """What one kg of a nutrient costs when bought as one offer"""
+
+    __slots__ = ("nutrient", "product", "brand", "kind", "npk", "content", "price_per_kg",
+                 "cost_per_kg")
+    nutrient: str
+    product: str
+    brand: object
+    kind: str
+    npk: str
+    content: float
+    price_per_kg: float
+    cost_per_kg: float
+
+    def as_dict(self):
+        """Entry for recommendations and JSON responses"""
+        return {"nutrient": self.nutrient, "product": self.product, "brand": self.brand,
+                "kind": self.kind, "npk": self.npk,
+                "price_per_kg": round(self.price_per_kg, 2),
+                "cost_per_kg": round(self.cost_per_kg, 2)}
+
+
+def _costs(product, brand, kind, npk, price_per_kg, content):
+    """NutrientCost for each nutrient the product contains"""
+    return [NutrientCost(nutrient, product, brand, kind, npk, content[nutrient], price_per_kg,
+                         price_per_kg * 100 / content[nutrient])
+            for nutrient in NUTRIENTS if content.get(nutrient, 0) > 0]
+
+
+def _eco_content(data):
+    """Nutrient percentages from npk_approx, or None if it does not start with N-P-K"""
+    match = _NPK_APPROX.match(data.get("npk_approx", ""))
+    if match is None:
+        return None
+    return dict(zip(NUTRIENTS, (float(value) for value in match.groups())))
+
+
+def _eco_price_per_kg(data):
+    for key, kg in ECO_PRICE_UNITS_KG:
+        if key in data:
+            return data[key] / kg
+    return None
+
+
+def _stage_fertilizer_types(names, fertilizer_types):
+    """
+    FERTILIZER_TYPES keys for a stage's primary fertilizers
+
+    Names are written for farmers: "MOP (if needed)" is MOP, and a group
+    such as "NPK Complex" stands for every type sharing its first word.
+    """
+    types = []
+    for name in names:
+        base = name.split(" (")[0].strip()
+        if base in fertilizer_types:
+            matches = [base]
+        else:
+            group = base.split()[0] if base else ""
+            matches = [fert_type for fert_type in fertilizer_types
+                       if fert_type.split()[0] == group]
+        types.extend(fert_type for fert_type in matches if fert_type not in types)
+    return types
+
+
+def _stage_view(ranked):
+    return {nutrient: [cost.as_dict() for cost in costs]
+            for nutrient, costs in ranked.items() if costs}
+
+
+def _ranked(costs):
+    """Nutrient -> tuple of NutrientCost, cheapest first"""
+    return MappingProxyType({
+        nutrient: tuple(sorted((cost for cost in costs if cost.nutrient == nutrient),
+                               key=lambda cost: (cost.cost_per_kg, cost.product,
+                                                 cost.brand or "")))
+        for nutrient in NUTRIENTS
+    })
+
+
+class NutrientCostIndex:
+    """
+    Cost per kg of each nutrient, ranked cheapest first
+
+    Attributes:
+        by_product: Read-only product name -> tuple of NutrientCost mapping,
+            covering every branded offer and every eco alternative priced
+            by weight
+        ranked: Read-only nutrient -> tuple of NutrientCost, all products
+    """
+
+    def __init__(self, fertilizer_types, branded_fertilizers, eco_alternatives,
+                 growth_stage_fertilizers, stage_eco_alternatives):
+        """
+        Args:
+            fertilizer_types: FERTILIZER_TYPES table (nutrient content)
+            branded_fertilizers: BRANDED_FERTILIZERS table (prices)
+            eco_alternatives: ECO_ALTERNATIVES table
+            growth_stage_fertilizers: GROWTH_STAGE_FERTILIZERS table
+            stage_eco_alternatives: Growth stage -> resolved eco alternatives,
+                as built by build_stage_eco_alternatives
+        """
+        by_product = {}
+        for fert_type, offers in branded_fertilizers.items():
+            content = fertilizer_types.get(fert_type, {}).get("nutrient_content")
+            if not content:
+                continue
+            by_product[fert_type] = tuple(
+                cost for offer in offers
+                for cost in _costs(fert_type, offer["brand"], FERTILIZER, offer["npk"],
+                                   offer["price_per_50kg"] / BAG_KG, content))
+        for name, data in eco_alternatives.items():
+            content = _eco_content(data)
+            price_per_kg = _eco_price_per_kg(data)
+            if content is None or price_per_kg is None:
+                continue
+            by_product[name] = tuple(_costs(name, None, ECO_ALTERNATIVE, data["npk_approx"],
+                                            price_per_kg, content))
+        self.by_product = MappingProxyType(by_product)
+        self.ranked = _ranked([cost for costs in by_product.values() for cost in costs])
+
+        self._stage_costs = {}
+        self._stage_ranked = {}
+        self._stage_views = {}
+        for growth_stage, stage in growth_stage_fertilizers.items():
+            products = (_stage_fertilizer_types(stage.get("primary", []), fertilizer_types)
+                        + list(stage_eco_alternatives.get(growth_stage, {})))
+            costs = [cost for product in products for cost in by_product.get(product, ())]
+            ranked = _ranked(costs)
+            self._stage_costs[growth_stage] = tuple(costs)
+            self._stage_ranked[growth_stage] = ranked
+            self._stage_views[growth_stage] = _stage_view(ranked)
+
+    def sources(self, nutrient, growth_stage=None):
+        """
+        Sources of a nutrient, cheapest first
+
+        Args:
+            nutrient: "N", "P" or "K"
+            growth_stage: Only the stage's recommended products (None: all)
+
+        Returns:
+            Tuple of NutrientCost, empty for an unknown stage
+        """
+        if growth_stage is None:
+            return self.ranked.get(nutrient, ())
+        ranked = self._stage_ranked.get(growth_stage)
+        return ranked.get(nutrient, ()) if ranked else ()
+
+    def cheapest(self, nutrient, growth_stage=None):
+        """Cheapest NutrientCost of a nutrient (for a stage), or None"""
+        costs = self.sources(nutrient, growth_stage)
+        return costs[0] if costs else None
+
+    def stage_costs(self, growth_stage, price_of=None):
+        """
+        The recommendation's "nutrient_costs" entry for a growth stage
+
+        Args:
+            growth_stage: Growth stage name
+            price_of: Optional callable (product, brand) -> price per 50 kg
+                bag, or None to keep the list price; the stage is then
+                re-ranked at those prices (e.g. a district's dealer prices)
+
+        Returns:
+            Dictionary of nutrient -> list of NutrientCost.as_dict() entries,
+            cheapest first, for the nutrients the stage's products supply;
+            empty for an unknown stage. Shared between calls: do not modify.
+        """
+        if price_of is None:
+            return self._stage_views.get(growth_stage, {})
+        prices = {}
+        costs = []
+        for cost in self._stage_costs.get(growth_stage, ()):
+            if cost.kind == FERTILIZER:
+                offer = (cost.product, cost.brand)
+                if offer not in prices:
+                    prices[offer] = price_of(*offer)
+                if prices[offer] is not None:
+                    price_per_kg = prices[offer] / BAG_KG
+                    cost = replace(cost, price_per_kg=price_per_kg,
+                                   cost_per_kg=price_per_kg * 100 / cost.content)
+            costs.append(cost)
+        return _stage_view(_ranked(costs))
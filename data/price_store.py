@@ -0,0 +1,270 @@
+"""
+Regional Price Store for (J)ai Kisan System
+Dealer prices by product, brand, state and district over time
+
+BRANDED_FERTILIZERS holds one national list price per brand. Dealer prices
+differ by state and district and change month to month, so observations
+can be added in prices.csv in the data directory, one row per price seen:
+
+    product,brand,state,district,date,price_per_50kg
+    DAP,IFFCO,Maharashtra,Pune,2026-09-01,1390
+    DAP,IFFCO,Maharashtra,,2026-08-15,1370
+    Urea,IFFCO,,,2026-04-01,300
+
+An empty district makes a state-wide price and an empty state a national
+one. Each (product, brand, state, district) series is kept as two sorted
+arrays, dates and prices, so "price as of date D" is one bisect. A lookup
+tries the district series, then the state's, then the national one, and
+gives None if none has a price on or before D; callers then keep the
+list price. The file is optional: without it the store is empty and
+recommendations use the list prices, exactly as before.
+"""
+
+import csv
+import hashlib
+import os
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+
+from data.files import DataFileError, data_dir
+from data.resolver import normalize_name
+
+PRICE_FILE = "prices.csv"
+PRICE_COLUMNS = ("product", "brand", "state", "district", "date", "price_per_50kg")
+
+# PricePoint.level values, most specific first
+DISTRICT, STATE, NATIONAL = "district", "state", "national"
+
+
+@dataclass(frozen=True)
+class PriceObservation:
+    """One price seen for a product and brand, at a place, on a date"""
+
+    __slots__ = ("product", "brand", "state", "district", "date", "price_per_50kg", "line")
+    product: str
+    brand: str
+    state: str
+    district: str
+    date: date
+    price_per_50kg: float
+    line: object
+
+
+@dataclass(frozen=True)
+class PricePoint:
+    """Price in force on a date, and the series it came from"""
+
+    __slots__ = ("price_per_50kg", "date", "level")
+    price_per_50kg: float
+    date: date
+    level: str
+
+
+class PriceSeries:
+    """Dates (as ordinals) and prices of one series, sorted by date"""
+
+    __slots__ = ("dates", "prices")
+
+    def __init__(self, points):
+        """
+        Args:
+            points: (date ordinal, price) pairs in any order; of several
+                prices on one date the last one given is kept
+        """
+        latest = dict(points)
+        ordinals = sorted(latest)
+        self.dates = array("l", ordinals)
+        self.prices = array("d", (latest[ordinal] for ordinal in ordinals))
+
+    def as_of(self, ordinal):
+        """(date ordinal, price) in force on a date ordinal, or None before the first"""
+        index = bisect_right(self.dates, ordinal) - 1
+        if index < 0:
+            return None
+        return self.dates[index], self.prices[index]
+
+    def __len__(self):
+        return len(self.dates)
+
+
+class PriceStore:
+    """
+    Price series by (product, brand, state, district), with as-of lookups
+
+    State names are canonical (resolved when the store is built) and
+    district names normalized, so "Pune" and "pune " are one district.
+    """
+
+    def __init__(self, observations=(), resolve_state=None, known_offers=None):
+        """
+        Args:
+            observations: Iterable of PriceObservation
+            resolve_state: Callable mapping a state as written to its
+                canonical name or None; states are kept as given without it
+            known_offers: Set of (product, brand) pairs that can be priced,
+                as in BRANDED_FERTILIZERS; any pair is kept without it
+
+        Raises:
+            DataFileError: for an observation in a state resolve_state
+                rejects, or for a product and brand not in known_offers
+        """
+        points = {}
+        states = {"": ""}
+        districts = {"": ""}
+        digest = hashlib.sha1()
+        count = 0
+        for observation in observations:
+            # A price nothing looks up would only be dropped silently
+            if (known_offers is not None
+                    and (observation.product, observation.brand) not in known_offers):
+                raise DataFileError(f"{PRICE_FILE}: line {observation.line}: unknown product "
+                                    f"and brand {observation.product!r}, {observation.brand!r}")
+            # Files repeat a handful of states and districts many times over
+            state = states.get(observation.state)
+            if state is None:
+                state = observation.state
+                if resolve_state is not None:
+                    state = resolve_state(state)
+                    if state is None:
+                        raise DataFileError(f"{PRICE_FILE}: line {observation.line}: unknown "
+                                            f"state {observation.state!r}")
+                states[observation.state] = state
+            district = districts.get(observation.district)
+            if district is None:
+                district = districts[observation.district] = normalize_name(observation.district)
+            key = (observation.product, observation.brand, state, district if state else "")
+            ordinal = observation.date.toordinal()
+            points.setdefault(key, []).append((ordinal, observation.price_per_50kg))
+            digest.update(f"{key}{ordinal}:{observation.price_per_50kg}".encode("utf-8"))
+            count += 1
+        self._series = {key: PriceSeries(series) for key, series in points.items()}
+        self._districts = {(state, district) for _, _, state, district in self._series
+                           if district}
+        self.observations = count
+        # Stamps the data version, so cached responses turn over with the prices
+        self.digest = digest.hexdigest()[:12] if count else None
+
+    def __len__(self):
+        return len(self._series)
+
+    def district_key(self, state, district):
+        """
+        Normalized district name if the store has prices for it, else None
+
+        Unknown districts fall back to the state's prices; mapping them to
+        None keeps free-text input from multiplying cache entries.
+        """
+        if not district:
+            return None
+        key = normalize_name(district)
+        return key if (state, key) in self._districts else None
+
+    def lookup(self, product, brand, state=None, district=None, as_of=None):
+        """
+        Price of a product and brand in force at a place on a date
+
+        Args:
+            product: Fertilizer type, as in BRANDED_FERTILIZERS
+            brand: Brand, as in BRANDED_FERTILIZERS
+            state: Canonical state name, or None for the national price
+            district: District name in any case, or None
+            as_of: datetime.date (default: today)
+
+        Returns:
+            PricePoint from the most specific series with a price on or
+            before as_of, or None
+        """
+        ordinal = (as_of or date.today()).toordinal()
+        keys = []
+        if state:
+            if district:
+                keys.append(((product, brand, state, normalize_name(district)), DISTRICT))
+            keys.append(((product, brand, state, ""), STATE))
+        keys.append(((product, brand, "", ""), NATIONAL))
+        for key, level in keys:
+            series = self._series.get(key)
+            if series is not None:
+                found = series.as_of(ordinal)
+                if found is not None:
+                    return PricePoint(found[1], date.fromordinal(found[0]), level)
+        return None
+
+
+def _parse_row(line, row):
+    """PriceObservation from one CSV row (values already stripped)"""
+    for column in ("product", "brand", "date", "price_per_50kg"):
+        if not row[column]:
+            raise DataFileError(f"{PRICE_FILE}: line {line}: {column} is required")
+    try:
+        observed = date.fromisoformat(row["date"])
+    except ValueError:
+        raise DataFileError(f"{PRICE_FILE}: line {line}: date must be YYYY-MM-DD, "
+                            f"got {row['date']!r}") from None
+    try:
+        price = float(row["price_per_50kg"])
+    except ValueError:
+        price = -1.0
+    if not price >= 0 or price == float("inf"):
+        raise DataFileError(f"{PRICE_FILE}: line {line}: price_per_50kg must be a "
+                            f"non-negative number, got {row['price_per_50kg']!r}")
+    if row["district"] and not row["state"]:
+        raise DataFileError(f"{PRICE_FILE}: line {line}: a district needs a state")
+    return PriceObservation(row["product"], row["brand"], row["state"], row["district"],
+                            observed, price, line)
+
+
+def read_price_observations(stream):
+    """
+    Parse price observations from CSV text
+
+    The header names the columns (any order; district may be omitted).
+
+    Args:
+        stream: Text file object
+
+    Returns:
+        List of PriceObservation
+
+    Raises:
+        DataFileError: naming the line of the first invalid row
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return []
+    columns = {name.strip().lower(): index for index, name in enumerate(header)}
+    missing = [column for column in PRICE_COLUMNS
+               if column not in columns and column != "district"]
+    if missing:
+        raise DataFileError(f"{PRICE_FILE}: missing column(s) {', '.join(missing)}")
+    observations = []
+    for row in reader:
+        if not any(value.strip() for value in row):
+            continue
+        values = {column: row[columns[column]].strip()
+                  if column in columns and columns[column] < len(row) else ""
+                  for column in PRICE_COLUMNS}
+        observations.append(_parse_row(reader.line_num, values))
+    return observations
+
+
+def load_price_observations(directory=None):
+    """
+    Read prices.csv from the data directory
+
+    Returns:
+        List of PriceObservation; empty if there is no prices.csv
+
+    Raises:
+        DataFileError: if the file cannot be read or has an invalid row
+    """
+    path = os.path.join(directory or data_dir(), PRICE_FILE)
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            return read_price_observations(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        raise DataFileError(f"{PRICE_FILE}: {e}") from e
@@ -0,0 +1,221 @@
+"""
+Name Resolver for (J)ai Kisan System
+Maps free-text crop, state and growth stage names to canonical model names
+
+Farmers and bulk exports write "paddy", "धान", "Arhar", "UP" or "punjb"
+where the agent expects "Paddy (Rice)", "Tur (Arhar)", "Uttar Pradesh" and
+"Punjab". Each dimension gets a NameIndex, built once at import:
+
+- an exact map from normalized keys (canonical names, the parts of
+  "Outer (Inner)" and "A/B" names, and the aliases in the data modules,
+  each also without spaces) to IDs, so known spellings resolve with a
+  couple of dictionary lookups
+- a character trigram index over the same keys, which shortlists the keys
+  sharing the most trigrams with a misspelled input; the shortlist is then
+  ranked by edit similarity
+
+Input that matches no name well, or two names equally well, is not
+guessed: the caller gets the ranked candidates instead.
+"""
+
+import heapq
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from data.crops_data import CROP_ALIASES, STAGE_ALIASES
+from data.states_data import STATE_ALIASES
+from data.model import default_model
+from data.names import normalize_name, name_variants
+
+# Fuzzy matching: similarity needed to accept the best match, lead it needs
+# over the next name, similarity needed to be suggested; names re-ranked
+# and the trigram overlap needed to be one of them
+ACCEPT_SCORE = 0.7
+MIN_MARGIN = 0.1
+SUGGEST_SCORE = 0.5
+SHORTLIST = 5
+MIN_DICE = 0.2
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Resolution:
+    """
+    Outcome of resolving one input
+
+    Attributes:
+        query: The input as given
+        name: Canonical name, or None if the input is unknown or ambiguous
+        id: ID of name in the model's table, or None
+        candidates: Tuple of (canonical name, similarity 0-1), best first
+    """
+
+    __slots__ = ("query", "name", "id", "candidates")
+    query: str
+    name: object
+    id: object
+    candidates: tuple
+
+
+class UnresolvedNameError(ValueError):
+    """A crop, state or growth stage that could not be resolved to one name"""
+
+    def __init__(self, field, resolution):
+        self.field = field
+        self.value = resolution.query
+        self.candidates = [name for name, _ in resolution.candidates]
+        message = f"Unknown {field.replace('_', ' ')}: {self.value!r}"
+        if self.candidates:
+            message += f". Did you mean: {', '.join(self.candidates)}?"
+        super().__init__(message)
+
+    def to_dict(self):
+        """Error entry for JSON responses"""
+        return {"error": str(self), "field": self.field, "candidates": self.candidates}
+
+
+class NameIndex:
+    """Exact and fuzzy lookup of one IdTable's names and their aliases"""
+
+    def __init__(self, table, aliases=None, cache_size=4096):
+        """
+        Args:
+            table: IdTable of canonical names (data.model)
+            aliases: Dictionary of canonical name -> list of other names;
+                entries for names not in table are ignored
+            cache_size: Fuzzy lookups remembered (exact ones are not cached)
+        """
+        self.table = table
+        self._raw = {}
+        self._exact = {}
+        for name_id, name in enumerate(table.names):
+            names = name_variants(name) + list((aliases or {}).get(name, ()))
+            for alias in names:
+                self._raw.setdefault(alias, name_id)
+                key = normalize_name(alias)
+                if key:
+                    self._add(key, name_id)
+        # Spellings without spaces ("tamilnadu", "pigeonpea") never beat
+        # a real key
+        for key, ids in list(self._exact.items()):
+            for name_id in ids:
+                self._exact.setdefault(key.replace(" ", ""), (name_id,))
+
+        self._keys = list(self._exact)
+        self._postings = {}
+        self._gram_counts = []
+        for index, key in enumerate(self._keys):
+            grams = _trigrams(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(index)
+        self._fuzzy = lru_cache(maxsize=cache_size)(self._fuzzy_uncached)
+
+    def _add(self, key, name_id):
+        ids = self._exact.get(key, ())
+        if name_id not in ids:
+            self._exact[key] = ids + (name_id,)
+
+    def resolve(self, text, limit=5):
+        """
+        Resolve free text to a canonical name
+
+        Args:
+            text: Name as typed, in any case, script or spacing
+            limit: Candidates returned at most
+
+        Returns:
+            Resolution; name is set when the input is a known spelling or
+            a close misspelling of exactly one name
+        """
+        name_id = self._raw.get(text)
+        if name_id is not None:
+            name = self.table.names[name_id]
+            return Resolution(text, name, name_id, ((name, 1.0),))
+
+        key = normalize_name(text)
+        ids = self._exact.get(key)
+        if ids is not None:
+            candidates = tuple((self.table.names[i], 1.0) for i in ids)
+            if len(ids) == 1:
+                return Resolution(text, candidates[0][0], ids[0], candidates)
+            return Resolution(text, None, None, candidates[:limit])
+
+        ranked = self._fuzzy(key) if key else ()
+        candidates = tuple((self.table.names[i], round(score, 3))
+                           for i, score in ranked[:limit] if score >= SUGGEST_SCORE)
+        if ranked and ranked[0][1] >= ACCEPT_SCORE and (
+                len(ranked) == 1 or ranked[0][1] - ranked[1][1] >= MIN_MARGIN):
+            name_id = ranked[0][0]
+            return Resolution(text, self.table.names[name_id], name_id, candidates)
+        return Resolution(text, None, None, candidates)
+
+    def _fuzzy_uncached(self, key):
+        """(ID, similarity) pairs for a normalized key, best first"""
+        grams = _trigrams(key)
+        shared = {}
+        for gram in grams:
+            for index in self._postings.get(gram, ()):
+                shared[index] = shared.get(index, 0) + 1
+
+        # The trigram Dice coefficient of each name's closest key picks a
+        # short list (edit similarity costs ~25 µs a key); edit similarity
+        # then ranks it
+        closest = {}
+        for index, count in shared.items():
+            dice = 2 * count / (len(grams) + self._gram_counts[index])
+            if dice >= MIN_DICE:
+                for name_id in self._exact[self._keys[index]]:
+                    if dice > closest.get(name_id, (0.0,))[0]:
+                        closest[name_id] = (dice, index)
+        matcher = SequenceMatcher(None, b=key, autojunk=False)
+        ranked = []
+        for name_id, (_, index) in heapq.nlargest(SHORTLIST, closest.items(),
+                                                  key=lambda item: item[1][0]):
+            matcher.set_seq1(self._keys[index])
+            ranked.append((name_id, matcher.ratio()))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return tuple(ranked)
+
+
+class NameResolver:
+    """Name indexes for crops, states and growth stages of one AgronomyModel"""
+
+    def __init__(self, model=default_model, crop_aliases=CROP_ALIASES,
+                 state_aliases=STATE_ALIASES, stage_aliases=STAGE_ALIASES):
+        self.crops = NameIndex(model.crops, crop_aliases)
+        self.states = NameIndex(model.states, state_aliases)
+        self.stages = NameIndex(model.stages, stage_aliases)
+
+    def resolve_request(self, crop, state, growth_stage):
+        """
+        Canonical names for a (crop, state, growth_stage) request
+
+        Returns:
+            Tuple of canonical (crop, state, growth_stage)
+
+        Raises:
+            UnresolvedNameError: for the first field that is unknown or
+                ambiguous, with its ranked candidates
+        """
+        names = []
+        for field, index, text in (("crop", self.crops, crop), ("state", self.states, state),
+                                   ("growth_stage", self.stages, growth_stage)):
+            # Canonical names and aliases as written skip building a Resolution
+            name_id = index._raw.get(text)
+            if name_id is None:
+                resolution = index.resolve(text)
+                if resolution.name is None:
+                    raise UnresolvedNameError(field, resolution)
+                name_id = resolution.id
+            names.append(index.table.names[name_id])
+        return tuple(names)
+
+
+# Built once from the default model and shared by every agent
+default_resolver = NameResolver()
@@ -0,0 +1,172 @@
+"""
+Season Calendar for (J)ai Kisan System
+Places the growth stages of a crop on the calendar from its sowing date
+
+CROPPING_SEASONS gives each season's months ("June-October") and common
+crops. A season plan picks the crop's season for the sowing date, takes
+the end of the season's last month as the harvest, and dates every growth
+stage relative to sowing or harvest as the application timings say
+("1-2 weeks before sowing", "3-4 weeks after sowing", "2-3 weeks before
+harvest"). Flowering has no fixed date, so it is placed at a share of the
+way from sowing to harvest.
+"""
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+MONTHS = ("january", "february", "march", "april", "may", "june", "july", "august",
+          "september", "october", "november", "december")
+
+# What a stage window is counted from
+SOWING, HARVEST, GROWTH = "sowing", "harvest", "growth"
+
+# (stage keyword, anchor, start, end): days from sowing or harvest, or for
+# GROWTH the share of the days from sowing to harvest. Stages matching no
+# keyword are left out of season plans
+STAGE_WINDOWS = (
+    ("Basal", SOWING, -14, -7),
+    ("Sowing", SOWING, 0, 14),
+    ("Vegetative", SOWING, 21, 28),
+    ("Flowering", GROWTH, 0.5, 0.6),
+    ("Pre-Harvest", HARVEST, -21, -14),
+)
+
+
+def _month(name):
+    try:
+        return MONTHS.index(name.strip().lower()) + 1
+    except ValueError:
+        raise ValueError(f"Unknown month in CROPPING_SEASONS: {name!r}") from None
+
+
+def stage_window(growth_stage, sowing_date, harvest_date):
+    """
+    Dates a growth stage's application falls between
+
+    Returns:
+        Tuple of (start, end) dates, or None if no STAGE_WINDOWS keyword matches
+    """
+    for keyword, anchor, start, end in STAGE_WINDOWS:
+        if keyword in growth_stage:
+            if anchor == GROWTH:
+                days = (harvest_date - sowing_date).days
+                return (sowing_date + timedelta(days=round(days * start)),
+                        sowing_date + timedelta(days=round(days * end)))
+            origin = sowing_date if anchor == SOWING else harvest_date
+            return origin + timedelta(days=start), origin + timedelta(days=end)
+    return None
+
+
+@dataclass(frozen=True)
+class Season:
+    """One CROPPING_SEASONS entry, with its months as numbers"""
+
+    __slots__ = ("name", "start_month", "end_month", "months", "description")
+    name: str
+    start_month: int
+    end_month: int
+    months: str
+    description: str
+
+    def contains(self, month):
+        """Whether a month (1-12) falls in the season"""
+        if self.start_month <= self.end_month:
+            return self.start_month <= month <= self.end_month
+        return month >= self.start_month or month <= self.end_month
+
+    def harvest_after(self, sowing_date):
+        """Last day of the season's last month, first one after the sowing date"""
+        year = sowing_date.year
+        if sowing_date.month > self.end_month:
+            year += 1
+        return date(year, self.end_month, calendar.monthrange(year, self.end_month)[1])
+
+
+@dataclass(frozen=True)
+class SeasonPlan:
+    """
+    A crop's season from one sowing date
+
+    Attributes:
+        stages: Tuple of (growth stage, window start, window end), in stage order
+    """
+
+    __slots__ = ("crop", "season", "sowing_date", "harvest_date", "stages")
+    crop: str
+    season: Season
+    sowing_date: date
+    harvest_date: date
+    stages: tuple
+
+
+class SeasonCalendar:
+    """CROPPING_SEASONS with crops resolved to canonical names"""
+
+    def __init__(self, cropping_seasons, crop_index, growth_stages):
+        """
+        Args:
+            cropping_seasons: CROPPING_SEASONS table
+            crop_index: NameIndex of crops (data.resolver), to match
+                common_crops ("Paddy", "Tur") to canonical names; entries it
+                cannot resolve ("Vegetables") are ignored
+            growth_stages: Stage names in growing order
+        """
+        seasons = []
+        crop_seasons = {}
+        for name, info in cropping_seasons.items():
+            first, _, last = info["months"].partition("-")
+            season = Season(name, _month(first), _month(last or first), info["months"],
+                            info["description"])
+            seasons.append(season)
+            for common in info["common_crops"]:
+                crop = crop_index.resolve(common).name
+                if crop is not None:
+                    crop_seasons.setdefault(crop, []).append(season)
+        self.seasons = tuple(seasons)
+        self._by_name = {season.name.lower(): season for season in seasons}
+        self._crop_seasons = {crop: tuple(found) for crop, found in crop_seasons.items()}
+        self.growth_stages = tuple(stage for stage in growth_stages
+                                   if any(keyword in stage for keyword, *_ in STAGE_WINDOWS))
+
+    def season_for(self, crop, sowing_date, season=None):
+        """
+        The season a crop sown on a date grows in
+
+        The crop's own seasons come first; a crop sown outside them, or
+        not listed under any season, gets the season of the sowing month.
+        Where two seasons share a month, the one starting in it wins.
+
+        Args:
+            crop: Canonical crop name
+            sowing_date: datetime.date
+            season: Season name to use instead (any case)
+
+        Raises:
+            ValueError: if season is given but unknown
+        """
+        if season is not None:
+            found = self._by_name.get(season.strip().lower())
+            if found is None:
+                raise ValueError(f"Unknown season: {season!r}. "
+                                 f"Choose from {', '.join(s.name for s in self.seasons)}")
+            return found
+        month = sowing_date.month
+        for candidates in (self._crop_seasons.get(crop, ()), self.seasons):
+            matching = [s for s in candidates if s.contains(month)]
+            if matching:
+                return min(matching, key=lambda s: s.start_month != month)
+        return self.seasons[0]
+
+    def plan(self, crop, sowing_date, season=None):
+        """
+        Date every growth stage of a crop sown on a date
+
+        Returns:
+            SeasonPlan
+        """
+        found = self.season_for(crop, sowing_date, season)
+        harvest_date = found.harvest_after(sowing_date)
+        stages = tuple((stage,) + stage_window(stage, sowing_date, harvest_date)
+                       for stage in self.growth_stages)
+        return SeasonPlan(crop, found, sowing_date, harvest_date, stages)
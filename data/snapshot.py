@@ -0,0 +1,277 @@
+"""
+Data Snapshots for (J)ai Kisan System
+One consistent set of agronomy tables, and hot reload of the data files
+
+A DataSnapshot holds the tables of every data file and the regional
+prices of prices.csv, together with everything derived from them (the
+array-backed model, the name resolver, the eco-alternative index, the
+nutrient cost index and the season calendar), and is never changed once
+built. A DataStore publishes the snapshot being served: a reload reads
+and checks the files and builds the replacement completely, away from the
+requests being served, then publishes it with a single assignment. A
+request that took the current snapshot keeps it to the end, so no request
+ever sees a mix of old and new data, and an invalid file leaves the old
+data in place.
+"""
+
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+from data import crops_data, fertilizer_data, states_data
+from data.files import (FILE_SCHEMAS, DataFileError, compute_data_version, data_dir,
+                        data_file_mtimes, read_data_files)
+from data.fertilizer_data import build_stage_eco_alternatives
+from data.model import AgronomyModel, default_model
+from data.nutrient_costs import NutrientCostIndex
+from data.price_store import PriceStore, load_price_observations
+from data.resolver import NameResolver, default_resolver
+from data.seasons import SeasonCalendar
+
+
+class DataSnapshot:
+    """
+    Agronomy tables and their derived indexes, as of one load
+
+    Attributes:
+        version: Content hash of the tables; stamps every response built
+            from this snapshot
+        file_versions: Dictionary of file name -> version label in the file
+        tables: Read-only table name -> table mapping
+        model, resolver: AgronomyModel and NameResolver over the tables
+        stage_eco_alternatives: Growth stage -> resolved eco alternatives
+        nutrient_costs: NutrientCostIndex of the fertilizer tables
+        prices: PriceStore of regional prices (empty without prices.csv)
+        season_calendar: SeasonCalendar of the cropping seasons
+    """
+
+    def __init__(self, tables, file_versions=None, model=None, resolver=None,
+                 stage_eco_alternatives=None, price_observations=()):
+        """
+        Args:
+            tables: Dictionary of table name -> table, every table in FILE_SCHEMAS
+            file_versions: Dictionary of file name -> version label
+            model, resolver, stage_eco_alternatives: Prebuilt derived data
+                for exactly these tables (built from them when omitted)
+            price_observations: Iterable of PriceObservation
+
+        Raises:
+            DataFileError: if a price observation names an unknown state,
+                or a product and brand not in BRANDED_FERTILIZERS
+        """
+        self.tables = MappingProxyType(dict(tables))
+        self.file_versions = dict(file_versions or {})
+        self.loaded_at = time.time()
+
+        self.crop_categories = tables["CROP_CATEGORIES"]
+        self.state_regions = tables["STATE_REGIONS"]
+        self.cropping_seasons = tables["CROPPING_SEASONS"]
+        self.fertilizer_types = tables["FERTILIZER_TYPES"]
+        self.branded_fertilizers = tables["BRANDED_FERTILIZERS"]
+        self.eco_alternatives = tables["ECO_ALTERNATIVES"]
+        self.growth_stage_fertilizers = tables["GROWTH_STAGE_FERTILIZERS"]
+
+        self.model = model or AgronomyModel(
+            crop_categories=tables["CROP_CATEGORIES"], crop_npk=tables["CROP_NPK_REQUIREMENTS"],
+            default_npk=tables["DEFAULT_NPK"], state_regions=tables["STATE_REGIONS"],
+            state_soil_info=tables["STATE_SOIL_INFO"], fertilizer_types=self.fertilizer_types,
+            branded_fertilizers=self.branded_fertilizers)
+        self.resolver = resolver or NameResolver(
+            self.model, crop_aliases=tables["CROP_ALIASES"],
+            state_aliases=tables["STATE_ALIASES"], stage_aliases=tables["STAGE_ALIASES"])
+        if stage_eco_alternatives is None:
+            stage_eco_alternatives = build_stage_eco_alternatives(
+                self.growth_stage_fertilizers, self.eco_alternatives)
+        self.stage_eco_alternatives = stage_eco_alternatives
+        self.nutrient_costs = NutrientCostIndex(
+            self.fertilizer_types, self.branded_fertilizers, self.eco_alternatives,
+            self.growth_stage_fertilizers, stage_eco_alternatives)
+        self.season_calendar = SeasonCalendar(self.cropping_seasons, self.resolver.crops,
+                                              self.model.stages.names)
+        self.prices = PriceStore(
+            price_observations, resolve_state=lambda state: self.resolver.states.resolve(state).name,
+            known_offers={(product, offer["brand"])
+                          for product, offers in self.branded_fertilizers.items()
+                          for offer in offers})
+        if self.prices.digest is None:
+            self.version = compute_data_version(tables)
+        else:
+            self.version = compute_data_version(dict(tables, PRICES=self.prices.digest))
+
+    @classmethod
+    def load(cls, directory=None):
+        """
+        Read, check and index the data files
+
+        Raises:
+            DataFileError: if any file is missing or invalid
+        """
+        tables, file_versions = read_data_files(directory)
+        return cls(tables, file_versions, price_observations=load_price_observations(directory))
+
+    @classmethod
+    def from_modules(cls):
+        """
+        Snapshot of the tables the data modules loaded at import, sharing
+        their indexes, with the prices in the data directory
+        """
+        modules = (crops_data, states_data, fertilizer_data)
+        tables = {name: getattr(module, name) for module in modules
+                  for file_tables in FILE_SCHEMAS.values() for name in file_tables
+                  if hasattr(module, name)}
+        file_versions = {"crops.json": crops_data.CROPS_FILE_VERSION,
+                         "states.json": states_data.STATES_FILE_VERSION,
+                         "fertilizers.json": fertilizer_data.FERTILIZERS_FILE_VERSION}
+        return cls(tables, file_versions, model=default_model, resolver=default_resolver,
+                   stage_eco_alternatives=fertilizer_data.STAGE_ECO_ALTERNATIVES,
+                   price_observations=load_price_observations())
+
+
+class DataStore:
+    """
+    The data being served, replaced as a whole when the data files change
+
+    What is served is build(snapshot): the snapshot itself by default, or
+    for the web app an agent built on it (with its precomputed matrix and
+    render caches), so the expensive derived state is swapped together
+    with the tables. Reloads are triggered by reload() (the admin
+    endpoint) or by watch(), which polls the files' modification times.
+    Both only affect the calling process; every gunicorn worker reloads
+    for itself.
+    """
+
+    def __init__(self, directory=None, build=None, snapshot=None):
+        """
+        Args:
+            directory: Data directory (default: data_dir())
+            build: Callable turning a DataSnapshot into the object served
+            snapshot: Initial snapshot (default: loaded from directory)
+        """
+        self.directory = directory or data_dir()
+        self.build = build or (lambda snapshot: snapshot)
+        self._reload_lock = threading.Lock()
+        self._mtimes = data_file_mtimes(self.directory)
+        snapshot = snapshot or DataSnapshot.load(self.directory)
+        # (snapshot, served) replaced in one assignment, never piecemeal
+        self._published = (snapshot, self.build(snapshot))
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self._watch_interval = None
+        self._watch_pid = None
+        self._stop = threading.Event()
+
+    @property
+    def current(self):
+        """The object served for the newest valid data; read it once per request"""
+        return self._published[1]
+
+    @property
+    def snapshot(self):
+        """The DataSnapshot current was built from"""
+        return self._published[0]
+
+    def reload(self, force=False):
+        """
+        Load the data files and publish them if their content changed
+
+        The current data keeps being served while the files are read and
+        the replacement is built.
+
+        Args:
+            force: Rebuild and publish even if the content is unchanged
+
+        Returns:
+            Dictionary with "changed", "data_version" and "previous_version"
+
+        Raises:
+            DataFileError: if a file is invalid; the current data is kept
+            Exception: whatever building the snapshot or the served object
+                raised; the current data is kept as well
+        """
+        with self._reload_lock:
+            mtimes = data_file_mtimes(self.directory)
+            previous = self.snapshot
+            try:
+                snapshot = DataSnapshot.load(self.directory)
+                changed = force or snapshot.version != previous.version
+                served = self.build(snapshot) if changed else None
+            except Exception as e:
+                # Schema-valid data can still fail to build; either way the
+                # current data is kept and the files are not retried until
+                # they change again
+                self._mtimes = mtimes
+                self.failures += 1
+                self.last_error = (str(e) if isinstance(e, DataFileError)
+                                   else f"{type(e).__name__}: {e}")
+                raise
+            self._mtimes = mtimes
+            if changed:
+                self._published = (snapshot, served)
+                self.reloads += 1
+            self.last_error = None
+            return {"changed": changed, "data_version": self.snapshot.version,
+                    "previous_version": previous.version}
+
+    def watch(self, interval):
+        """
+        Reload in a background thread of this process when the files change
+
+        A change is picked up once the modification times have been the
+        same for two checks in a row, so a file still being written, or a
+        set of files being replaced one by one, is not loaded half-way.
+
+        Args:
+            interval: Seconds between checks of the files' modification times
+        """
+        self._watch_interval = interval
+        self._watch_pid = os.getpid()
+        self._stop.clear()
+        threading.Thread(target=self._watch, name="data-watch", daemon=True).start()
+
+    def after_fork(self):
+        """Restart watching in a forked worker (threads do not survive fork)"""
+        if self._watch_interval and self._watch_pid != os.getpid():
+            self._stop = threading.Event()
+            self.watch(self._watch_interval)
+
+    def stop(self):
+        """Stop watching the files"""
+        self._stop.set()
+
+    def _watch(self):
+        pending = None
+        while not self._stop.wait(self._watch_interval):
+            mtimes = data_file_mtimes(self.directory)
+            if mtimes == self._mtimes:
+                pending = None
+            elif mtimes != pending:
+                pending = mtimes  # changed since the last check; wait for it to settle
+            else:
+                pending = None
+                try:
+                    result = self.reload()
+                except Exception:
+                    # Recorded in failures and last_error by reload; the
+                    # thread keeps watching for the next edit
+                    print(f"Data reload failed, keeping {self.snapshot.version}: "
+                          f"{self.last_error}", file=sys.stderr)
+                else:
+                    if result["changed"]:
+                        print(f"Data reloaded: {result['previous_version']} -> "
+                              f"{result['data_version']}", file=sys.stderr)
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {"data_version": snapshot.version, "file_versions": snapshot.file_versions,
+                "loaded_at": snapshot.loaded_at, "directory": self.directory,
+                "price_series": len(snapshot.prices),
+                "watch_interval_s": self._watch_interval, "reloads": self.reloads,
+                "failures": self.failures, "last_error": self.last_error}
+
+
+# The data the modules loaded at import, shared by every agent built without
+# an explicit snapshot
+default_data = DataSnapshot.from_modules()
@@ -0,0 +1,90 @@
+"""
+(J)ai Kisan - Database Configuration
+Engine options, SQLite pragmas and index maintenance for the web app
+
+SQLite (the default) is switched to WAL journaling so that readers never
+block on a writer and commits only append to the log, and every connection
+waits for locks instead of failing with "database is locked". Server
+databases such as PostgreSQL get a sized, recycled connection pool.
+Everything can be tuned from the environment (see .env.example).
+"""
+
+import os
+
+from sqlalchemy import event
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, str(default)))
+
+
+def is_sqlite(uri):
+    """Whether a database URI points at SQLite"""
+    return uri.startswith("sqlite")
+
+
+def engine_options(uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a database URI
+
+    Args:
+        uri: SQLAlchemy database URI
+
+    Returns:
+        Dictionary of create_engine keyword arguments
+    """
+    if is_sqlite(uri):
+        # sqlite3's own lock wait, in seconds; the pragma below covers the rest
+        return {"connect_args": {"timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000}}
+
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        # Recycle before typical server/proxy idle timeouts close connections
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": True,
+    }
+
+
+def sqlite_pragmas():
+    """PRAGMA statements run on every new SQLite connection"""
+    return (
+        f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')}",
+        f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA busy_timeout={_env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)}",
+    )
+
+
+def configure_engine(engine):
+    """
+    Install per-connection settings on an engine (SQLite only)
+
+    Must run before the engine hands out its first connection, or the
+    pooled connections opened earlier keep their defaults.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def ensure_indexes(db):
+    """
+    Create any declared index missing from an existing database
+
+    db.create_all() only creates indexes together with new tables, so
+    databases created before an index was added would never get it.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
@@ -0,0 +1,208 @@
+"""
+(J)ai Kisan - Write-Behind Event Log
+Buffers events in memory and writes them to the database in bulk
+
+Request handlers append an event and return; a background thread writes
+the buffered events with one multi-row INSERT and one commit per batch,
+as soon as max_batch events are waiting or flush_interval seconds after
+the oldest one arrived. The buffer is bounded: when it is full, events
+are dropped ("drop" policy) or the caller waits up to block_timeout
+seconds for room ("block" policy) before dropping.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+POLICIES = ("drop", "block")
+
+
+class _FlushRequest:
+    """Queue marker asking the writer to write its batch now"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class WriteBehindLog:
+    """
+    Bounded write-behind buffer with size and time flush thresholds
+
+    The writer thread starts on the first append in each process, so a log
+    created before gunicorn forks its workers still writes in every worker.
+    """
+
+    def __init__(self, write_batch, max_batch=500, flush_interval=1.0, maxsize=10000,
+                 policy="drop", block_timeout=0.1):
+        """
+        Args:
+            write_batch: Callable taking a list of events and storing them
+                (in one transaction); exceptions are counted, not raised
+            max_batch: Events written per batch at most; a full batch is
+                written at once
+            flush_interval: Seconds an event may wait before it is written
+            maxsize: Events buffered at most
+            policy: "drop" or "block" when the buffer is full
+            block_timeout: Seconds "block" waits for room before dropping
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(POLICIES)}")
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        """Fresh buffer, thread and counters for the current process"""
+        self._queue = queue.Queue(self.maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        self.appended = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+        self._write_times = deque(maxlen=1000)
+
+    def start(self):
+        """Start the writer thread (called automatically by append)"""
+        with self._start_lock:
+            if self._pid != os.getpid():
+                # Threads do not survive fork(); the parent's buffer is not ours
+                self._pid = os.getpid()
+                self._reset()
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._work, name="event-log", daemon=True)
+            self._thread.start()
+
+    def append(self, event):
+        """
+        Buffer one event for writing
+
+        Returns:
+            True if buffered, False if it was dropped because the buffer is full
+        """
+        if self._pid != os.getpid() or not self._running:
+            self.start()
+        try:
+            if self.policy == "block":
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.appended += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def flush(self, timeout=5.0):
+        """
+        Write everything buffered so far in this process, waiting for it
+
+        Returns:
+            True if the write finished within timeout
+        """
+        if self._pid != os.getpid() or not self._running:
+            return True
+        request = _FlushRequest()
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            return False
+        return request.done.wait(timeout)
+
+    def stop(self, timeout=5.0):
+        """Write what is buffered (up to timeout), then stop the writer"""
+        flushed = self.flush(timeout)
+        self._running = False
+        if self._thread is not None:
+            try:
+                self._queue.put_nowait(None)  # wake the writer so it sees _running
+            except queue.Full:
+                pass
+            self._thread.join(timeout=1.0)
+        return flushed
+
+    def stats(self):
+        """Buffer depth, event counters and batch write times"""
+        with self._lock:
+            times = sorted(self._write_times)
+            counters = {
+                "policy": self.policy,
+                "depth": self._queue.qsize(),
+                "max_depth": self.max_depth,
+                "appended": self.appended,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "avg_batch": round(self.written / self.batches, 1) if self.batches else 0.0,
+            }
+
+        def pick(fraction):
+            if not times:
+                return 0.0
+            index = min(len(times) - 1, int(round(fraction * (len(times) - 1))))
+            return round(times[index] * 1000, 2)
+
+        counters["write_ms"] = {"p50": pick(0.5), "p99": pick(0.99), "max": pick(1.0)}
+        return counters
+
+    def _work(self):
+        batch = []
+        deadline = None
+        while self._running or batch:
+            timeout = 0.5 if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write(batch)
+                batch, deadline = [], None
+                continue
+            if item is None:
+                continue
+
+            if isinstance(item, _FlushRequest):
+                # Everything queued before the request is already in batch
+                self._write(batch)
+                batch, deadline = [], None
+                item.done.set()
+                continue
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.max_batch:
+                self._write(batch)
+                batch, deadline = [], None
+
+    def _write(self, batch):
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            self.write_batch(batch)
+        except Exception as e:  # keep the writer alive; the events are lost
+            with self._lock:
+                self.failed += len(batch)
+            print(f"Event log: failed to write {len(batch)} events: {e}", file=sys.stderr)
+            return
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+            self._write_times.append(time.perf_counter() - started)
@@ -0,0 +1,506 @@
+"""
+(J)ai Kisan - Least-Cost Fertilizer Mix Solver
+Works out how many bags of each fertilizer meet an N-P-K requirement at least cost
+
+Products are split into straight fertilizers that carry a single nutrient
+(Urea, MOP) and multi-nutrient ones (DAP, NPK complexes). Once the number of
+multi-nutrient bags is fixed, the cheapest way to top up each remaining
+nutrient with straight fertilizers is a simple division, so the solver only
+has to search over multi-nutrient bag counts:
+
+1. The linear-programming optimum is found by enumerating basic solutions,
+   each rounded up to whole bags and trimmed of bags that are not needed.
+   The cheapest of these is a good whole-bag mix and an upper bound on cost.
+2. No optimal mix can contain more bags of a product than that upper bound
+   buys, so for farm-sized requirements the remaining multi-nutrient
+   combinations are few enough (at most MAX_EXACT_COMBINATIONS) to evaluate
+   them all, which gives the exact whole-bag optimum.
+
+For larger areas the rounded LP mix is used as is; its rounding loss is at
+most a bag or two per product, which is negligible at that scale.
+
+With NumPy installed, solve_batch runs the same algorithm vectorized over
+thousands of farms in a single call.
+"""
+
+import math
+from itertools import combinations, product
+
+from data.fertilizer_data import FERTILIZER_TYPES, BRANDED_FERTILIZERS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; solve_batch falls back to a loop
+    np = None
+
+NUTRIENTS = ("N", "P", "K")
+BAG_KG = 50
+
+# Largest number of multi-nutrient bag combinations searched exhaustively per farm
+MAX_EXACT_COMBINATIONS = 10000
+
+_EPSILON = 1e-9
+_INFEASIBLE = "Requirement cannot be met with the available fertilizers"
+
+
+def _invert_3x3(m):
+    """Inverse of a 3×3 matrix (list of rows), or None if it is singular"""
+    (a, b, c), (d, e, f), (g, h, i) = m
+    det = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+    if abs(det) < _EPSILON:
+        return None
+    return [
+        [(e * i - f * h) / det, (c * h - b * i) / det, (b * f - c * e) / det],
+        [(f * g - d * i) / det, (a * i - c * g) / det, (c * d - a * f) / det],
+        [(d * h - e * g) / det, (b * g - a * h) / det, (a * e - b * d) / det],
+    ]
+
+
+class FertilizerMixSolver:
+    """
+    Least-cost whole-bag fertilizer combinations
+
+    Only fertilizer types that have both nutrient content in FERTILIZER_TYPES
+    and at least one priced brand in BRANDED_FERTILIZERS take part; each is
+    costed at its cheapest brand.
+    """
+
+    def __init__(self, fertilizer_types=FERTILIZER_TYPES,
+                 branded_fertilizers=BRANDED_FERTILIZERS, bag_kg=BAG_KG, model=None):
+        """
+        Args:
+            fertilizer_types, branded_fertilizers: Nutrient content and brand
+                prices, as in the data tables
+            bag_kg: Bag size in kg
+            model: AgronomyModel whose fertilizer and brand records are used
+                instead of the two tables
+        """
+        self.bag_kg = bag_kg
+        self.products = []
+        self.brands = []
+        self.prices = []
+        self.supply = []  # kg of (N, P, K) in one bag, per product
+
+        if model is not None:
+            priced = [(record.name, (record.n, record.p, record.k), offer.brand,
+                       offer.price_per_50kg) for record, offer in model.cheapest_offers()]
+        else:
+            priced = []
+            for name, info in fertilizer_types.items():
+                offers = branded_fertilizers.get(name)
+                if not offers:
+                    continue
+                cheapest = min(offers, key=lambda offer: offer["price_per_50kg"])
+                priced.append((name, tuple(info["nutrient_content"].get(n, 0) for n in NUTRIENTS),
+                               cheapest["brand"], cheapest["price_per_50kg"]))
+
+        for name, content, brand, price_per_50kg in priced:
+            supply = [percent * bag_kg / 100 for percent in content]
+            if not any(supply):
+                continue
+            self.products.append(name)
+            self.brands.append(brand)
+            self.prices.append(price_per_50kg * bag_kg / 50)
+            self.supply.append(supply)
+
+        # Straight fertilizers per nutrient, and multi-nutrient products
+        self._straight = [[] for _ in NUTRIENTS]
+        self._multi = []
+        for j, supply in enumerate(self.supply):
+            carried = [k for k in range(len(NUTRIENTS)) if supply[k] > 0]
+            if len(carried) == 1:
+                self._straight[carried[0]].append(j)
+            else:
+                self._multi.append(j)
+
+        self._bases = self._enumerate_bases()
+        # After rounding up, the most expensive products are trimmed first
+        self._trim_order = sorted(range(len(self.products)), key=lambda j: -self.prices[j])
+        self._arrays = None
+
+    # ------------------------------------------------------------------
+    # Single farm
+    # ------------------------------------------------------------------
+
+    def solve(self, requirement, area_ha=1.0):
+        """
+        Cheapest whole-bag combination for one farm
+
+        Args:
+            requirement: Dictionary with N, P, K in kg/hectare
+            area_ha: Farm area in hectares
+
+        Returns:
+            Dictionary with the total requirement, bags per fertilizer (and the
+            brand each is costed at), nutrients actually supplied, the total
+            cost in ₹ and whether the mix is the proven whole-bag optimum
+
+        Raises:
+            ValueError: If no combination of the priced fertilizers meets it
+        """
+        target = self._target(requirement, area_ha)
+        whole = self._rounded_lp(target)
+        upper = sum(c * p for c, p in zip(whole, self.prices))
+
+        bounds = self._multi_bounds(target, upper)
+        exact = self._grid_size(bounds) <= MAX_EXACT_COMBINATIONS
+        if exact:
+            whole = self._exact(target, bounds, whole, upper)
+        return self._describe(target, whole, exact, area_ha)
+
+    def solve_many(self, requirements, areas):
+        """
+        solve() for many farms, vectorized through solve_batch when NumPy is installed
+
+        Args:
+            requirements: Sequence of dictionaries with N, P, K in kg/hectare
+            areas: Sequence of farm areas in hectares
+
+        Returns:
+            List of solve() results, in input order
+        """
+        if np is None:
+            return [self.solve(r, area) for r, area in zip(requirements, areas)]
+        targets = [self._target(r, area) for r, area in zip(requirements, areas)]
+        if not targets:
+            return []
+        batch = self.solve_batch(targets)
+        return [
+            self._describe(target, whole, bool(exact), area)
+            for target, whole, exact, area in zip(
+                targets, batch["bags"].tolist(), batch["optimal"], areas)
+        ]
+
+    @staticmethod
+    def _target(requirement, area_ha):
+        """Total kg of N, P, K needed for the area"""
+        return [max(0.0, float(requirement.get(n, 0) or 0)) * area_ha for n in NUTRIENTS]
+
+    def _describe(self, target, whole, exact, area_ha):
+        """Result dictionary for a whole-bag count per product"""
+        bags = {}
+        brands = {}
+        for j, count in enumerate(whole):
+            if count:
+                bags[self.products[j]] = count
+                brands[self.products[j]] = self.brands[j]
+        supplied = [sum(self.supply[j][k] * whole[j] for j in range(len(whole)))
+                    for k in range(len(NUTRIENTS))]
+
+        return {
+            "area_ha": area_ha,
+            "requirement_kg": dict(zip(NUTRIENTS, (round(t, 2) for t in target))),
+            "bags": bags,
+            "brands": brands,
+            "bag_kg": self.bag_kg,
+            "supplied_kg": dict(zip(NUTRIENTS, (round(s, 2) for s in supplied))),
+            "total_cost": round(sum(c * p for c, p in zip(whole, self.prices)), 2),
+            "optimal": exact,
+        }
+
+    def _multi_bounds(self, target, upper):
+        """Most bags of each multi-nutrient product an optimal mix can contain"""
+        bounds = []
+        for j in self._multi:
+            # More bags than this cost more than the known mix ...
+            bound = int(math.floor(upper / self.prices[j] + _EPSILON))
+            # ... or oversupply every nutrient the product carries
+            cover = 0
+            for k, amount in enumerate(self.supply[j]):
+                if amount > 0:
+                    cover = max(cover, math.ceil(target[k] / amount - _EPSILON))
+            bounds.append(min(bound, cover))
+        return bounds
+
+    @staticmethod
+    def _grid_size(bounds):
+        size = 1
+        for bound in bounds:
+            size *= bound + 1
+        return size
+
+    def _cheapest_top_up(self, k, deficit):
+        """(cost, product, bags) of the cheapest straight fertilizer covering a deficit"""
+        best = None
+        for j in self._straight[k]:
+            count = math.ceil(deficit / self.supply[j][k] - _EPSILON)
+            cost = count * self.prices[j]
+            if best is None or cost < best[0] - _EPSILON:
+                best = (cost, j, count)
+        return best
+
+    def _exact(self, target, bounds, whole, upper):
+        """Exhaustive search over multi-nutrient bag counts for a mix cheaper than upper"""
+        best_cost = upper
+        best = None
+        for counts in product(*(range(bound + 1) for bound in bounds)):
+            cost = 0.0
+            supplied = [0.0, 0.0, 0.0]
+            for j, count in zip(self._multi, counts):
+                if count:
+                    cost += count * self.prices[j]
+                    for k in range(3):
+                        supplied[k] += count * self.supply[j][k]
+
+            top_up = []
+            for k in range(3):
+                deficit = target[k] - supplied[k]
+                if deficit <= _EPSILON:
+                    continue
+                option = self._cheapest_top_up(k, deficit)
+                if option is None:
+                    cost = math.inf
+                    break
+                cost += option[0]
+                top_up.append(option)
+
+            if cost < best_cost - _EPSILON:
+                best_cost = cost
+                best = (counts, top_up)
+
+        if best is None:
+            return whole
+        whole = [0] * len(self.products)
+        for j, count in zip(self._multi, best[0]):
+            whole[j] = count
+        for _, j, count in best[1]:
+            whole[j] += count
+        return whole
+
+    def _enumerate_bases(self):
+        """All non-singular bases of [products | surplus] as (columns, inverse)"""
+        columns = [list(supply) for supply in self.supply]
+        # Column len(products)+k is the surplus of nutrient k
+        for k in range(len(NUTRIENTS)):
+            columns.append([-1.0 if row == k else 0.0 for row in range(3)])
+
+        bases = []
+        for chosen in combinations(range(len(columns)), 3):
+            matrix = [[columns[j][row] for j in chosen] for row in range(3)]
+            inverse = _invert_3x3(matrix)
+            if inverse is not None:
+                bases.append((chosen, inverse))
+        return bases
+
+    def _rounded_lp(self, target):
+        """Cheapest basic solution of the linear programme, rounded up to whole bags"""
+        best_cost = math.inf
+        best = None
+        for chosen, inverse in self._bases:
+            x = [sum(inverse[row][k] * target[k] for k in range(3)) for row in range(3)]
+            if min(x) < -_EPSILON:
+                continue
+            bags = [0] * len(self.products)
+            for column, amount in zip(chosen, x):
+                if column < len(self.products) and amount > _EPSILON:
+                    bags[column] = math.ceil(amount - _EPSILON)
+            bags = self._trim(bags, target)
+            cost = sum(c * p for c, p in zip(bags, self.prices))
+            if cost < best_cost - _EPSILON:
+                best_cost, best = cost, bags
+        if best is None:
+            raise ValueError(_INFEASIBLE)
+        return best
+
+    def _trim(self, bags, target):
+        """Drop bags, most expensive product first, while the target is still met"""
+        supplied = [sum(self.supply[j][k] * bags[j] for j in range(len(bags)))
+                    for k in range(3)]
+        for j in self._trim_order:
+            spare = bags[j]
+            for k in range(3):
+                if self.supply[j][k] > 0:
+                    spare = min(spare, math.floor(
+                        (supplied[k] - target[k] + _EPSILON) / self.supply[j][k]))
+            if spare > 0:
+                bags[j] -= spare
+                for k in range(3):
+                    supplied[k] -= spare * self.supply[j][k]
+        return bags
+
+    # ------------------------------------------------------------------
+    # Many farms
+    # ------------------------------------------------------------------
+
+    def solve_batch(self, requirements, areas=None):
+        """
+        Cheapest whole-bag combinations for many farms at once
+
+        Args:
+            requirements: Sequence (or F×3 array) of N, P, K in kg/hectare,
+                one row per farm
+            areas: Optional sequence of farm areas in hectares (default 1.0)
+
+        Returns:
+            Dictionary with "products" (column names), "bags" (F×products
+            whole-bag counts), "cost" (₹ per farm), "optimal" (per farm, as in
+            solve) and "totals" (bags of each product across all farms, for
+            procurement). "bags", "cost" and "optimal" are NumPy arrays when
+            NumPy is installed, plain lists otherwise.
+
+        Raises:
+            ValueError: If any farm's requirement cannot be met
+        """
+        if np is None:
+            return self._solve_batch_python(requirements, areas)
+
+        targets = np.asarray(requirements, dtype=float).reshape(-1, 3).clip(min=0)
+        if areas is not None:
+            targets = targets * np.asarray(areas, dtype=float).reshape(-1, 1)
+
+        supply, prices, multi = self._numpy_arrays()
+        whole = self._rounded_lp_batch(targets)
+        upper = whole @ prices
+
+        if len(multi):
+            multi_supply = supply[multi]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where(multi_supply[None] > 0,
+                                 targets[:, None, :] / multi_supply[None], 0.0)
+            cover = np.ceil(ratio.max(axis=2) - _EPSILON)
+            bound = np.floor(upper[:, None] / prices[multi][None] + _EPSILON)
+            bounds = np.minimum(cover, bound).clip(min=0).astype(np.int64)
+        else:
+            bounds = np.zeros((len(targets), 0), dtype=np.int64)
+        exact = np.prod(bounds + 1, axis=1) <= MAX_EXACT_COMBINATIONS
+
+        if exact.any():
+            rows = np.flatnonzero(exact)
+            whole[rows] = self._exact_batch(targets[rows], bounds[rows],
+                                            whole[rows], upper[rows])
+
+        return {
+            "products": list(self.products),
+            "bags": whole,
+            "cost": whole @ prices,
+            "optimal": exact,
+            "totals": dict(zip(self.products, whole.sum(axis=0).tolist())),
+        }
+
+    def _numpy_arrays(self):
+        """Product supply, prices and multi-nutrient indices as arrays"""
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self.supply, dtype=float).reshape(-1, 3),
+                np.asarray(self.prices, dtype=float),
+                np.asarray(self._multi, dtype=np.int64),
+            )
+        return self._arrays
+
+    def _exact_batch(self, targets, bounds, whole, upper, max_cells=250000):
+        """
+        Vectorized _exact
+
+        Farms are ordered by search size and evaluated in groups that share
+        one grid of multi-nutrient bag counts (the group's largest bounds), so
+        a few large farms do not inflate the grid for every small one.
+        """
+        whole = whole.copy()
+        order = np.argsort(np.prod(bounds + 1, axis=1), kind="stable")
+        start = 0
+        while start < len(order):
+            # Grow the group while farms × grid points stays within max_cells
+            stop = start + 1
+            group_bounds = bounds[order[start]]
+            while stop < len(order):
+                widened = np.maximum(group_bounds, bounds[order[stop]])
+                if (stop + 1 - start) * np.prod(widened + 1) > max_cells:
+                    break
+                group_bounds = widened
+                stop += 1
+            rows = order[start:stop]
+            whole[rows] = self._exact_group(targets[rows], group_bounds,
+                                            whole[rows], upper[rows])
+            start = stop
+        return whole
+
+    def _exact_group(self, targets, grid_bounds, whole, upper):
+        """Evaluate every grid point for a group of farms and keep any cheaper mix"""
+        supply, prices, multi = self._numpy_arrays()
+        grid = np.array(list(product(*(range(int(b) + 1) for b in grid_bounds))),
+                        dtype=float).reshape(-1, len(multi))
+        rows = np.arange(len(targets))
+        deficit = targets[:, None, :] - (grid @ supply[multi])[None]
+        total = np.repeat((grid @ prices[multi])[None], len(targets), axis=0)
+
+        top_ups = []
+        for k in range(3):
+            needed = deficit[:, :, k] > _EPSILON
+            straight = self._straight[k]
+            if not straight:
+                total[needed] = np.inf
+                continue
+            best_cost = best_count = best_product = None
+            for j in straight:
+                count = np.where(needed,
+                                 np.ceil(deficit[:, :, k] / supply[j, k] - _EPSILON), 0.0)
+                cost = count * prices[j]
+                if best_cost is None:
+                    best_cost, best_count = cost, count
+                    best_product = np.full(cost.shape, j)
+                else:
+                    better = cost < best_cost - _EPSILON
+                    best_cost = np.where(better, cost, best_cost)
+                    best_count = np.where(better, count, best_count)
+                    best_product = np.where(better, j, best_product)
+            total += best_cost
+            top_ups.append((best_product, best_count))
+
+        choice = total.argmin(axis=1)
+        improved = total[rows, choice] < upper - _EPSILON
+        if not improved.any():
+            return whole
+
+        found = np.zeros_like(whole)
+        found[:, multi] = grid[choice].astype(np.int64)
+        for best_product, best_count in top_ups:
+            np.add.at(found, (rows, best_product[rows, choice]),
+                      best_count[rows, choice].astype(np.int64))
+        return np.where(improved[:, None], found, whole)
+
+    def _rounded_lp_batch(self, targets):
+        """Vectorized _rounded_lp"""
+        supply, prices, _ = self._numpy_arrays()
+        count = len(self.products)
+        columns = np.array([chosen for chosen, _ in self._bases])
+        inverses = np.array([inverse for _, inverse in self._bases])
+
+        x = np.einsum("bij,fj->fbi", inverses, targets)
+        feasible = (x >= -_EPSILON).all(axis=2)
+        x = np.where(feasible[:, :, None], x, 0.0)
+        bags = np.zeros(x.shape[:2] + (count + 3,))
+        np.put_along_axis(bags, np.broadcast_to(columns, x.shape), x, axis=2)
+        bags = bags[:, :, :count]
+        bags = np.where(bags > _EPSILON, np.ceil(bags - _EPSILON), 0.0)
+
+        surplus = bags @ supply - targets[:, None, :] + _EPSILON
+        for j in self._trim_order:
+            carried = supply[j] > 0
+            spare = np.floor(surplus[:, :, carried] / supply[j, carried]).min(axis=2)
+            spare = np.minimum(bags[:, :, j], spare).clip(min=0)
+            bags[:, :, j] -= spare
+            surplus -= spare[:, :, None] * supply[j]
+
+        cost = np.where(feasible, bags @ prices, np.inf)
+        choice = cost.argmin(axis=1)
+        rows = np.arange(len(targets))
+        if np.isinf(cost[rows, choice]).any():
+            raise ValueError(_INFEASIBLE)
+        return bags[rows, choice].astype(np.int64)
+
+    def _solve_batch_python(self, requirements, areas):
+        """solve_batch without NumPy: one solve per farm"""
+        bags = []
+        cost = []
+        optimal = []
+        totals = dict.fromkeys(self.products, 0)
+        for index, row in enumerate(requirements):
+            area = 1.0 if areas is None else areas[index]
+            result = self.solve(dict(zip(NUTRIENTS, row)), area)
+            bags.append([result["bags"].get(name, 0) for name in self.products])
+            cost.append(result["total_cost"])
+            optimal.append(result["optimal"])
+            for name, count in result["bags"].items():
+                totals[name] += count
+        return {"products": list(self.products), "bags": bags, "cost": cost,
+                "optimal": optimal, "totals": totals}
@@ -0,0 +1,55 @@
+"""
+(J)ai Kisan - Gunicorn Configuration
+Worker and concurrency settings for production serving
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+
+Every setting can be overridden from the environment (see DEPLOYMENT.md).
+The default gthread worker serves GUNICORN_THREADS requests per process, so
+a view waiting on Twilio or Razorpay blocks one thread instead of a whole
+worker. GUNICORN_WORKER_CLASS=gevent (pip install gevent) turns each
+request into a greenlet instead, for many more concurrent slow requests.
+"""
+
+import multiprocessing
+import os
+import sys
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+
+# Processes: one per core is enough with threads/greenlets doing the waiting
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+
+# sync | gthread | gevent
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+# Requests in flight per process: threads for gthread, greenlets for gevent
+threads = int(os.getenv("GUNICORN_THREADS", "32"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+
+# Pending connections queued by the kernel before they are accepted
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+
+# Import the app (agent data, precomputed matrix) once and share it with workers
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the preloading master, watch data files"""
+    web = sys.modules.get("app")
+    if web is not None:
+        with web.app.app_context():
+            web.db.engine.dispose()
+        web.data_store.after_fork()
@@ -0,0 +1,79 @@
+"""
+(J)ai Kisan - Recommendation History Export
+Encodes history rows as CSV or JSON Lines, chunk by chunk
+
+The encoders take any iterable of rows (normally a database cursor read
+with yield_per) and yield text a few hundred rows at a time, so an export
+never holds more than one chunk in memory however long the history is.
+"""
+
+import csv
+import io
+import json
+
+# Columns in export order; rows are tuples in this order
+HISTORY_FIELDS = ("id", "created_at", "crop", "state", "growth_stage", "data_version")
+
+# Export format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+}
+
+
+def row_to_dict(row):
+    """One history row as a JSON-ready dictionary"""
+    item = dict(zip(HISTORY_FIELDS, row))
+    item["created_at"] = item["created_at"].isoformat(timespec="seconds")
+    return item
+
+
+def _chunks(rows, chunk_rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def encode_csv(rows, chunk_rows=500):
+    """
+    Yield a CSV export (header first) in chunks of chunk_rows rows
+
+    Args:
+        rows: Iterable of tuples in HISTORY_FIELDS order
+        chunk_rows: Rows encoded per yielded string
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HISTORY_FIELDS)
+    yield buffer.getvalue()
+    for chunk in _chunks(rows, chunk_rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (row[0], row[1].isoformat(timespec="seconds")) + tuple(row[2:]) for row in chunk
+        )
+        yield buffer.getvalue()
+
+
+def encode_jsonl(rows, chunk_rows=500):
+    """
+    Yield a JSON Lines export, one object per row, in chunks of chunk_rows rows
+
+    Args:
+        rows: Iterable of tuples in HISTORY_FIELDS order
+        chunk_rows: Rows encoded per yielded string
+    """
+    for chunk in _chunks(rows, chunk_rows):
+        yield "".join(json.dumps(row_to_dict(row), ensure_ascii=False) + "\n" for row in chunk)
+
+
+def encode_history(rows, export_format, chunk_rows=500):
+    """Dispatch to the encoder for export_format ("csv" or "jsonl")"""
+    if export_format == "jsonl":
+        return encode_jsonl(rows, chunk_rows)
+    return encode_csv(rows, chunk_rows)
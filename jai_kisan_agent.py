@@ -3,12 +3,18 @@
 Core AI Agent Implementation
 """
 
-from data.crops_data import CROP_CATEGORIES, CROP_NPK_REQUIREMENTS, DEFAULT_NPK
-from data.states_data import STATE_REGIONS, STATE_SOIL_INFO, CROPPING_SEASONS
-from data.fertilizer_data import (
-    FERTILIZER_TYPES, BRANDED_FERTILIZERS, ECO_ALTERNATIVES,
-    GROWTH_STAGE_FERTILIZERS
-)
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
+
+from fertilizer_mix import FertilizerMixSolver
+from prompt_loader import default_loader as default_prompt_loader
+from response_renderer import MarkdownRenderer, to_json_dict
+from data.resolver import NameResolver, UnresolvedNameError
+from data.snapshot import default_data
+
+# Output formats supported by generate_response
+RESPONSE_FORMATS = ("markdown", "json")
 
 
 class JaiKisanAgent:
@@ -19,46 +25,61 @@ class JaiKisanAgent:
     and environmental stewardship.
     """
     
-    def __init__(self):
+    def __init__(self, precompute=False, prompt_loader=None, model=None, data=None):
+        """
+        Args:
+            precompute: If True, materialize every crop × state × growth stage
+                recommendation at startup (see precompute_recommendations)
+            prompt_loader: SystemPromptLoader to read the system prompt from;
+                defaults to the shared loader for system_prompt.md
+            model: AgronomyModel to read crops, states and N-P-K data from;
+                defaults to the one in data
+            data: DataSnapshot the agent answers from for its whole life;
+                defaults to the tables the data modules loaded at import
+        """
+        self.data = data or default_data
+        self.model = model or self.data.model
+        self.resolver = (self.data.resolver if self.model is self.data.model
+                         else NameResolver(self.model))
         self.persona = "Digital Village Elder"
         self.greeting = "नमस्ते! (Namaste!)"
+        self.renderer = MarkdownRenderer(self.greeting)
+        self.prompt_loader = prompt_loader or default_prompt_loader
+        self.mix_solver = FertilizerMixSolver(model=self.model)
+        self._priced_stage_components = lru_cache(maxsize=4096)(
+            self._priced_stage_components_uncached)
+        self._stage_mix = lru_cache(maxsize=4096)(self._stage_mix_uncached)
+        self._matrix = None
+        if precompute:
+            self.precompute_recommendations()
         
     def get_crop_categories(self):
         """Returns all crop categories and their crops"""
-        return CROP_CATEGORIES
+        return self.data.crop_categories
     
     def get_all_crops(self):
         """Returns a flat list of all crops"""
-        all_crops = []
-        for crops in CROP_CATEGORIES.values():
-            all_crops.extend(crops)
-        return all_crops
+        return list(self.model.crops.names)
     
     def get_state_regions(self):
         """Returns all states organized by region"""
-        return STATE_REGIONS
+        return self.data.state_regions
     
     def get_all_states(self):
         """Returns a flat list of all states"""
-        all_states = []
-        for states in STATE_REGIONS.values():
-            all_states.extend(states)
-        return all_states
+        return list(self.model.states.names)
     
     def get_growth_stages(self):
         """Returns all growth stages"""
-        return [
-            "Field Preparation (Basal Dose)",
-            "Sowing/Early Growth",
-            "Vegetative Phase (Leaves/Stem growth)",
-            "Flowering & Fruiting",
-            "Pre-Harvest"
-        ]
+        return list(self.model.stages.names)
     
     def get_npk_requirement(self, crop, growth_stage):
         """
         Get NPK requirement for a specific crop and growth stage
         
+        Crops without stage-wise data get their DEFAULT_NPK season total
+        split by stage (precomputed in the model for the known stages).
+        
         Args:
             crop: Name of the crop
             growth_stage: Current growth stage
@@ -66,22 +87,7 @@ class JaiKisanAgent:
         Returns:
             Dictionary with N, P, K requirements in kg/hectare
         """
-        if crop in CROP_NPK_REQUIREMENTS:
-            if growth_stage in CROP_NPK_REQUIREMENTS[crop]:
-                return CROP_NPK_REQUIREMENTS[crop][growth_stage]
-        
-        # Fallback to default NPK if available
-        if crop in DEFAULT_NPK:
-            total = DEFAULT_NPK[crop]
-            # Distribute based on growth stage
-            if "Basal" in growth_stage:
-                return {"N": total["N"] * 0.3, "P": total["P"] * 0.6, "K": total["K"] * 0.4}
-            elif "Vegetative" in growth_stage:
-                return {"N": total["N"] * 0.4, "P": total["P"] * 0.2, "K": total["K"] * 0.3}
-            elif "Flowering" in growth_stage:
-                return {"N": total["N"] * 0.2, "P": total["P"] * 0.2, "K": total["K"] * 0.3}
-        
-        return None
+        return self.model.npk_requirement(crop, growth_stage)
     
     def get_state_info(self, state):
         """
@@ -93,9 +99,147 @@ class JaiKisanAgent:
         Returns:
             Dictionary with soil pH, type, common issues, and agro-climatic zone
         """
-        return STATE_SOIL_INFO.get(state, None)
+        return self.model.state_info(state)
+    
+    def get_fertilizer_mix(self, crop, growth_stage, area_ha=1.0):
+        """
+        Cheapest combination of whole fertilizer bags for a farm
+        
+        Args:
+            crop: Name of the crop
+            growth_stage: Current growth stage
+            area_ha: Farm area in hectares
+            
+        Returns:
+            Dictionary with bags per fertilizer, nutrients supplied and total
+            cost (see FertilizerMixSolver.solve), or None if the NPK
+            requirement is unknown
+        """
+        npk = self.get_npk_requirement(crop, growth_stage)
+        if not npk:
+            return None
+        return self.mix_solver.solve(npk, area_ha)
+    
+    def get_fertilizer_mixes(self, farms):
+        """
+        get_fertilizer_mix for many farms, solved together in one batch
+        
+        Args:
+            farms: Iterable of (crop, growth_stage, area_ha) tuples
+            
+        Returns:
+            List of mix dictionaries (None where the NPK requirement is
+            unknown), in input order
+        """
+        results = []
+        pending = []
+        for crop, growth_stage, area_ha in farms:
+            npk = self.get_npk_requirement(crop, growth_stage)
+            if npk:
+                pending.append((len(results), npk, area_ha))
+            results.append(None)
+        
+        mixes = self.mix_solver.solve_many([npk for _, npk, _ in pending],
+                                           [area_ha for _, _, area_ha in pending])
+        for (index, _, _), mix in zip(pending, mixes):
+            results[index] = mix
+        return results
+    
+    def get_season_schedule(self, crop, sowing_date, area_ha=1.0, season=None):
+        """
+        Season plan for a crop, one growth stage at a time
+        
+        Stages are dated from the sowing date and the crop's season in
+        CROPPING_SEASONS (see data/seasons.py). The plan is a generator:
+        a stage's fertilizer mix is only worked out when the stage is
+        reached, so reading the first stages does not cost the whole
+        season. For season totals alone, use get_season_summary.
+        
+        Args:
+            crop: Name of the crop
+            sowing_date: datetime.date the crop is sown
+            area_ha: Farm area in hectares
+            season: Season name to use instead of the one for the date
+            
+        Returns:
+            Iterator of dictionaries, one per growth stage in growing
+            order, with "growth_stage", "window" ("start" and "end" ISO
+            dates), "timing", "dose_kg" for the area, "mix" (see
+            get_fertilizer_mix; None without an N-P-K requirement),
+            "eco_alternatives" (names), and "cost" and "cumulative_cost" in ₹
+            
+        Raises:
+            ValueError: for an unknown season, before any stage is produced
+        """
+        plan = self.data.season_calendar.plan(crop, sowing_date, season)
+        return self._expand_schedule(plan, area_ha)
+    
+    def _expand_schedule(self, plan, area_ha):
+        cumulative_cost = 0.0
+        for growth_stage, start, end in plan.stages:
+            npk = self.get_npk_requirement(plan.crop, growth_stage)
+            mix = self._stage_mix(plan.crop, growth_stage, area_ha) if npk else None
+            cost = mix["total_cost"] if mix and "total_cost" in mix else 0.0
+            cumulative_cost += cost
+            stage_fertilizers = self.data.growth_stage_fertilizers.get(growth_stage, {})
+            yield {
+                "growth_stage": growth_stage,
+                "window": {"start": start.isoformat(), "end": end.isoformat()},
+                "timing": stage_fertilizers.get("timing", ""),
+                "dose_kg": ({n: round(npk[n] * area_ha, 2) for n in ("N", "P", "K")}
+                            if npk else None),
+                "mix": mix,
+                "eco_alternatives": list(self._get_relevant_eco_alternatives(growth_stage)),
+                "cost": cost,
+                "cumulative_cost": round(cumulative_cost, 2),
+            }
+    
+    def get_season_summary(self, crop, sowing_date, season=None):
+        """
+        Season totals per hectare, without expanding the stages
+        
+        Totals come straight from the N-P-K table and the per-hectare
+        stage mixes, which are cached per crop and stage, so a repeated
+        summary costs a few dictionary lookups.
+        
+        Args:
+            crop, sowing_date, season: As for get_season_schedule
+            
+        Returns:
+            Dictionary with "crop", "season", "months", "sowing_date",
+            "harvest_date", "stages", "npk_per_ha" (kg of N, P and K over
+            the season) and "cost_per_ha" (₹, whole 50 kg bags per stage)
+        """
+        plan = self.data.season_calendar.plan(crop, sowing_date, season)
+        totals = {"N": 0.0, "P": 0.0, "K": 0.0}
+        cost = 0.0
+        for growth_stage, _, _ in plan.stages:
+            npk = self.get_npk_requirement(crop, growth_stage)
+            if not npk:
+                continue
+            for nutrient in totals:
+                totals[nutrient] += npk[nutrient]
+            cost += self._stage_mix(crop, growth_stage, 1.0).get("total_cost", 0.0)
+        return {
+            "crop": crop,
+            "season": plan.season.name,
+            "months": plan.season.months,
+            "sowing_date": plan.sowing_date.isoformat(),
+            "harvest_date": plan.harvest_date.isoformat(),
+            "stages": len(plan.stages),
+            "npk_per_ha": {n: round(value, 2) for n, value in totals.items()},
+            "cost_per_ha": round(cost, 2),
+        }
+    
+    def _stage_mix_uncached(self, crop, growth_stage, area_ha):
+        """Fertilizer mix for one stage, or an "error" entry if none meets it"""
+        try:
+            return self.get_fertilizer_mix(crop, growth_stage, area_ha)
+        except ValueError as e:
+            return {"error": str(e)}
     
-    def get_fertilizer_recommendations(self, crop, state, growth_stage):
+    def get_fertilizer_recommendations(self, crop, state, growth_stage, district=None,
+                                       as_of=None):
         """
         Generate comprehensive fertilizer recommendations
         
@@ -103,58 +247,145 @@ class JaiKisanAgent:
             crop: Name of the crop
             state: Name of the state
             growth_stage: Current growth stage
+            district: Optional district, for its dealer prices
+            as_of: Optional datetime.date the prices apply on (default: today)
             
         Returns:
             Dictionary with recommendations including NPK needs, fertilizer options,
-            prices, and eco-friendly alternatives
+            prices, and eco-friendly alternatives. With regional prices
+            loaded, prices are the ones in force at the place on the date,
+            and "price_context" says which place and date that was.
         """
-        npk_needs = self.get_npk_requirement(crop, growth_stage)
-        state_info = self.get_state_info(state)
-        stage_fertilizers = GROWTH_STAGE_FERTILIZERS.get(growth_stage, {})
+        context = self.price_context(state, district, as_of)
+        if context is not None:
+            recommendation = self._build_recommendation(
+                crop, state, growth_stage,
+                self._priced_stage_components(growth_stage, state, *context)
+            )
+            recommendation["price_context"] = {"state": state, "district": context[0] or None,
+                                               "as_of": context[1]}
+            return recommendation
+        
+        if self._matrix is not None:
+            entry = self._matrix.get((crop, state, growth_stage))
+            if entry is not None:
+                return entry[0]
+        
+        return self._build_recommendation(
+            crop, state, growth_stage, self._get_stage_components(growth_stage)
+        )
+    
+    def price_context(self, state, district=None, as_of=None):
+        """
+        Place and date regional prices are looked up for
+        
+        Districts without prices of their own count as "" (the state's
+        prices apply), so requests that get the same prices share a key.
+        
+        Returns:
+            Tuple of (district key or "", ISO date), or None when no
+            regional prices are loaded and the list prices apply
+        """
+        prices = self.data.prices
+        if not len(prices):
+            return None
+        return (prices.district_key(state, district) or "",
+                (as_of or date.today()).isoformat())
+    
+    def _get_stage_components(self, growth_stage):
+        """Stage-dependent parts of a recommendation, shared by every crop and state"""
+        stage_fertilizers = self.data.growth_stage_fertilizers.get(growth_stage, {})
+        return (
+            stage_fertilizers,
+            self._get_relevant_eco_alternatives(growth_stage),
+            self._get_price_comparison(stage_fertilizers.get("primary", [])),
+            self.data.nutrient_costs.stage_costs(growth_stage)
+        )
+    
+    def _priced_stage_components_uncached(self, growth_stage, state, district, as_of):
+        """Stage components at the dealer prices of a place on an ISO date"""
+        prices = self.data.prices
+        day = date.fromisoformat(as_of)
+        
+        def lookup(product, brand):
+            return prices.lookup(product, brand, state, district or None, day)
+        
+        def price_of(product, brand):
+            point = lookup(product, brand)
+            return None if point is None else point.price_per_50kg
+        
+        stage_fertilizers = self.data.growth_stage_fertilizers.get(growth_stage, {})
+        return (
+            stage_fertilizers,
+            self._get_relevant_eco_alternatives(growth_stage),
+            self._get_price_comparison(stage_fertilizers.get("primary", []), lookup),
+            self.data.nutrient_costs.stage_costs(growth_stage, price_of)
+        )
+    
+    def _build_recommendation(self, crop, state, growth_stage, stage_components):
+        """Assemble a recommendation dictionary from precomputed stage components"""
+        stage_fertilizers, eco_alternatives, price_comparison, nutrient_costs = stage_components
         
         recommendation = {
             "crop": crop,
             "state": state,
             "growth_stage": growth_stage,
-            "npk_requirement": npk_needs,
-            "state_info": state_info,
+            "npk_requirement": self.get_npk_requirement(crop, growth_stage),
+            "state_info": self.get_state_info(state),
             "recommended_fertilizers": stage_fertilizers,
-            "eco_alternatives": self._get_relevant_eco_alternatives(growth_stage),
-            "price_comparison": self._get_price_comparison(stage_fertilizers.get("primary", []))
+            "eco_alternatives": eco_alternatives,
+            "price_comparison": price_comparison,
+            "nutrient_costs": nutrient_costs
         }
         
         return recommendation
     
     def _get_relevant_eco_alternatives(self, growth_stage):
         """Get eco-friendly alternatives relevant to growth stage"""
-        stage_info = GROWTH_STAGE_FERTILIZERS.get(growth_stage, {})
-        eco_names = stage_info.get("eco_alternative", [])
-        
-        eco_options = {}
-        for name in eco_names:
-            for eco_name, eco_data in ECO_ALTERNATIVES.items():
-                if name.lower() in eco_name.lower():
-                    eco_options[eco_name] = eco_data
+        # Stage names are resolved against the catalogue once, at import time
+        eco_options = dict(self.data.stage_eco_alternatives.get(growth_stage, {}))
+        eco_alternatives = self.data.eco_alternatives
         
         # Always include some core alternatives
-        if "Vermicompost" not in eco_options:
-            eco_options["Vermicompost"] = ECO_ALTERNATIVES["Vermicompost"]
-        if "Nano Urea" not in eco_options and "Vegetative" in growth_stage:
-            eco_options["Nano Urea"] = ECO_ALTERNATIVES["Nano Urea"]
+        if "Vermicompost" not in eco_options and "Vermicompost" in eco_alternatives:
+            eco_options["Vermicompost"] = eco_alternatives["Vermicompost"]
+        if ("Nano Urea" not in eco_options and "Vegetative" in growth_stage
+                and "Nano Urea" in eco_alternatives):
+            eco_options["Nano Urea"] = eco_alternatives["Nano Urea"]
             
         return eco_options
     
-    def _get_price_comparison(self, fertilizer_types):
-        """Generate price comparison table for fertilizers"""
+    def _get_price_comparison(self, fertilizer_types, lookup=None):
+        """
+        Generate price comparison table for fertilizers
+        
+        Args:
+            fertilizer_types: Fertilizer types to list the brands of
+            lookup: Optional callable (product, brand) -> PricePoint or None;
+                offers it has a price for get that price, with its
+                "price_date" and "price_level" (district, state or national)
+        """
         comparison = []
         
         for fert_type in fertilizer_types:
-            if fert_type in BRANDED_FERTILIZERS:
-                comparison.extend(BRANDED_FERTILIZERS[fert_type])
+            offers = self.model.offers(fert_type)
+            if lookup is None:
+                comparison.extend(offers)
+                continue
+            for offer in offers:
+                point = lookup(fert_type, offer["brand"])
+                if point is None:
+                    comparison.append(offer)
+                    continue
+                price = point.price_per_50kg
+                comparison.append(dict(
+                    offer, price_per_50kg=int(price) if price.is_integer() else price,
+                    price_date=point.date.isoformat(), price_level=point.level))
         
         return comparison
     
-    def generate_response(self, crop, state, growth_stage, query=None):
+    def generate_response(self, crop, state, growth_stage, query=None, format="markdown",
+                          district=None, as_of=None):
         """
         Generate a complete (J)ai Kisan response
         
@@ -163,92 +394,157 @@ class JaiKisanAgent:
             state: Selected state
             growth_stage: Selected growth stage
             query: Optional natural language query
+            format: "markdown" for the formatted response, or "json" for the
+                structured recommendation without any markdown
+            district, as_of: Place and date for regional prices, as for
+                get_fertilizer_recommendations
             
         Returns:
-            Formatted response string
+            Formatted response string, or when format is "json" a
+            recommendation dictionary the caller owns (see to_json_dict)
+        """
+        if format not in RESPONSE_FORMATS:
+            raise ValueError(f"Unknown response format: {format}")
+        
+        if self._matrix is not None:
+            entry = self._matrix.get((crop, state, growth_stage))
+            if entry is not None:
+                return entry[1] if format == "markdown" else to_json_dict(entry[0])
+        
+        recommendation = self.get_fertilizer_recommendations(crop, state, growth_stage,
+                                                             district, as_of)
+        if format == "json":
+            return to_json_dict(recommendation)
+        return self.renderer.render(recommendation)
+    
+    def generate_responses(self, items, format="markdown"):
         """
-        recommendation = self.get_fertilizer_recommendations(crop, state, growth_stage)
-        
-        response = f"{self.greeting}\n\n"
-        response += f"## Fertilizer Recommendation for {crop} in {state}\n"
-        response += f"**Growth Stage:** {growth_stage}\n\n"
-        
-        # NPK Requirements
-        if recommendation["npk_requirement"]:
-            npk = recommendation["npk_requirement"]
-            response += "### 1. Nutrient Requirements (per hectare)\n"
-            response += f"- **Nitrogen (N):** {npk['N']} kg\n"
-            response += f"- **Phosphorus (P):** {npk['P']} kg\n"
-            response += f"- **Potassium (K):** {npk['K']} kg\n\n"
-        
-        # State Information
-        if recommendation["state_info"]:
-            info = recommendation["state_info"]
-            response += "### 2. Soil Information for Your Region\n"
-            response += f"- **Soil Type:** {info['soil_type']}\n"
-            response += f"- **Typical pH:** {info['typical_ph']}\n"
-            response += f"- **Common Issue:** {info['common_issue']}\n"
-            response += f"- **Agro-climatic Zone:** {info['agro_climatic_zone']}\n\n"
-        
-        # Price Comparison
-        if recommendation["price_comparison"]:
-            response += "### 3. Price Comparison (Per 50kg Bag)\n\n"
-            response += "| Option | Nutrient Value | Approx. Price (₹) | Availability |\n"
-            response += "|--------|----------------|-------------------|---------------|\n"
+        Generate responses for many (crop, state, growth_stage) requests at once
+        
+        Names are resolved through the agent's NameResolver, so "paddy",
+        "UP" or "basal" are accepted. Identical requests are generated only
+        once and stage-level lookups are shared across the batch. An invalid
+        item does not fail the batch; it gets an "error" entry in its place
+        instead, with "field" and ranked "candidates" for unresolved names.
+        
+        Args:
+            items: Iterable of (crop, state, growth_stage) tuples, or dictionaries
+                with "crop", "state" and "growth_stage" keys
+            format: "markdown" or "json", as for generate_response
             
-            for item in recommendation["price_comparison"]:
-                response += f"| {item['brand']} | {item['npk']} | ₹{item['price_per_50kg']} | {item['availability']} |\n"
-            response += "\n"
-        
-        # Eco-Smart Alternatives
-        if recommendation["eco_alternatives"]:
-            response += "### 4. Eco-Smart Alternatives (Bhoomi Raksha)\n\n"
-            response += "**Environmental Stewardship:** We recommend green alternatives first!\n\n"
+        Returns:
+            List of result dictionaries in input order, each holding the
+            canonical "crop", "state", "growth_stage" and either
+            "recommendation" or "error"
+        """
+        if format not in RESPONSE_FORMATS:
+            raise ValueError(f"Unknown response format: {format}")
+        
+        results = []
+        generated = {}
+        stage_components = {}
+        
+        for item in items:
+            try:
+                key = self._parse_batch_item(item)
+            except UnresolvedNameError as e:
+                results.append(e.to_dict())
+                continue
+            except ValueError as e:
+                results.append({"error": str(e)})
+                continue
+            
+            result = generated.get(key)
+            if result is None:
+                try:
+                    result = {"recommendation": self._generate_batch_response(
+                        key, stage_components, format
+                    )}
+                except Exception as e:
+                    result = {"error": str(e)}
+                generated[key] = result
             
-            for name, data in recommendation["eco_alternatives"].items():
-                response += f"**{name}**\n"
-                if "price_per_50kg" in data:
-                    response += f"- Price: ₹{data['price_per_50kg']} per 50kg\n"
-                elif "price_per_bottle" in data:
-                    response += f"- Price: ₹{data['price_per_bottle']} per bottle\n"
-                elif "price_per_ton" in data:
-                    response += f"- Price: ₹{data['price_per_ton']} per ton\n"
-                elif "cost" in data:
-                    response += f"- Cost: {data['cost']}\n"
-                    
-                if "benefits" in data:
-                    response += "- Benefits:\n"
-                    for benefit in data["benefits"]:
-                        response += f"  - {benefit}\n"
-                response += "\n"
-        
-        # Timing advice
-        timing = recommendation["recommended_fertilizers"].get("timing", "")
-        if timing:
-            response += f"### 5. Application Timing\n"
-            response += f"⏰ **Best Time:** {timing}\n\n"
-        
-        # Sustainability tip
-        response += "### 6. Pro-Tip for Long-term Soil Health\n"
-        response += "- Always get your **Soil Health Card** to prevent over-fertilization\n"
-        response += "- Mix chemical fertilizers with organic manure for better Nitrogen Use Efficiency (NUE)\n"
-        response += "- This reduces groundwater contamination and saves costs in the long run\n\n"
-        
-        # Weather advisory placeholder
-        response += "### 7. Weather Advisory\n"
-        response += "⚠️ *Check local weather forecast before applying fertilizer*\n"
-        response += "- Avoid application if heavy rain is expected within 48 hours\n"
-        response += "- This prevents nutrient runoff and wastage\n\n"
-        
-        response += "---\n"
-        response += "*Would you like me to help you find the nearest government fertilizer center (Kendra)?*\n"
-        
-        return response
+            crop, state, growth_stage = key
+            results.append(dict(result, crop=crop, state=state, growth_stage=growth_stage))
+        
+        return results
+    
+    def _parse_batch_item(self, item):
+        """Turn one batch item into a canonical (crop, state, growth_stage) key"""
+        if isinstance(item, dict):
+            values = (item.get("crop"), item.get("state"), item.get("growth_stage"))
+        elif isinstance(item, (list, tuple)) and len(item) == 3:
+            values = tuple(item)
+        else:
+            raise ValueError("Each item must be (crop, state, growth_stage) "
+                             "or an object with those fields")
+        
+        if not all(isinstance(value, str) and value.strip() for value in values):
+            raise ValueError("crop, state and growth_stage are required")
+        return self.resolver.resolve_request(*(value.strip() for value in values))
+    
+    def _generate_batch_response(self, key, stage_components, format):
+        """Generate one batch response, reusing stage components between items"""
+        if len(self.data.prices):
+            # Regional prices: priced stage components are cached per place
+            return self.generate_response(*key, format=format)
+        if self._matrix is not None:
+            entry = self._matrix.get(key)
+            if entry is not None:
+                return entry[1] if format == "markdown" else to_json_dict(entry[0])
+        
+        crop, state, growth_stage = key
+        components = stage_components.get(growth_stage)
+        if components is None:
+            components = self._get_stage_components(growth_stage)
+            stage_components[growth_stage] = components
+        
+        recommendation = self._build_recommendation(crop, state, growth_stage, components)
+        if format == "json":
+            return to_json_dict(recommendation)
+        return self.renderer.render(recommendation)
+    
+    def precompute_recommendations(self):
+        """
+        Materialize the full crop × state × growth stage recommendation matrix
+        
+        Both the structured recommendation and the rendered markdown are stored
+        in a read-only lookup table, so later calls to
+        get_fertilizer_recommendations and generate_response for a known
+        combination become a single dictionary fetch. Unknown combinations
+        still fall back to computing the response on demand.
+        
+        Recommendations depend on the place and date once regional prices
+        are loaded, so nothing is materialized then; their stage components
+        are cached per state, district and day instead.
+        
+        Returns:
+            Number of combinations in the matrix
+        """
+        self._matrix = None
+        if len(self.data.prices):
+            return 0
+        matrix = {}
+        for crop in self.get_all_crops():
+            for state in self.get_all_states():
+                for growth_stage in self.get_growth_stages():
+                    recommendation = MappingProxyType(
+                        self.get_fertilizer_recommendations(crop, state, growth_stage)
+                    )
+                    matrix[(crop, state, growth_stage)] = (
+                        recommendation,
+                        self.renderer.render(recommendation)
+                    )
+        self._matrix = MappingProxyType(matrix)
+        return len(matrix)
     
     def get_system_prompt(self):
         """Returns the complete system prompt for AI integration"""
-        with open('system_prompt.md', 'r', encoding='utf-8') as f:
-            return f.read()
+        return self.prompt_loader.get()
+    
+    def get_system_prompt_sections(self):
+        """Returns the system prompt pre-split into a heading → text mapping"""
+        return self.prompt_loader.sections()
 
 
 def main():
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Load Test for (J)ai Kisan
+Drives a running server with many concurrent keep-alive HTTP clients
+
+Usage:
+    python loadtest.py --url http://127.0.0.1:5000/ --concurrency 500
+    python loadtest.py --url http://127.0.0.1:5000/payment \\
+        --create-user 9000000001:load-password --duration 20
+    python loadtest.py --url http://127.0.0.1:5000/login --concurrency 50 \\
+        --form "mobile=9000000001&password=load-password"
+
+Each client is an asyncio task with its own HTTP/1.1 connection, so a
+single process can hold 500+ connections open without threads. With
+--create-user, a verified user is written straight into the app's database
+(same DATABASE_URI as the server) and every client logs in as that user
+first, which is needed for routes such as /payment or /get-recommendation.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+
+class LoadStats:
+    """Latencies and outcome counters collected by all clients"""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    def report(self, elapsed, concurrency):
+        """Summary dictionary for a run that took elapsed seconds"""
+        latencies = sorted(self.latencies)
+        completed = len(latencies)
+
+        def pick(fraction):
+            if not latencies:
+                return 0.0
+            index = min(completed - 1, int(round(fraction * (completed - 1))))
+            return round(latencies[index] * 1000, 1)
+
+        return {
+            "concurrency": concurrency,
+            "duration_s": round(elapsed, 2),
+            "requests": completed,
+            "requests_per_sec": round(completed / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": pick(0.50),
+            "p90_ms": pick(0.90),
+            "p99_ms": pick(0.99),
+            "max_ms": pick(1.0),
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": dict(self.errors),
+        }
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, headers=None, body=b""):
+        """
+        Send one request, reconnecting if needed
+
+        Returns:
+            Tuple of (status code, lower-cased header dict, body bytes)
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if body or method == "POST":
+            lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("server closed the connection")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        cookies = []
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "set-cookie":
+                cookies.append(value.strip())
+            response_headers[name] = value.strip()
+        response_headers["set-cookie"] = cookies
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            response_body = b"".join(chunks)
+        elif "content-length" in response_headers:
+            response_body = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            response_body = await self.reader.read()
+            self.close()
+
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, response_headers, response_body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def log_in(host, port, mobile, password):
+    """Log in through /login and return the Cookie header value"""
+    connection = Connection(host, port)
+    try:
+        body = urlencode({"mobile": mobile, "password": password}).encode("ascii")
+        status, headers, _ = await connection.request(
+            "POST", "/login",
+            {"Content-Type": "application/x-www-form-urlencoded"}, body)
+    finally:
+        connection.close()
+    if status != 302:
+        raise RuntimeError(f"login failed with HTTP {status}")
+    return "; ".join(cookie.split(";", 1)[0] for cookie in headers["set-cookie"])
+
+
+async def client(target, stats, deadline, timeout):
+    """Issue requests back to back on one connection until the deadline"""
+    host, port, method, path, headers, body = target
+    connection = Connection(host, port)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            status, _, _ = await asyncio.wait_for(
+                connection.request(method, path, headers, body), timeout)
+        except (OSError, EOFError, ValueError, IndexError, asyncio.TimeoutError) as e:
+            stats.errors[type(e).__name__] += 1
+            connection.close()
+            await asyncio.sleep(0.05)
+            continue
+        stats.latencies.append(time.perf_counter() - started)
+        stats.statuses[status] += 1
+    connection.close()
+
+
+async def run_load(args):
+    """Log in if requested, then run all clients for the configured duration"""
+    url = urlsplit(args.url)
+    host = url.hostname or "127.0.0.1"
+    port = url.port or 80
+    path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+
+    headers = {}
+    body = b""
+    if args.json is not None:
+        headers["Content-Type"] = "application/json"
+        body = args.json.encode("utf-8")
+    elif args.form is not None:
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+        body = args.form.encode("utf-8")
+    if args.login:
+        mobile, _, password = args.login.partition(":")
+        headers["Cookie"] = await log_in(host, port, mobile, password)
+
+    target = (host, port, args.method or ("POST" if body else "GET"), path, headers, body)
+    stats = LoadStats()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(client(target, stats, deadline, args.timeout)
+                           for _ in range(args.concurrency)))
+    return stats.report(time.perf_counter() - started, args.concurrency)
+
+
+def create_user(credentials):
+    """Create (or reuse) a verified user directly in the app database"""
+    import app as web
+
+    mobile, _, password = credentials.partition(":")
+    with web.app.app_context():
+        user = web.User.query.filter_by(mobile=mobile).first()
+        if user is None:
+            user = web.User(full_name="Load Test Farmer", mobile=mobile, state="Punjab",
+                            occupation="Farmer", otp_verified=True)
+            user.set_password(password)
+            web.db.session.add(user)
+            web.db.session.commit()
+
+
+def main(argv=None):
+    """Run the load test and print a summary"""
+    parser = argparse.ArgumentParser(description="(J)ai Kisan HTTP load test")
+    parser.add_argument("--url", default="http://127.0.0.1:5000/",
+                        help="URL to request (default: http://127.0.0.1:5000/)")
+    parser.add_argument("--concurrency", type=int, default=500,
+                        help="concurrent connections (default: 500)")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds to run (default: 10)")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="per-request timeout in seconds (default: 30)")
+    parser.add_argument("--method", help="HTTP method (default: GET, or POST with --json)")
+    parser.add_argument("--json", help="JSON request body")
+    parser.add_argument("--form", metavar="NAME=VALUE&...",
+                        help="url-encoded form body, e.g. mobile=9000000001&password=secret")
+    parser.add_argument("--login", metavar="MOBILE:PASSWORD",
+                        help="log in first and send the session cookie")
+    parser.add_argument("--create-user", metavar="MOBILE:PASSWORD",
+                        help="create this verified user in the app database, then log in")
+    parser.add_argument("--label", default="", help="name for this run in the output")
+    parser.add_argument("--output-json", action="store_true",
+                        help="print the summary as a single JSON line")
+    args = parser.parse_args(argv)
+
+    if args.create_user:
+        create_user(args.create_user)
+        args.login = args.login or args.create_user
+
+    report = asyncio.run(run_load(args))
+    report["label"] = args.label
+    report["url"] = args.url
+
+    if args.output_json:
+        print(json.dumps(report))
+    else:
+        print(f"\n{args.label or args.url}")
+        print(f"  {report['requests']:,} requests in {report['duration_s']}s "
+              f"with {args.concurrency} clients: {report['requests_per_sec']:,.1f} req/s")
+        print(f"  latency p50 {report['p50_ms']} ms, p90 {report['p90_ms']} ms, "
+              f"p99 {report['p99_ms']} ms, max {report['max_ms']} ms")
+        print(f"  statuses {report['statuses']}  errors {report['errors'] or 'none'}")
+    return 0 if report["requests"] and not report["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+(J)ai Kisan - Metrics
+Prometheus-format counters, gauges and latency histograms without dependencies
+
+Recording is lock-free: every thread counts into its own shard, created
+the first time that thread records, and the shards are only added up when
+/metrics is scraped. Metrics are per process; with several gunicorn
+workers each scrape reports the worker that answered it.
+"""
+
+import functools
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; covers cache hits (~0.1 ms) up to slow gateway calls
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _os_thread_local():
+    """
+    threading.local of OS threads, even under gevent monkey-patching
+
+    A patched threading.local is per greenlet, which would create one shard
+    per connection. Greenlets sharing a shard is safe: they only switch on
+    I/O, never inside a recording call.
+    """
+    if "gevent" in sys.modules:
+        from gevent import monkey
+        return monkey.get_original("_thread", "_local")()
+    return threading.local()
+
+
+class _Sharded:
+    """Per-thread dictionaries of label values -> running totals"""
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = _os_thread_local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        """Create the calling thread's shard (recording reads self._local.shard)"""
+        shard = self._local.shard = {}
+        with self._shards_lock:
+            self._shards.append(shard)
+        return shard
+
+    def _entries(self):
+        """All (labels, entry) pairs from every shard"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            yield from list(shard.items())
+
+
+class Counter(_Sharded):
+    """Monotonic counter"""
+
+    type = "counter"
+
+    def inc(self, labels=(), amount=1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def samples(self):
+        totals = {}
+        for labels, value in self._entries():
+            totals[labels] = totals.get(labels, 0) + value
+        for labels in sorted(totals):
+            yield self.name, _format_labels(self.labelnames, labels), totals[labels]
+
+
+class Histogram(_Sharded):
+    """Distribution of observed values in cumulative buckets, with sum and count"""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        """
+        Record one value
+
+        Args:
+            labels: Tuple of label values, in labelnames order
+            value: Observed value (seconds for latencies)
+        """
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # One count per bucket, one for +Inf, then the sum
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def totals(self):
+        """Merged {labels: (per-bucket counts, sum)} across all threads"""
+        merged = {}
+        for labels, entry in self._entries():
+            total = merged.get(labels)
+            if total is None:
+                merged[labels] = list(entry)
+            else:
+                for i, value in enumerate(entry):
+                    total[i] += value
+        return {labels: (entry[:-1], entry[-1]) for labels, entry in merged.items()}
+
+    def samples(self):
+        for labels, (counts, total) in sorted(self.totals().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield (f"{self.name}_bucket",
+                       _format_labels(self.labelnames, labels, ("le", _format_value(float(bound)))),
+                       cumulative)
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), cumulative
+
+
+class CollectedMetric:
+    """Gauge or counter whose values are read from a callback at scrape time"""
+
+    def __init__(self, name, help, labelnames, collect, type="gauge"):
+        """
+        Args:
+            collect: Callable returning {label values tuple: number}
+            type: "gauge", or "counter" for totals kept elsewhere (cache hits)
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.type = type
+
+    def samples(self):
+        values = self.collect()
+        for labels in sorted(values):
+            yield self.name, _format_labels(self.labelnames, labels), values[labels]
+
+
+class MetricsRegistry:
+    """
+    Named metrics rendered together in Prometheus text format
+
+    Set enabled to False to turn the instrumentation hooks into no-ops.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def collected(self, name, help, labelnames, collect, type="gauge"):
+        return self.register(CollectedMetric(name, help, labelnames, collect, type))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def instrument_methods(obj, histogram, names, registry):
+    """
+    Time selected methods of one object into histogram, labelled by method name
+
+    Bound methods are replaced on the instance only, so internal self.method()
+    calls are timed too and other instances are untouched.
+    """
+    for name in names:
+        setattr(obj, name, _timed(getattr(obj, name), histogram.observe, (name,), registry))
+
+
+def _timed(method, observe, labels, registry):
+    clock = time.perf_counter
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not registry.enabled:
+            return method(*args, **kwargs)
+        started = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            observe(labels, clock() - started)
+    return wrapper
+
+
+class RequestMetrics:
+    """
+    WSGI middleware timing every request of a Flask app into histogram
+
+    Labels are (route, method, status), where route is the matched URL rule
+    ("/api/history", not "/api/history?before=10"), so label values stay
+    bounded; requests that match no rule are labelled "unmatched". The time
+    is until the response starts (the body of a streamed response, such as
+    /download, is not included).
+    """
+
+    def __init__(self, wsgi_app, histogram, registry):
+        self.wsgi_app = wsgi_app
+        self.observe = histogram.observe
+        self.registry = registry
+
+    def __call__(self, environ, start_response):
+        if not self.registry.enabled:
+            return self.wsgi_app(environ, start_response)
+        started = time.perf_counter()
+        labels = []
+
+        def capture_labels(status, headers, exc_info=None):
+            # Still inside Flask's request context, so its request (which
+            # carries the matched rule) is in the environ; it is gone later
+            rule = getattr(environ.get("werkzeug.request"), "url_rule", None)
+            labels.append((rule.rule if rule is not None else "unmatched",
+                           environ.get("REQUEST_METHOD", ""), status[:3]))
+            return start_response(status, headers, exc_info)
+
+        try:
+            return self.wsgi_app(environ, capture_labels)
+        finally:
+            if not labels:  # the app raised before starting a response
+                labels.append(("unmatched", environ.get("REQUEST_METHOD", ""), "500"))
+            self.observe(labels[0], time.perf_counter() - started)
+
+
+def instrument_engine(engine, histogram, registry):
+    """Time every SQL statement run through a SQLAlchemy engine, labelled by verb"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        if registry.enabled:
+            verb = statement.lstrip().split(None, 1)[0].upper() if statement else "OTHER"
+            histogram.observe((verb,), time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def drop_timer(context):
+        # after_cursor_execute does not run for failed statements
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
@@ -0,0 +1,358 @@
+"""
+(J)ai Kisan - Outbound Message Queue
+Delivers OTP SMS in the background so requests never wait on the SMS gateway
+
+Messages are queued in memory and sent by worker threads in batches through
+a pluggable transport. Failed sends are retried with exponential backoff;
+messages that keep failing are counted and kept in a short dead-letter list.
+
+Transports:
+    ConsoleTransport   print to stdout (default, development)
+    FileTransport      append JSON lines to a file (staging, tests)
+    LoopbackTransport  keep messages in memory (tests)
+    TwilioTransport    send real SMS through Twilio
+"""
+
+import heapq
+import itertools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque, namedtuple
+
+# One SMS; attempts counts failed deliveries so far
+OutboundMessage = namedtuple("OutboundMessage", ["to", "body", "enqueued_at", "attempts"])
+
+
+class Transport:
+    """
+    Base class for message transports
+
+    Subclasses implement send(); send_batch() may be overridden when the
+    backend can send several messages more cheaply than one at a time.
+    """
+
+    def send(self, message):
+        """Deliver one message, raising an exception on failure"""
+        raise NotImplementedError
+
+    def send_batch(self, messages):
+        """
+        Deliver a batch of messages
+
+        Returns:
+            List of (message, exception) pairs for the messages that failed
+        """
+        failed = []
+        for message in messages:
+            try:
+                self.send(message)
+            except Exception as e:
+                failed.append((message, e))
+        return failed
+
+
+class ConsoleTransport(Transport):
+    """Print messages instead of sending them (development)"""
+
+    def __init__(self, delay=0.0):
+        """
+        Args:
+            delay: Seconds to sleep per message, emulating a gateway round trip
+        """
+        self.delay = delay
+
+    def send(self, message):
+        print(f"Sending SMS to {message.to}: {message.body}")
+        if self.delay:
+            time.sleep(self.delay)
+
+
+class FileTransport(Transport):
+    """Append each message to a JSON lines file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        lines = "".join(
+            json.dumps({"to": m.to, "body": m.body, "sent_at": time.time()},
+                       ensure_ascii=False) + "\n"
+            for m in messages
+        )
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        return []
+
+
+class LoopbackTransport(Transport):
+    """Keep delivered messages in memory; optionally fail the first few sends"""
+
+    def __init__(self, fail_first=0):
+        """
+        Args:
+            fail_first: Number of initial send() calls that raise ConnectionError
+        """
+        self.sent = []
+        self.batches = []
+        self.fail_first = fail_first
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        with self._lock:
+            self.batches.append(len(messages))
+        return super().send_batch(messages)
+
+    def send(self, message):
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                raise ConnectionError("simulated gateway failure")
+            self.sent.append(message)
+
+
+class TwilioTransport(Transport):
+    """Send SMS through Twilio, reusing one HTTP client for a whole batch"""
+
+    def __init__(self, account_sid, auth_token, from_number):
+        from twilio.rest import Client  # optional dependency, only needed here
+        self.client = Client(account_sid, auth_token)
+        self.from_number = from_number
+
+    def send(self, message):
+        self.client.messages.create(body=message.body, from_=self.from_number, to=message.to)
+
+
+def transport_from_env(delay=0.0):
+    """
+    Build the transport selected by OUTBOUND_TRANSPORT
+
+    console (default), file (OUTBOUND_FILE, default outbound_sms.jsonl),
+    loopback, or twilio (TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN,
+    TWILIO_PHONE_NUMBER).
+    """
+    name = os.getenv("OUTBOUND_TRANSPORT", "console").lower()
+    if name == "file":
+        return FileTransport(os.getenv("OUTBOUND_FILE", "outbound_sms.jsonl"))
+    if name == "loopback":
+        return LoopbackTransport()
+    if name == "twilio":
+        return TwilioTransport(os.getenv("TWILIO_ACCOUNT_SID"),
+                               os.getenv("TWILIO_AUTH_TOKEN"),
+                               os.getenv("TWILIO_PHONE_NUMBER"))
+    return ConsoleTransport(delay=delay)
+
+
+class OutboundQueue:
+    """
+    Background delivery queue with batching, retries and metrics
+
+    Worker threads start on the first enqueue in each process, so a queue
+    created before gunicorn forks its workers still delivers in every worker.
+    """
+
+    def __init__(self, transport, workers=1, batch_size=20, max_retries=3,
+                 backoff=0.5, max_backoff=30.0, maxsize=10000):
+        """
+        Args:
+            transport: Transport used to deliver messages
+            workers: Number of delivery threads
+            batch_size: Most messages handed to the transport at once
+            max_retries: Retries after the first failed attempt before giving up
+            backoff: Delay before the first retry in seconds; doubles each retry
+            max_backoff: Upper bound for the retry delay in seconds
+            maxsize: Most messages waiting in the queue; enqueue fails beyond it
+        """
+        self.transport = transport
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.maxsize = maxsize
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        """Fresh queue, locks and counters for the current process"""
+        self._queue = queue.Queue(self.maxsize)
+        self._retries = []  # heap of (due time, sequence, message)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._running = False
+        self._threads = []
+        self.enqueued = 0
+        self.sent = 0
+        self.failed_attempts = 0
+        self.retried = 0
+        self.dead = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.dead_letters = deque(maxlen=100)
+        self._latencies = deque(maxlen=1000)
+
+    def start(self):
+        """Start the worker threads (called automatically by enqueue)"""
+        with self._start_lock:
+            if self._pid != os.getpid():
+                # Threads do not survive fork(); anything copied from the parent is stale
+                self._pid = os.getpid()
+                self._reset()
+            if self._running:
+                return
+            self._running = True
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"outbound-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, to, body):
+        """
+        Queue a message for delivery and return immediately
+
+        Returns:
+            True if queued, False if the queue is full (the message is dropped)
+        """
+        if self._pid != os.getpid() or not self._running:
+            self.start()
+        message = OutboundMessage(to, body, time.monotonic(), 0)
+        with self._lock:
+            try:
+                self._queue.put_nowait(message)
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self.enqueued += 1
+            self._pending += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize() + len(self._retries))
+        return True
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued message is delivered or given up on
+
+        Returns:
+            True if the queue drained within timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def stop(self, timeout=5.0):
+        """Deliver what is queued (up to timeout), then stop the workers"""
+        drained = self.flush(timeout)
+        with self._start_lock:
+            self._running = False
+            for thread in self._threads:
+                thread.join(timeout=1.0)
+            self._threads = []
+        return drained
+
+    def stats(self):
+        """Queue depth, delivery counters and delivery latency percentiles"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            depth = self._queue.qsize()
+            retrying = len(self._retries)
+            counters = {
+                "depth": depth + retrying,
+                "queued": depth,
+                "retrying": retrying,
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "sent": self.sent,
+                "failed_attempts": self.failed_attempts,
+                "retried": self.retried,
+                "dead": self.dead,
+                "dropped": self.dropped,
+                "workers": len(self._threads),
+            }
+
+        def pick(fraction):
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 1)
+
+        counters["latency_ms"] = {
+            "samples": len(latencies),
+            "p50": pick(0.50),
+            "p95": pick(0.95),
+            "p99": pick(0.99),
+            "max": pick(1.0),
+        }
+        return counters
+
+    def _work(self):
+        """Worker loop: take a batch, deliver it, schedule retries"""
+        while self._running:
+            batch = self._next_batch()
+            if batch:
+                self._deliver(batch)
+
+    def _next_batch(self):
+        """Due retries first, then queued messages, up to batch_size"""
+        batch = []
+        with self._lock:
+            now = time.monotonic()
+            while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self._retries)[2])
+            next_retry = self._retries[0][0] - now if self._retries else None
+
+        if not batch:
+            wait = 0.1 if next_retry is None else max(0.0, min(0.1, next_retry))
+            try:
+                batch.append(self._queue.get(timeout=wait))
+            except queue.Empty:
+                return batch
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, batch):
+        try:
+            failed = self.transport.send_batch(batch)
+        except Exception as e:  # a broken transport must not kill the worker
+            failed = [(message, e) for message in batch]
+
+        failed_ids = {id(message) for message, _ in failed}
+        now = time.monotonic()
+        with self._lock:
+            for message in batch:
+                if id(message) not in failed_ids:
+                    self.sent += 1
+                    self._latencies.append(now - message.enqueued_at)
+                    self._pending -= 1
+
+            for message, error in failed:
+                self.failed_attempts += 1
+                attempts = message.attempts + 1
+                if attempts > self.max_retries:
+                    self.dead += 1
+                    self.dead_letters.append((message._replace(attempts=attempts), repr(error)))
+                    self._pending -= 1
+                    continue
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+                due = now + delay * random.uniform(0.5, 1.0)
+                heapq.heappush(self._retries, (due, next(self._sequence),
+                                               message._replace(attempts=attempts)))
+                self.retried += 1
+
+            if not self._pending:
+                self._idle.notify_all()
@@ -0,0 +1,73 @@
+"""
+(J)ai Kisan - Page Fragments
+Dropdown <option> lists rendered once per data version
+
+The crop, state and growth-stage dropdowns are the bulk of the dashboard
+and registration markup but only change with the agronomy data, so they
+are built once per DATA_VERSION and pasted into every page as-is.
+"""
+
+from collections import namedtuple
+
+from markupsafe import Markup, escape
+
+DropdownFragments = namedtuple(
+    "DropdownFragments", ["crop_options", "state_options", "growth_stage_options"]
+)
+
+
+def _options(values):
+    return "".join(f'<option value="{escape(value)}">{escape(value)}</option>' for value in values)
+
+
+# (data version, DropdownFragments) of the last version rendered. One slot,
+# replaced whole on a reload, so an old agent and its snapshot are not kept
+# alive by the cache
+_latest = (None, None)
+
+
+def dropdown_fragments(agent):
+    """
+    Rendered <option> markup for the crop, state and growth-stage dropdowns
+
+    Rendered again only when the agent's data version changes.
+
+    Args:
+        agent: JaiKisanAgent providing the crop, state and growth-stage lists
+
+    Returns:
+        DropdownFragments of Markup strings
+    """
+    global _latest
+    data_version, fragments = _latest
+    if data_version == agent.data.version:
+        return fragments
+
+    crop_groups = "".join(
+        f'<optgroup label="{escape(category)}">{_options(crops)}</optgroup>'
+        for category, crops in agent.get_crop_categories().items()
+    )
+    fragments = DropdownFragments(
+        crop_options=Markup(crop_groups),
+        state_options=Markup(_options(agent.get_all_states())),
+        growth_stage_options=Markup(_options(agent.get_growth_stages())),
+    )
+    _latest = (agent.data.version, fragments)
+    return fragments
+
+
+def with_selected(options, value):
+    """
+    Mark one option of a rendered fragment as selected
+
+    Args:
+        options: Markup returned in DropdownFragments
+        value: Option value to select; unknown values leave options unchanged
+
+    Returns:
+        Markup string
+    """
+    if not value:
+        return options
+    option = f'<option value="{escape(value)}">'
+    return Markup(str(options).replace(option, option[:-1] + " selected>", 1))
@@ -0,0 +1,185 @@
+"""
+(J)ai Kisan - Password Hashing Pool
+Runs the deliberately slow password hashes on a small, bounded thread pool
+
+Werkzeug's scrypt/pbkdf2 hashes take ~100 ms of CPU each and release the
+GIL while they run, so a burst of logins handled on request threads can
+occupy every core. Routing them through a fixed number of hashing threads
+caps how much CPU logins take; the rest stays free for cheap requests.
+Requests that cannot get a hashing slot in time fail fast with
+HasherBusy (the web app answers 503) instead of piling up.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import (DEFAULT_PBKDF2_ITERATIONS, generate_password_hash,
+                               check_password_hash)
+
+
+class HasherBusy(Exception):
+    """No hashing slot became free within the queue timeout"""
+
+
+def method_prefix(method):
+    """
+    What Werkzeug writes before the first "$" of a hash made with method
+
+    Costs left out of the method ("scrypt", "pbkdf2:sha256") are filled in
+    with Werkzeug's defaults, as generate_password_hash does.
+
+    Raises:
+        ValueError: for a method Werkzeug does not support
+    """
+    name, *args = method.split(":")
+    if name == "scrypt":
+        if not args:
+            args = [2 ** 15, 8, 1]
+        if len(args) != 3:
+            raise ValueError("'scrypt' takes 3 arguments.")
+        return "scrypt:{}:{}:{}".format(*map(int, args))
+    if name == "pbkdf2":
+        if len(args) > 2:
+            raise ValueError("'pbkdf2' takes 2 arguments.")
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid hash method '{name}'.")
+
+
+class PasswordHasher:
+    """
+    Bounded executor for password hashing and verification
+
+    At most workers hashes run at once and at most max_queue more wait; a
+    caller waits up to queue_timeout seconds for its hash to start. A
+    waiting caller still holds its server thread, so keep max_queue well
+    below the number of request threads.
+    """
+
+    def __init__(self, method="scrypt", workers=2, max_queue=8, queue_timeout=2.0,
+                 hash_function=generate_password_hash, check_function=check_password_hash):
+        """
+        Args:
+            method: Werkzeug hash method and cost, e.g. "scrypt:32768:8:1"
+                or "pbkdf2:sha256:600000"
+            workers: Hashes computed concurrently
+            max_queue: Hashes allowed to wait for a worker
+            queue_timeout: Seconds a hash may wait before HasherBusy is raised
+            hash_function: Called as hash_function(password, method) on a
+                worker; Werkzeug's generate_password_hash by default
+            check_function: Called as check_function(password_hash, password)
+                on a worker; Werkzeug's check_password_hash by default
+
+        Raises:
+            ValueError: for a method Werkzeug does not support
+        """
+        self.method = method
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._hash_function = hash_function
+        self._check_function = check_function
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._current_prefix = method_prefix(method)
+        self.rejected = 0
+        self.rehashed = 0
+        self._timings = {"hash": deque(maxlen=1000), "verify": deque(maxlen=1000)}
+        self._waits = deque(maxlen=1000)
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run("hash", self._hash_function, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run("verify", self._check_function, password_hash, password)
+
+    def verify_and_update(self, password_hash, password):
+        """
+        Check a password and rehash it if the stored method or cost is outdated
+
+        Returns:
+            Tuple of (valid, new hash or None)
+        """
+        if not self.verify(password_hash, password):
+            return False, None
+        if not self.needs_rehash(password_hash):
+            return True, None
+        new_hash = self.hash(password)
+        with self._lock:
+            self.rehashed += 1
+        return True, new_hash
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with a different method or cost"""
+        return password_hash.split("$", 1)[0] != self._current_prefix
+
+    def stats(self):
+        """Call counts and latency percentiles per operation, plus queue waits"""
+
+        def summary(samples):
+            samples = sorted(samples)
+
+            def pick(fraction):
+                if not samples:
+                    return 0.0
+                index = min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))
+                return round(samples[index] * 1000, 1)
+
+            return {"samples": len(samples), "p50_ms": pick(0.5), "p99_ms": pick(0.99),
+                    "max_ms": pick(1.0)}
+
+        with self._lock:
+            return {
+                "method": self.method,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "hash": summary(self._timings["hash"]),
+                "verify": summary(self._timings["verify"]),
+                "queue_wait": summary(self._waits),
+            }
+
+    def _run(self, operation, function, *args):
+        if not self._slots.acquire(blocking=False):
+            self._reject()
+        try:
+            if self._executor is None:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(self.workers,
+                                                            thread_name_prefix="password-hash")
+            queued = time.perf_counter()
+            started = []
+
+            def timed():
+                started.append(time.perf_counter())
+                result = function(*args)
+                return result, time.perf_counter() - started[0]
+
+            future = self._executor.submit(timed)
+            try:
+                result, elapsed = future.result(timeout=self.queue_timeout)
+            except FutureTimeout:
+                if future.cancel():
+                    self._reject()
+                # Already running: it will finish shortly, so wait for it
+                result, elapsed = future.result()
+        finally:
+            self._slots.release()
+
+        with self._lock:
+            self._timings[operation].append(elapsed)
+            self._waits.append(started[0] - queued)
+        return result
+
+    def _reject(self):
+        with self._lock:
+            self.rejected += 1
+        raise HasherBusy("password hashing is saturated, try again shortly")
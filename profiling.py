@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+(J)ai Kisan - On-Demand Request Profiling
+Profiles a few production requests and summarises the dumps
+
+A request is profiled when the X-Profile header carries the admin token,
+or, with sampling enabled, at random at sample_rate but never more often
+than once every min_interval seconds, so sampling can stay on in
+production. At most one request is profiled at a time. Each profile is
+written to the profile directory, which keeps the newest max_files:
+
+    cprofile  <name>.prof    pstats dump (snakeviz, gprof2dot, this CLI)
+    sample    <name>.folded  collapsed stacks sampled every interval
+                             (flamegraph.pl, speedscope, this CLI); lowers
+                             the worker's thread switch interval while it runs
+
+Usage:
+    python profiling.py profiles/                # top functions across every dump
+    python profiling.py profiles/ --match Wheat --sort cumulative --limit 30
+"""
+
+import argparse
+import cProfile
+import glob
+import io
+import os
+import pstats
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+MODES = ("cprofile", "sample")
+EXTENSIONS = {"cprofile": ".prof", "sample": ".folded"}
+SORT_KEYS = ("tottime", "cumulative", "ncalls")
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread"""
+
+    def __init__(self, thread_id, interval=0.001):
+        """
+        Args:
+            thread_id: threading.get_ident() of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        # The sampler needs the GIL to take a sample; by default a busy
+        # thread only gives it up every 5 ms, longer than many requests.
+        # The switch interval is process-wide: while a sample runs, every
+        # thread in the worker switches this often, not just the profiled one
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        """Samples in collapsed-stack format, one "frame;frame;frame count" per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and writes their profiles
+
+    Profiling is off unless sample_rate is above zero or a token is set.
+    """
+
+    def __init__(self, directory="profiles", mode="cprofile", sample_rate=0.0,
+                 min_interval=60.0, max_files=100, token=None, sample_interval=0.001):
+        """
+        Args:
+            directory: Where profiles are written (created on first use)
+            mode: "cprofile" (deterministic, pstats) or "sample" (stack
+                sampling, collapsed stacks; lower overhead on slow requests)
+            sample_rate: Fraction of requests profiled at random
+            min_interval: Seconds between randomly sampled profiles at least
+            max_files: Profiles kept; the oldest are deleted
+            token: Admin token that forces profiling via the X-Profile header
+            sample_interval: Seconds between stack samples in "sample" mode
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        self.directory = directory
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.min_interval = min_interval
+        self.max_files = max_files
+        self.token = token
+        self.sample_interval = sample_interval
+        self._busy = threading.Lock()
+        self._next_sample = 0.0
+        self.profiled = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or bool(self.token)
+
+    def should_profile(self, header_value=None):
+        """
+        Whether to profile the current request
+
+        Args:
+            header_value: Value of the request's X-Profile header, if any
+
+        Returns:
+            True when the admin token matches, or when the request is picked
+            at sample_rate and min_interval has passed since the last one
+        """
+        if self.token and secrets.compare_digest((header_value or "").encode(),
+                                                 self.token.encode()):
+            return True
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        now = time.monotonic()
+        if now < self._next_sample:
+            self.skipped += 1
+            return False
+        self._next_sample = now + self.min_interval
+        return True
+
+    @contextmanager
+    def profile(self, label):
+        """
+        Profile the block; yields the path the profile will be written to,
+        or None if another request is being profiled
+
+        Args:
+            label: Parts of the file name, e.g. "get_recommendation-Wheat-Punjab"
+        """
+        if not self._busy.acquire(blocking=False):
+            # cProfile cannot run in two threads at once on Python 3.12+
+            self.skipped += 1
+            yield None
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+            name = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{stamp}-{label}")[:150]
+            path = os.path.join(self.directory, name + EXTENSIONS[self.mode])
+            if self.mode == "sample":
+                sampler = StackSampler(threading.get_ident(), self.sample_interval)
+                sampler.start()
+                try:
+                    yield path
+                finally:
+                    sampler.stop()
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(sampler.folded())
+                    self._written()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    yield path
+                finally:
+                    profiler.disable()
+                    profiler.dump_stats(path)
+                    self._written()
+        finally:
+            self._busy.release()
+
+    def _written(self):
+        self.profiled += 1
+        self._rotate()
+
+    def _rotate(self):
+        files = sorted(dump_files(self.directory), key=os.path.basename)  # timestamp first
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        return {"mode": self.mode, "sample_rate": self.sample_rate,
+                "min_interval_s": self.min_interval, "profiled": self.profiled,
+                "skipped": self.skipped, "files": len(dump_files(self.directory))}
+
+
+def dump_files(directory, match=None):
+    """Profile files in directory, optionally only those whose name contains match"""
+    paths = [path for extension in EXTENSIONS.values()
+             for path in glob.glob(os.path.join(directory, "*" + extension))]
+    return sorted(path for path in paths if not match or match in os.path.basename(path))
+
+
+def top_functions(paths, sort="tottime", limit=20):
+    """
+    Aggregate profiles and rank their functions
+
+    pstats dumps are merged and ranked by sort; collapsed-stack files are
+    ranked by samples in which the function was running (self) or on the
+    stack (cumulative).
+
+    Returns:
+        Tuple of (pstats report text or "", [(samples, function)] from the
+        collapsed-stack files)
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+    prof = [path for path in paths if path.endswith(EXTENSIONS["cprofile"])]
+    folded = [path for path in paths if path.endswith(EXTENSIONS["sample"])]
+
+    report = ""
+    if prof:
+        out = io.StringIO()
+        stats = pstats.Stats(*prof, stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        report = out.getvalue()
+
+    samples = Counter()
+    for path in folded:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                frames = stack.split(";")
+                if sort == "cumulative":
+                    for frame in set(frames):
+                        samples[frame] += int(count)
+                else:
+                    samples[frames[-1]] += int(count)
+    return report, [(count, frame) for frame, count in samples.most_common(limit)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Top functions across request profiles")
+    parser.add_argument("directory", nargs="?", default="profiles",
+                        help="profile directory (default: profiles)")
+    parser.add_argument("--match", help="only dumps whose file name contains this text "
+                                        "(route, crop or state)")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="tottime",
+                        help="pstats sort key (default: tottime)")
+    parser.add_argument("--limit", type=int, default=20, help="functions shown (default: 20)")
+    args = parser.parse_args(argv)
+
+    paths = dump_files(args.directory, args.match)
+    if not paths:
+        print(f"No profiles in {args.directory}", file=sys.stderr)
+        return 1
+    report, samples = top_functions(paths, args.sort, args.limit)
+    print(f"{len(paths)} profiles from {args.directory}")
+    if report:
+        print(report)
+    if samples:
+        print(f"{'samples':>8}  function ({'on stack' if args.sort == 'cumulative' else 'self'})")
+        for count, frame in samples:
+            print(f"{count:>8}  {frame}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+(J)ai Kisan - System Prompt Loader
+Caches system_prompt.md in memory and revalidates it cheaply
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+
+# Default prompt lives next to this module, not in the working directory
+DEFAULT_PROMPT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "system_prompt.md"
+)
+
+# One immutable, fully parsed version of the prompt file
+PromptSnapshot = namedtuple("PromptSnapshot", ["text", "sections", "mtime_ns", "size"])
+
+
+def split_sections(text):
+    """
+    Split a markdown prompt into sections on level-2 headings
+
+    Args:
+        text: Full prompt text
+
+    Returns:
+        OrderedDict of heading → section text (heading line included). Text
+        before the first "## " heading is stored under the empty string.
+    """
+    sections = OrderedDict()
+    title = ""
+    lines = []
+    for line in text.splitlines(keepends=True):
+        if line.startswith("## "):
+            if lines:
+                sections[title] = "".join(lines)
+            title = line[3:].strip()
+            lines = []
+        lines.append(line)
+    if lines:
+        sections[title] = "".join(lines)
+    return sections
+
+
+class SystemPromptLoader:
+    """
+    In-memory cache of the system prompt with change detection
+
+    The file is read once and kept as a parsed snapshot. Later calls only
+    stat the file, at most once per check_interval seconds, and re-read it
+    when its mtime or size changes or after reload() is called.
+    """
+
+    def __init__(self, path=DEFAULT_PROMPT_PATH, check_interval=2.0):
+        """
+        Args:
+            path: Prompt file path (defaults to system_prompt.md beside this module)
+            check_interval: Minimum seconds between stat() revalidations;
+                0 checks on every call
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the full prompt text"""
+        return self.snapshot().text
+
+    def sections(self):
+        """Return the prompt pre-split into a read-only mapping of heading → text"""
+        return self.snapshot().sections
+
+    def get_section(self, title):
+        """Return one section by its heading, or None if it does not exist"""
+        return self.snapshot().sections.get(title)
+
+    def snapshot(self):
+        """Return the current PromptSnapshot, re-reading the file only if it changed"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            now = time.monotonic()
+            if snapshot is not None and now < self._next_check:
+                return snapshot
+
+            stat = os.stat(self.path)
+            if (snapshot is None or stat.st_mtime_ns != snapshot.mtime_ns
+                    or stat.st_size != snapshot.size):
+                snapshot = self._load(stat)
+                self._snapshot = snapshot
+            self._next_check = now + self.check_interval
+            return snapshot
+
+    def reload(self):
+        """Force the next access to re-read the file (explicit reload signal)"""
+        with self._lock:
+            self._snapshot = None
+            self._next_check = 0.0
+
+    def _load(self, stat):
+        with open(self.path, "r", encoding="utf-8") as f:
+            text = f.read()
+        sections = MappingProxyType(split_sections(text))
+        return PromptSnapshot(text, sections, stat.st_mtime_ns, stat.st_size)
+
+
+# Shared loader for the default prompt file
+default_loader = SystemPromptLoader()
@@ -0,0 +1,114 @@
+"""
+(J)ai Kisan - Response Cache
+Bounded LRU cache for rendered recommendations with ETag support
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def normalize_key(crop, state, growth_stage):
+    """
+    Normalize a (crop, state, growth_stage) request into a cache key
+
+    Surrounding and repeated whitespace is collapsed so that trivially
+    different spellings of the same request share one entry.
+
+    Returns:
+        Tuple of normalized strings, or None if any field is missing
+    """
+    key = []
+    for value in (crop, state, growth_stage):
+        if not isinstance(value, str) or not value.strip():
+            return None
+        key.append(" ".join(value.split()))
+    return tuple(key)
+
+
+def make_etag(key, data_version):
+    """
+    Build a strong ETag for a normalized key and data version
+
+    The response body is fully determined by the key and the data it was
+    built from, so the tag can be computed without rendering anything.
+    """
+    digest = hashlib.sha1("\x1f".join((data_version,) + key).encode("utf-8"))
+    return f'"{data_version}-{digest.hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Thread-safe, size-bounded LRU cache
+
+    Keys should include the data version so that a data update never serves
+    stale recommendations; old entries simply age out of the LRU.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_not_modified(self):
+        """Count a request answered with 304 Not Modified, without a lookup"""
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss/eviction/304 counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,235 @@
+"""
+(J)ai Kisan - Response Renderer
+Compiles recommendation dictionaries into the markdown response
+"""
+
+from collections.abc import Mapping
+
+# Fixed sections are compiled once at import time
+_NPK_TEMPLATE = (
+    "### 1. Nutrient Requirements (per hectare)\n"
+    "- **Nitrogen (N):** {N} kg\n"
+    "- **Phosphorus (P):** {P} kg\n"
+    "- **Potassium (K):** {K} kg\n\n"
+)
+
+_STATE_TEMPLATE = (
+    "### 2. Soil Information for Your Region\n"
+    "- **Soil Type:** {soil_type}\n"
+    "- **Typical pH:** {typical_ph}\n"
+    "- **Common Issue:** {common_issue}\n"
+    "- **Agro-climatic Zone:** {agro_climatic_zone}\n\n"
+)
+
+_PRICE_HEADER = (
+    "### 3. Price Comparison (Per 50kg Bag)\n\n"
+    "| Option | Nutrient Value | Approx. Price (₹) | Availability |\n"
+    "|--------|----------------|-------------------|---------------|\n"
+)
+_PRICE_ROW = "| {brand} | {npk} | ₹{price_per_50kg} | {availability} |\n"
+_PRICE_CONTEXT = (
+    "*Dealer prices for {place} as of {as_of} where reported, list prices otherwise*\n\n"
+)
+
+_NUTRIENT_COST_HEADER = (
+    "**Cheapest Source per kg of Nutrient:**\n\n"
+    "| Nutrient | Option | Nutrient Value | Cost per kg of Nutrient (₹) |\n"
+    "|----------|--------|----------------|-----------------------------|\n"
+)
+_NUTRIENT_COST_ROW = "| {} | {} | {} | ₹{:.2f} |\n"
+_NUTRIENT_NAMES = {"N": "Nitrogen (N)", "P": "Phosphorus (P)", "K": "Potassium (K)"}
+
+_ECO_HEADER = (
+    "### 4. Eco-Smart Alternatives (Bhoomi Raksha)\n\n"
+    "**Environmental Stewardship:** We recommend green alternatives first!\n\n"
+)
+
+# (data key, line template) in order of preference for an eco alternative's price
+_ECO_PRICE_LINES = (
+    ("price_per_50kg", "- Price: ₹{} per 50kg\n"),
+    ("price_per_bottle", "- Price: ₹{} per bottle\n"),
+    ("price_per_ton", "- Price: ₹{} per ton\n"),
+    ("cost", "- Cost: {}\n"),
+)
+
+_TIMING_TEMPLATE = (
+    "### 5. Application Timing\n"
+    "⏰ **Best Time:** {}\n\n"
+)
+
+_FOOTER = (
+    "### 6. Pro-Tip for Long-term Soil Health\n"
+    "- Always get your **Soil Health Card** to prevent over-fertilization\n"
+    "- Mix chemical fertilizers with organic manure for better Nitrogen Use Efficiency (NUE)\n"
+    "- This reduces groundwater contamination and saves costs in the long run\n\n"
+    "### 7. Weather Advisory\n"
+    "⚠️ *Check local weather forecast before applying fertilizer*\n"
+    "- Avoid application if heavy rain is expected within 48 hours\n"
+    "- This prevents nutrient runoff and wastage\n\n"
+    "---\n"
+    "*Would you like me to help you find the nearest government fertilizer center (Kendra)?*\n"
+)
+
+# Stage sections kept for priced recommendations (stage × state × district ×
+# day), before the cache starts over
+MAX_PRICED_STAGE_SECTIONS = 4096
+
+
+class MarkdownRenderer:
+    """
+    Renders recommendations as markdown from precompiled fragments
+
+    Sections that only depend on the state or the growth stage are rendered
+    once and reused for every later response, so a typical render is a
+    handful of dictionary lookups and a single join.
+    """
+
+    def __init__(self, greeting):
+        self.greeting = greeting
+        self._state_sections = {}
+        self._stage_sections = {}
+        self._priced_stage_sections = {}
+
+    def render(self, recommendation):
+        """
+        Render a recommendation dictionary
+
+        Args:
+            recommendation: Dictionary as built by
+                JaiKisanAgent.get_fertilizer_recommendations
+
+        Returns:
+            Formatted markdown response string
+        """
+        parts = [
+            self.greeting, "\n\n",
+            "## Fertilizer Recommendation for ", recommendation["crop"],
+            " in ", recommendation["state"], "\n",
+            "**Growth Stage:** ", recommendation["growth_stage"], "\n\n",
+        ]
+
+        npk = recommendation["npk_requirement"]
+        if npk:
+            parts.append(_NPK_TEMPLATE.format(N=npk["N"], P=npk["P"], K=npk["K"]))
+
+        parts.append(self._state_section(recommendation))
+        parts.append(self._stage_section(recommendation))
+        parts.append(_FOOTER)
+
+        return "".join(parts)
+
+    def clear(self):
+        """Forget all compiled sections (call after the underlying data changes)"""
+        self._state_sections.clear()
+        self._stage_sections.clear()
+        self._priced_stage_sections.clear()
+
+    def _state_section(self, recommendation):
+        """Soil information section, compiled once per state"""
+        info = recommendation["state_info"]
+        if not info:
+            return ""
+        # Only known states are cached, so free-text input cannot grow the cache
+        state = recommendation["state"]
+        section = self._state_sections.get(state)
+        if section is None:
+            section = _STATE_TEMPLATE.format(**info)
+            self._state_sections[state] = section
+        return section
+
+    def _stage_section(self, recommendation):
+        """
+        Price, nutrient cost, eco-alternative and timing sections, compiled
+        once per growth stage
+
+        Everything in them comes from the agent's data snapshot, which a
+        renderer never outlives, so the stage alone is the cache key;
+        with regional prices, the place and date the prices are for join it.
+        """
+        growth_stage = recommendation["growth_stage"]
+        context = recommendation.get("price_context")
+        if context is None:
+            key, sections = growth_stage, self._stage_sections
+        else:
+            key = (growth_stage, context["state"], context["district"], context["as_of"])
+            sections = self._priced_stage_sections
+        section = sections.get(key)
+        if section is None:
+            section = "".join((
+                self._price_section(recommendation["price_comparison"], context),
+                self._nutrient_cost_section(recommendation["nutrient_costs"]),
+                self._eco_section(recommendation["eco_alternatives"]),
+                self._timing_section(recommendation["recommended_fertilizers"]),
+            ))
+            # Only known growth stages are cached, for the same reason as states
+            if recommendation["recommended_fertilizers"]:
+                if len(sections) >= MAX_PRICED_STAGE_SECTIONS:
+                    sections.clear()  # a new day's prices; yesterday's are not needed
+                sections[key] = section
+        return section
+
+    @staticmethod
+    def _price_section(price_comparison, context=None):
+        if not price_comparison:
+            return ""
+        rows = [_PRICE_ROW.format(**item) for item in price_comparison]
+        note = ""
+        if context is not None:
+            place = context["state"]
+            if context["district"]:
+                place = f"{context['district'].title()}, {place}"
+            note = _PRICE_CONTEXT.format(place=place, as_of=context["as_of"])
+        return _PRICE_HEADER + "".join(rows) + "\n" + note
+
+    @staticmethod
+    def _nutrient_cost_section(nutrient_costs):
+        """The cheapest source of each nutrient (the first of its ranked entries)"""
+        if not nutrient_costs:
+            return ""
+        rows = []
+        for nutrient, costs in nutrient_costs.items():
+            cheapest = costs[0]
+            option = cheapest["product"]
+            if cheapest["brand"]:
+                option += f" ({cheapest['brand']})"
+            rows.append(_NUTRIENT_COST_ROW.format(_NUTRIENT_NAMES.get(nutrient, nutrient), option,
+                                                  cheapest["npk"], cheapest["cost_per_kg"]))
+        return _NUTRIENT_COST_HEADER + "".join(rows) + "\n"
+
+    @staticmethod
+    def _eco_section(eco_alternatives):
+        if not eco_alternatives:
+            return ""
+        parts = [_ECO_HEADER]
+        for name, data in eco_alternatives.items():
+            parts.append(f"**{name}**\n")
+            for key, line in _ECO_PRICE_LINES:
+                if key in data:
+                    parts.append(line.format(data[key]))
+                    break
+            if "benefits" in data:
+                parts.append("- Benefits:\n")
+                parts.extend(f"  - {benefit}\n" for benefit in data["benefits"])
+            parts.append("\n")
+        return "".join(parts)
+
+    @staticmethod
+    def _timing_section(recommended_fertilizers):
+        timing = recommended_fertilizers.get("timing", "")
+        return _TIMING_TEMPLATE.format(timing) if timing else ""
+
+
+def to_json_dict(recommendation):
+    """
+    Copy a (possibly read-only) recommendation into plain, JSON-ready dicts
+
+    Precomputed recommendations are MappingProxyType views, and every
+    recommendation shares its nested tables with the agent's data and the
+    response cache. The copy is built all the way down, so callers may
+    change it freely.
+    """
+    if isinstance(recommendation, Mapping):
+        return {key: to_json_dict(value) for key, value in recommendation.items()}
+    if isinstance(recommendation, (list, tuple)):
+        return [to_json_dict(value) for value in recommendation]
+    return recommendation
@@ -0,0 +1,189 @@
+"""
+(J)ai Kisan - User Snapshot Cache
+Per-process, TTL-bounded cache of the user fields checked on every request
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+from flask_login import UserMixin
+
+# The fields authenticated routes need on every request
+UserSnapshot = namedtuple(
+    "UserSnapshot",
+    ["id", "full_name", "state", "district", "payment_status", "registration_date",
+     "trial_end"]
+)
+
+
+def snapshot_user(user):
+    """Build a UserSnapshot from a User model instance"""
+    return UserSnapshot(
+        id=user.id,
+        full_name=user.full_name,
+        state=user.state,
+        district=user.district,
+        payment_status=user.payment_status,
+        registration_date=user.registration_date,
+        trial_end=user.get_trial_end(),
+    )
+
+
+class CachedUser(UserMixin):
+    """
+    Request-scoped current_user backed by a cached UserSnapshot
+
+    Snapshot fields and the trial checks are answered from memory. Any other
+    attribute loads the full User row through loader, at most once per
+    request. Writes must go through get_user(), followed by
+    UserSnapshotCache.invalidate().
+    """
+
+    def __init__(self, snapshot, loader):
+        """
+        Args:
+            snapshot: UserSnapshot for this user
+            loader: Callable returning the User model instance
+        """
+        self._snapshot = snapshot
+        self._loader = loader
+        self._user = None
+
+    @property
+    def id(self):
+        return self._snapshot.id
+
+    @property
+    def full_name(self):
+        return self._snapshot.full_name
+
+    @property
+    def state(self):
+        return self._snapshot.state
+
+    @property
+    def district(self):
+        return self._snapshot.district
+
+    @property
+    def payment_status(self):
+        return self._snapshot.payment_status
+
+    @property
+    def registration_date(self):
+        return self._snapshot.registration_date
+
+    def get_id(self):
+        return str(self._snapshot.id)
+
+    def is_trial_active(self):
+        """Same rule as User.is_trial_active, from the snapshot"""
+        if self._snapshot.payment_status == 'paid':
+            return True
+        return datetime.utcnow() < self._snapshot.trial_end
+
+    def get_trial_remaining(self):
+        """Same rule as User.get_trial_remaining, from the snapshot"""
+        if self._snapshot.payment_status == 'paid':
+            return None
+        remaining = self._snapshot.trial_end - datetime.utcnow()
+        return max(0, remaining.total_seconds() / 3600)
+
+    def get_user(self):
+        """Load (once) and return the full User model instance"""
+        if self._user is None:
+            self._user = self._loader()
+        return self._user
+
+    def __getattr__(self, name):
+        # Only reached for attributes not found above, e.g. mobile or email
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get_user(), name)
+
+
+class UserSnapshotCache:
+    """
+    Thread-safe LRU of UserSnapshots with a time-to-live
+
+    Invalidation only reaches the current process; the TTL bounds how long
+    other worker processes can serve a stale snapshot after a write.
+    """
+
+    def __init__(self, ttl=30.0, maxsize=10000):
+        """
+        Args:
+            ttl: Seconds a snapshot is trusted before it is reloaded
+            maxsize: Maximum number of users kept
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Bumped by invalidate(); a load that raced with a write is not stored
+        self._generation = 0
+
+    def get(self, user_id, load):
+        """
+        Return the snapshot for user_id, calling load(user_id) on a miss
+
+        Args:
+            user_id: Integer user id
+            load: Callable returning the User model instance or None
+
+        Returns:
+            UserSnapshot, or None if the user does not exist
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        user = load(user_id)
+        if user is None:
+            return None
+        snapshot = snapshot_user(user)
+        with self._lock:
+            if generation != self._generation:
+                return snapshot
+            self._entries[user_id] = (snapshot, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id):
+        """Forget a user's snapshot after writing to their row"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def clear(self):
+        """Drop all snapshots (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss/invalidation counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }